@@ -1,12 +1,18 @@
 from llama_cpp import Llama
 from pyswip import Prolog
-import pymc as pm
 import numpy as np
 import yaml
+import time
 import logging
+import textwrap
 
 # New Import for Specialists
 from aios.brain.specialists import DomainSpecialist
+from aios.brain.registry import SpecialistRegistry, CORE_MODULE
+from aios.brain.scheduler import InferenceScheduler
+from aios.brain.prefix_cache import PrefixCache
+from aios.brain.prompt import PromptAssembler, LLAMA3_STOP
+from aios.runtime.metrics import LLM_TOKENS, LLM_FIRST_TOKEN_SECONDS, LLM_DECODE_RATE, PROMPT_TOKENS
 
 class OS1Brain:
     def __init__(self):
@@ -14,71 +20,151 @@ class OS1Brain:
         with open('aios/config/config.yaml', 'r') as f:
             self.cfg = yaml.safe_load(f)
 
-        # 1. Neural Engine (Llama 3.1)
+        # 1. Neural Engine (Llama 3.1), served through a pool of contexts
+        sched_cfg = self.cfg.get('scheduler', {})
+        self.scheduler = InferenceScheduler(
+            self._load_llm,
+            pool_size=sched_cfg.get('contexts', 1),
+            max_queue_depth=sched_cfg.get('max_queue_depth', 16),
+            default_deadline_ms=sched_cfg.get('default_deadline_ms', 30000)
+        )
+
+        # KV snapshots of each specialist's evaluated system prefix
+        prefix_cfg = self.cfg.get('prefix_cache', {})
+        self.prefix_cache = None
+        if prefix_cfg.get('enabled', True):
+            self.prefix_cache = PrefixCache(prefix_cfg.get('max_mb', 512) * 1024 * 1024)
+
+        # Token-budgeted prompts, counted with a vocab-only copy of the model
+        self.tokenizer = Llama(model_path=self.cfg['models']['llm_path'], vocab_only=True, verbose=False)
+        self.assembler = PromptAssembler(self._tokenize, self.cfg['hardware']['ctx_size'], self.cfg.get('prompt', {}))
+
+        # 2. Symbolic Engine (Prolog), one module per specialist
+        self.prolog = Prolog()
+        self.registry = SpecialistRegistry(self.prolog)
+        
+        # 3. Default Specialist Mode (requests may pick their own)
+        self.current_specialist = self.registry.get("general")
+
+        if self.prefix_cache is not None and prefix_cfg.get('warm_on_start', True):
+            self.warm_prefixes()
+
+    def _load_llm(self):
         # n_gpu_layers=35 puts the whole model on your RTX 3050
-        self.llm = Llama(
+        return Llama(
             model_path=self.cfg['models']['llm_path'],
             n_ctx=self.cfg['hardware']['ctx_size'],
             n_gpu_layers=self.cfg['hardware']['gpu_layers'],
             verbose=False
         )
 
-        # 2. Symbolic Engine (Prolog)
-        self.prolog = Prolog()
-        self._init_logic()
-        
-        # 3. Specialist Mode (Default to General)
-        self.current_specialist = DomainSpecialist("general")
-        self.switch_mode("general")
-
-    def _init_logic(self):
-        # Basic logic rules for the OS
-        self.prolog.assertz("critical_system(kernel)")
-        self.prolog.assertz("critical_system(memory)")
-        self.prolog.assertz("can_modify(root, X) :- critical_system(X)")
+    def _tokenize(self, text):
+        return self.tokenizer.tokenize(text.encode("utf-8"), add_bos=False, special=True)
 
     def check_safety(self, action, user):
         """Symbolic Logic Check"""
-        query = f"can_modify({user}, {action})"
-        return list(self.prolog.query(query))
+        return self.registry.query(CORE_MODULE, f"can_modify({user}, {action})")
 
     def switch_mode(self, mode):
-        """Switches the active Specialist Module"""
-        try:
-            self.current_specialist = DomainSpecialist(mode)
-            # Inject symbolic rules specific to the domain
-            for rule in self.current_specialist.get_symbolic_rules():
-                # We wrap in try/except because re-asserting same rules might cause warnings
-                try:
-                    self.prolog.assertz(rule)
-                except:
-                    pass
-            self.logger.info(f"Switched to {mode} mode.")
-        except Exception as e:
-            self.logger.error(f"Failed to switch mode: {e}")
-
-    def generate_response(self, user_input, context, emotion_state):
         """
-        Combines Prompt Engineering + Context + Logic + Specialist Persona
+        Sets the default specialist for callers that don't pass `mode`.
+        Rules are preloaded by the registry, so nothing is asserted here.
+        """
+        self.current_specialist = self.registry.get(mode)
+        self.logger.info(f"Switched to {mode} mode.")
+
+    def _build_prompt(self, specialist, user_input, context, emotion_state, history=None, tools=None):
+        """
+        Combines Prompt Engineering + Context + Logic + Specialist Persona.
+        Returns (prefix, prompt, report): the static per-specialist prefix
+        comes first so its evaluated KV state can be reused across requests;
+        history, tool output and retrieved context are fitted into the
+        token budget after it. `context` is a list of items or one string.
         """
         
         # Retrieve the specialized prompt from the current specialist
-        specialist_prompt = self.current_specialist.get_system_prompt()
-        
-        system_prompt = f"""
-        {specialist_prompt}
-        
-        Current Context: {context}
-        Current Emotional State: {emotion_state}
-        User Input: {user_input}
-        
-        Respond naturally, concisely, and warmly.
+        specialist_prompt = textwrap.dedent(specialist.get_system_prompt()).strip()
+        persona = f"{specialist_prompt}\n\nRespond naturally, concisely, and warmly."
+        if isinstance(context, str):
+            context = [context] if context else []
+        prefix, prompt, report = self.assembler.assemble(persona, user_input, emotion_state,
+                                                         history or (), context, tools or ())
+        PROMPT_TOKENS.observe(report["tokens"])
+        return prefix, prompt, report
+
+    def _prepare_context(self, llm, specialist, prefix):
+        """Loads the specialist's evaluated prefix into `llm` before decoding"""
+        if self.prefix_cache is None:
+            return
+        tokens = llm.tokenize(prefix.encode("utf-8"), add_bos=True, special=True)
+        self.prefix_cache.restore(llm, specialist.domain, tokens)
+
+    def warm_prefixes(self):
+        """Evaluates and snapshots every specialist prefix ahead of traffic"""
+        with self.scheduler.acquire("background") as lease:
+            for specialist in self.registry.specialists.values():
+                prefix, _, _ = self._build_prompt(specialist, "", "", "")
+                self._prepare_context(lease.llm, specialist, prefix)
+        self.logger.info(f"Prefix cache warmed: {self.prefix_cache.stats()}")
+
+    def _specialist(self, mode):
+        return self.registry.get(mode) if mode else self.current_specialist
+
+    def _decode(self, lease, prompt):
+        """Streams the completion on a leased context, counting tokens as they arrive"""
+        started = time.monotonic()
+        stream = lease.llm.create_completion(prompt, max_tokens=self.assembler.reserve, stop=LLAMA3_STOP, stream=True)
+        for chunk in stream:
+            if lease.first_token_time is None:
+                lease.first_token_time = time.monotonic() - started
+            lease.completion_tokens += 1
+            token = chunk['choices'][0]['text']
+            if token:
+                yield token
+        lease.prompt_tokens = max(0, lease.llm.n_tokens - lease.completion_tokens)
+
+    def _observe(self, lease):
+        LLM_TOKENS.inc(lease.prompt_tokens, kind="prompt")
+        LLM_TOKENS.inc(lease.completion_tokens, kind="completion")
+        if lease.first_token_time is not None:
+            LLM_FIRST_TOKEN_SECONDS.observe(lease.first_token_time)
+            decode_time = lease.generation_time - lease.first_token_time
+            if lease.completion_tokens > 1 and decode_time > 0:
+                LLM_DECODE_RATE.observe((lease.completion_tokens - 1) / decode_time)
+
+    def generate_response(self, user_input, context, emotion_state,
+                          priority="interactive", deadline_ms=None, timings=None, mode=None,
+                          history=None, tools=None):
         """
-        
-        output = self.llm.create_chat_completion(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input}
-            ]
-        )
-        return output['choices'][0]['message']['content']
\ No newline at end of file
+        Blocking generation: returns the full reply once decoding is done.
+        `mode` selects the specialist for this call only; `history` is the
+        session's [(user, assistant)] turns and `tools` the tool output lines.
+        If `timings` is a dict it receives the lease timings (queue wait,
+        generation, first token), token counts and the prompt budget report.
+        """
+        specialist = self._specialist(mode)
+        prefix, prompt, report = self._build_prompt(specialist, user_input, context, emotion_state, history, tools)
+        with self.scheduler.acquire(priority, deadline_ms) as lease:
+            self._prepare_context(lease.llm, specialist, prefix)
+            text = "".join(self._decode(lease, prompt))
+        self._observe(lease)
+        if timings is not None:
+            timings.update(lease.timings(), prompt=report)
+        return text
+
+    def stream_response(self, user_input, context, emotion_state,
+                        priority="interactive", deadline_ms=None, timings=None, mode=None,
+                        history=None, tools=None):
+        """
+        Streaming generation: yields text fragments as llama.cpp decodes them.
+        The caller is responsible for joining them into the final reply.
+        The context stays checked out until the generator is exhausted or closed.
+        """
+        specialist = self._specialist(mode)
+        prefix, prompt, report = self._build_prompt(specialist, user_input, context, emotion_state, history, tools)
+        with self.scheduler.acquire(priority, deadline_ms) as lease:
+            self._prepare_context(lease.llm, specialist, prefix)
+            yield from self._decode(lease, prompt)
+        self._observe(lease)
+        if timings is not None:
+            timings.update(lease.timings(), prompt=report)
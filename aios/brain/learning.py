@@ -1,16 +1,29 @@
 import gymnasium as gym
 import numpy as np
 from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv
 import os
+import sys
+import glob
+import time
+import yaml
+import logging
+import threading
+import subprocess
+from collections import deque
+from functools import partial
 from gymnasium import spaces
 
 class OS1OptimizationEnv(gym.Env):
     """
     Custom Environment where OS1 learns to optimize its response parameters
     (Verbosity, Creativity/Temperature, Tone) based on user feedback.
+    If `observations` (N x 3) is given, new states are drawn from those
+    recorded interactions instead of uniformly at random.
     """
-    def __init__(self):
+    def __init__(self, observations=None):
         super(OS1OptimizationEnv, self).__init__()
+        self.observations = observations
         
         # Actions:
         # 0: Decrease Temperature (More precise)
@@ -43,44 +56,224 @@ class OS1OptimizationEnv(gym.Env):
         elif current_sentiment > 0:
             reward = 0.5 # Sustain
             
-        # Update state randomly to simulate new interaction
-        self.state = np.random.uniform(low=[0,0,-1], high=[1,5,1]).astype(np.float32)
+        # Update state to simulate new interaction
+        if self.observations is not None and len(self.observations):
+            self.state = self.observations[self.np_random.integers(len(self.observations))].astype(np.float32)
+        else:
+            self.state = np.random.uniform(low=[0,0,-1], high=[1,5,1]).astype(np.float32)
         
         return self.state, reward, done, False, {}
 
+def _load_learning_cfg():
+    with open('aios/config/config.yaml', 'r') as f:
+        return yaml.safe_load(f).get('learning', {})
+
+class ExperienceBuffer:
+    """
+    Bounded in-memory buffer of interaction observations.
+    Full batches are flushed as .npy files into a spool directory that the
+    trainer process consumes; if the trainer falls behind, batches are
+    dropped rather than letting the spool grow without bound.
+    """
+    def __init__(self, spool_dir, capacity=10000, flush_size=64, max_spool_files=256):
+        self.logger = logging.getLogger("OS1.RL.Buffer")
+        self.spool_dir = spool_dir
+        self.flush_size = flush_size
+        self.max_spool_files = max_spool_files
+        self._items = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.dropped = 0
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def append(self, observation):
+        batch = None
+        with self._lock:
+            self._items.append(np.asarray(observation, dtype=np.float32))
+            if len(self._items) >= self.flush_size:
+                batch = np.stack(self._items)
+                self._items.clear()
+        if batch is not None:
+            self._flush(batch)
+
+    def _flush(self, batch):
+        if len(glob.glob(os.path.join(self.spool_dir, "*.npy"))) >= self.max_spool_files:
+            self.dropped += len(batch)
+            self.logger.warning(f"Experience spool full, dropped {len(batch)} observations")
+            return
+        path = os.path.join(self.spool_dir, f"exp_{time.time_ns()}.npy")
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, batch)
+        os.replace(path + ".tmp", path)
+
+def latest_policy(policy_dir):
+    """Returns (version, path) of the newest published snapshot, or (0, None)"""
+    try:
+        with open(os.path.join(policy_dir, "LATEST"), "r") as f:
+            version = int(f.read().strip())
+    except (OSError, ValueError):
+        return 0, None
+    return version, os.path.join(policy_dir, f"policy_v{version}.zip")
+
+class PolicyTrainer:
+    """
+    Offline trainer: consumes spooled experience in batches, trains PPO on
+    vectorized OS1OptimizationEnv copies seeded with those observations,
+    and publishes versioned snapshots for the server to hot-swap.
+    Run as its own process: `python -m aios.brain.learning`.
+    """
+    def __init__(self):
+        self.logger = logging.getLogger("OS1.RL.Trainer")
+        cfg = _load_learning_cfg()
+        self.spool_dir = cfg.get('spool_dir', "root/db/rl_experience")
+        self.policy_dir = cfg.get('policy_dir', "root/db/rl_policies")
+        self.min_batch = cfg.get('train_batch', 256)
+        self.n_envs = cfg.get('n_envs', 4)
+        self.timesteps = cfg.get('timesteps_per_round', 2048)
+        self.keep = cfg.get('keep_snapshots', 3)
+        self.poll = cfg.get('poll_interval_s', 5)
+        os.makedirs(self.spool_dir, exist_ok=True)
+        os.makedirs(self.policy_dir, exist_ok=True)
+
+        self.version, path = latest_policy(self.policy_dir)
+        self.model = None
+        if path and os.path.exists(path):
+            self.model = PPO.load(path, env=self._make_envs(None))
+
+    def _make_envs(self, observations):
+        return DummyVecEnv([partial(OS1OptimizationEnv, observations) for _ in range(self.n_envs)])
+
+    def _consume(self):
+        observations = []
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, "*.npy"))):
+            try:
+                observations.append(np.load(path))
+            finally:
+                os.remove(path)
+            if sum(len(o) for o in observations) >= self.min_batch:
+                break
+        return np.concatenate(observations) if observations else np.empty((0, 3), np.float32)
+
+    def train_round(self, observations):
+        envs = self._make_envs(observations)
+        if self.model is None:
+            n_steps = max(64, self.timesteps // self.n_envs)
+            self.model = PPO("MlpPolicy", envs, n_steps=n_steps, batch_size=64, verbose=0)
+        else:
+            self.model.set_env(envs)
+        self.model.learn(total_timesteps=self.timesteps, reset_num_timesteps=False)
+        self.publish()
+
+    def publish(self):
+        """Writes the snapshot, then atomically points LATEST at it"""
+        self.version += 1
+        path = os.path.join(self.policy_dir, f"policy_v{self.version}.zip")
+        self.model.save(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        with open(os.path.join(self.policy_dir, "LATEST.tmp"), "w") as f:
+            f.write(str(self.version))
+        os.replace(os.path.join(self.policy_dir, "LATEST.tmp"), os.path.join(self.policy_dir, "LATEST"))
+        self.logger.info(f"Published policy v{self.version}")
+
+        stale = os.path.join(self.policy_dir, f"policy_v{self.version - self.keep}.zip")
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    def run(self):
+        self.logger.info(f"Trainer watching {self.spool_dir}")
+        pending = []
+        while True:
+            batch = self._consume()
+            if len(batch):
+                pending.append(batch)
+            if sum(len(b) for b in pending) >= self.min_batch:
+                try:
+                    self.train_round(np.concatenate(pending))
+                except Exception as e:
+                    self.logger.error(f"Training round failed: {e}")
+                pending = []
+            else:
+                time.sleep(self.poll)
+
 class RLAgent:
+    """
+    Serving side of the RL loop: records experience and runs cheap policy
+    inference. Training happens in the PolicyTrainer process; new snapshots
+    are loaded in the background and swapped in with a single assignment.
+    """
     def __init__(self):
-        self.env = OS1OptimizationEnv()
-        self.model_path = "root/db/rl_model"
-        
-        if os.path.exists(self.model_path + ".zip"):
-            self.model = PPO.load(self.model_path, env=self.env)
+        self.logger = logging.getLogger("OS1.RL")
+        cfg = _load_learning_cfg()
+        self.cfg = cfg
+        self.policy_dir = cfg.get('policy_dir', "root/db/rl_policies")
+        self.reload_interval = cfg.get('reload_interval_s', 30)
+        self.buffer = ExperienceBuffer(
+            cfg.get('spool_dir', "root/db/rl_experience"),
+            capacity=cfg.get('buffer_size', 10000),
+            flush_size=cfg.get('flush_size', 64),
+            max_spool_files=cfg.get('max_spool_files', 256)
+        )
+        # Observation: [Current Satisfaction (0-1), Avg Response Time, Last Sentiment (-1 to 1)]
+        self.state = np.array([0.5, 1.0, 0.0], dtype=np.float32)
+        self.trainer_process = None
+
+        self.version, path = latest_policy(self.policy_dir)
+        if path and os.path.exists(path):
+            self.model = PPO.load(path, device="cpu")
         else:
-            self.model = PPO("MlpPolicy", self.env, verbose=1)
-            
-    def update_policy(self, user_feedback_score):
+            self.model = PPO("MlpPolicy", OS1OptimizationEnv(), device="cpu", verbose=0)
+        self._last_check = time.monotonic()
+        self._loading = threading.Lock()
+
+    def start_trainer(self):
+        """Spawns the PolicyTrainer as a separate OS process"""
+        if self.trainer_process is None or self.trainer_process.poll() is not None:
+            self.trainer_process = subprocess.Popen([sys.executable, "-m", "aios.brain.learning"])
+            self.logger.info(f"RL trainer started (pid {self.trainer_process.pid})")
+
+    def stop_trainer(self):
+        if self.trainer_process is not None and self.trainer_process.poll() is None:
+            self.trainer_process.terminate()
+
+    def record_interaction(self, user_feedback_score, response_time=1.0, satisfaction=0.5):
         """
-        Run a training step based on real interaction.
+        Logs one interaction for the trainer.
         user_feedback_score: -1 (Bad) to 1 (Good)
         """
-        # Inject current state into env
-        self.env.state[2] = user_feedback_score 
-        
-        # FIX: Ensure we don't overflow the buffer by resetting if near limit
-        # For this prototype, we just learn on a small batch
+        self.state = np.array([satisfaction, response_time, user_feedback_score], dtype=np.float32)
+        self.buffer.append(self.state)
+
+    def update_policy(self, user_feedback_score):
+        """Kept for callers of the old API: records experience, never trains in-process"""
+        self.record_interaction(user_feedback_score)
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._last_check < self.reload_interval:
+            return
+        self._last_check = time.monotonic()
+        version, path = latest_policy(self.policy_dir)
+        if version > self.version and self._loading.acquire(blocking=False):
+            threading.Thread(target=self._swap, args=(version, path), daemon=True).start()
+
+    def _swap(self, version, path):
         try:
-            self.model.learn(total_timesteps=2048, reset_num_timesteps=False) 
-            self.model.save(self.model_path)
+            model = PPO.load(path, device="cpu")
+            self.model, self.version = model, version
+            self.logger.info(f"Hot-swapped RL policy v{version}")
         except Exception as e:
-            # If buffer issues occur, we just reset the model for the next run 
-            # (common in stateless web-request architectures)
-            self.logger.warning(f"RL Update skipped this turn: {e}")
+            self.logger.warning(f"RL policy v{version} not loaded: {e}")
+        finally:
+            self._loading.release()
         
     def get_optimization_action(self):
-        action, _ = self.model.predict(self.env.state)
+        self._maybe_reload()
+        action, _ = self.model.predict(self.state)
         # FIX: Convert numpy array to standard python int
         if isinstance(action, np.ndarray):
             action = action.item()
             
         actions_map = {0: "Decr Temp", 1: "Incr Temp", 2: "Decr Verbosity", 3: "Incr Verbosity"}
-        return actions_map[int(action)]
\ No newline at end of file
+        return actions_map[int(action)]
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    PolicyTrainer().run()
@@ -0,0 +1,76 @@
+import threading
+import logging
+from collections import OrderedDict
+
+class PrefixCache:
+    """
+    LRU store of evaluated prompt prefixes (llama.cpp KV state snapshots),
+    bounded by the total size of the saved states.
+    A snapshot can be loaded into any context of the same model, so one
+    entry per specialist is shared by the whole context pool.
+    """
+    def __init__(self, max_bytes):
+        self.logger = logging.getLogger("OS1.PrefixCache")
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (prefix_tokens, state)
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, tokens, state):
+        size = state.llama_state_size
+        if size > self.max_bytes:
+            self.logger.warning(f"Prefix state for '{key}' ({size} bytes) exceeds the cache cap")
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size_bytes -= self._entries.pop(key)[1].llama_state_size
+            self._entries[key] = (tokens, state)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                evicted, (_, old) = self._entries.popitem(last=False)
+                self.size_bytes -= old.llama_state_size
+                self.logger.info(f"Evicted prefix state '{evicted}'")
+
+    def restore(self, llm, key, prefix_tokens):
+        """
+        Makes `llm` start from the evaluated `prefix_tokens`, so the next
+        completion only decodes the per-request suffix. The snapshot is
+        evaluated and stored on first use.
+        """
+        n = len(prefix_tokens)
+        # The context may still hold this prefix from its previous request
+        if llm.n_tokens >= n and list(llm.input_ids[:n]) == prefix_tokens:
+            with self._lock:
+                self.hits += 1
+            return
+
+        entry = self.get(key)
+        if entry is not None and entry[0] == prefix_tokens:
+            llm.load_state(entry[1])
+            return
+
+        llm.reset()
+        llm.eval(prefix_tokens)
+        self.put(key, prefix_tokens, llm.save_state())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
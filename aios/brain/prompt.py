@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+
+from aios.memory.vector_ingest import normalize_text
+
+# Llama 3.1 chat template, rendered here rather than by llama.cpp so the
+# system prefix tokenizes identically on every request. The tokenizer adds
+# <|begin_of_text|> itself.
+LLAMA3_SYSTEM = "<|start_header_id|>system<|end_header_id|>\n\n{content}<|eot_id|>"
+LLAMA3_TURN = (
+    "<|start_header_id|>user<|end_header_id|>\n\n{user}<|eot_id|>"
+    "<|start_header_id|>assistant<|end_header_id|>\n\n{assistant}<|eot_id|>"
+)
+LLAMA3_USER = (
+    "<|start_header_id|>user<|end_header_id|>\n\n{content}<|eot_id|>"
+    "<|start_header_id|>assistant<|end_header_id|>\n\n"
+)
+LLAMA3_STOP = ["<|eot_id|>"]
+
+SECTIONS = ("tools", "history", "context")
+
+class TokenCounter:
+    """
+    Token counts from the model's own tokenizer, memoized per text. Personas,
+    template fragments, history turns and retrieved items recur across
+    requests, so most pieces of a prompt are counted once.
+    """
+    def __init__(self, tokenize, max_entries=4096):
+        self.tokenize = tokenize
+        self.max_entries = max_entries
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, text):
+        with self._lock:
+            count = self._counts.get(text)
+            if count is not None:
+                self._counts.move_to_end(text)
+                self.hits += 1
+                return count
+            self.misses += 1
+        count = len(self.tokenize(text))
+        with self._lock:
+            self._counts[text] = count
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return count
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._counts), "hits": self.hits, "misses": self.misses}
+
+class PromptAssembler:
+    """
+    Builds the Llama 3 prompt inside a fixed token budget. The persona and
+    the user's input always go in; tool output, conversation history and
+    retrieved context are then added in `priority` order, each section up
+    to its own cap, until the budget is spent. History is taken newest
+    first and stops at the first turn that doesn't fit, so it stays
+    contiguous; tool and context items that don't fit are skipped.
+    Counts are summed per piece, which can differ from tokenizing the
+    whole prompt by a token or so at piece boundaries; `margin` absorbs it.
+    """
+    def __init__(self, tokenize, ctx_size, cfg):
+        self.count = TokenCounter(tokenize, cfg.get('count_cache_size', 4096))
+        self.reserve = cfg.get('reserve_tokens', 512)
+        self.margin = cfg.get('margin_tokens', 16)
+        self.budget = min(cfg.get('max_prompt_tokens', ctx_size), ctx_size - self.reserve) - self.margin
+        self.max_input = cfg.get('max_input_tokens', 512)
+        self.priority = cfg.get('priority', list(SECTIONS))
+        self.caps = cfg.get('sections', {})
+
+    def _fit_input(self, text):
+        """Cuts user input that alone would crowd out everything else"""
+        tokens = self.count(text)
+        if tokens <= self.max_input:
+            return text, tokens, False
+        text = text[:int(len(text) * self.max_input / tokens)]
+        while text and self.count(text) > self.max_input:
+            text = text[:int(len(text) * 0.9)]
+        return text, self.count(text), True
+
+    def assemble(self, persona, user_input, emotion_state, history=(), context=(), tools=()):
+        """
+        Returns (prefix, prompt, report). `history` is [(user, assistant)]
+        oldest first; `context` and `tools` are lists of text items.
+        """
+        prefix = LLAMA3_SYSTEM.format(content=persona)
+        user_input, _, truncated = self._fit_input(user_input)
+        header = f"Current Emotional State: {emotion_state}\nUser Input: {user_input}"
+        fixed = self.count(prefix) + self.count(LLAMA3_USER.format(content="Current Context: \n" + header))
+        remaining = self.budget - fixed
+
+        # Retrieved items that repeat a history turn or each other add nothing
+        seen = {normalize_text(f"User: {u}\nOS1: {a}") for u, a in history}
+        unique = []
+        for item in context:
+            key = normalize_text(item)
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(item)
+
+        candidates = {
+            "tools": [(item, self.count(item + "\n")) for item in tools],
+            "history": [((u, a), self.count(LLAMA3_TURN.format(user=u, assistant=a))) for u, a in reversed(history)],
+            "context": [(item, self.count(item + "\n")) for item in unique]
+        }
+        chosen = {section: [] for section in SECTIONS}
+        used = {section: 0 for section in SECTIONS}
+        for section in self.priority:
+            cap = self.caps.get(section)
+            for item, tokens in candidates[section]:
+                fits = tokens <= remaining and (cap is None or used[section] + tokens <= cap)
+                if not fits:
+                    if section == "history":
+                        break
+                    continue
+                chosen[section].append(item)
+                used[section] += tokens
+                remaining -= tokens
+
+        turns = "".join(LLAMA3_TURN.format(user=u, assistant=a) for u, a in reversed(chosen["history"]))
+        lines = "".join(item + "\n" for item in chosen["tools"] + chosen["context"])
+        prompt = prefix + turns + LLAMA3_USER.format(content=f"Current Context: {lines}\n{header}")
+        report = {
+            "budget": self.budget,
+            "tokens": self.budget - remaining,
+            "sections": {"fixed": fixed, **used},
+            "dropped": {section: len(candidates[section]) - len(chosen[section]) for section in SECTIONS},
+            "input_truncated": truncated
+        }
+        return prefix, prompt, report
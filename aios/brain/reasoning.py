@@ -1,27 +1,111 @@
-import pymc as pm
 import numpy as np
 import logging
+import threading
+import yaml
+from scipy import stats
+
+# Prior: We assume average confidence
+PRIOR_ALPHA = 2.0
+PRIOR_BETA = 2.0
+
+def observed_successes(complexity_scores):
+    """
+    Likelihood: Based on complexity (0.0 to 1.0), the number of successful
+    Bernoulli observations (higher complexity = fewer). Matches
+    int(10 * (1 - complexity)) elementwise.
+    """
+    n = np.trunc(10 * (1 - np.asarray(complexity_scores, dtype=np.float64)))
+    return np.clip(n, 0, None)
+
+class ConjugateConfidence:
+    """
+    Closed-form posterior for the Beta-Bernoulli confidence model.
+    With n all-success observations the posterior is Beta(alpha + n, beta),
+    so MAP, mean and credible intervals need no sampler or optimizer.
+    Every method accepts a scalar or an array of complexity scores.
+    """
+    def __init__(self, alpha=PRIOR_ALPHA, beta=PRIOR_BETA):
+        self.alpha = alpha
+        self.beta = beta
+
+    def posterior_params(self, complexity_scores):
+        a = self.alpha + observed_successes(complexity_scores)
+        b = np.full_like(a, self.beta)
+        return a, b
+
+    def map_estimate(self, complexity_scores):
+        a, b = self.posterior_params(complexity_scores)
+        return (a - 1) / (a + b - 2)
+
+    def summarize(self, complexity_scores, credible_mass=0.94):
+        """MAP, posterior mean and equal-tailed credible interval"""
+        a, b = self.posterior_params(complexity_scores)
+        tail = (1 - credible_mass) / 2
+        return {
+            "map": (a - 1) / (a + b - 2),
+            "mean": a / (a + b),
+            "lower": stats.beta.ppf(tail, a, b),
+            "upper": stats.beta.ppf(1 - tail, a, b)
+        }
+
+class PyMCConfidence:
+    """
+    Opt-in PyMC path for experimenting with non-conjugate variants.
+    Models are built once per observation count and their MAP is memoized,
+    since the model is fully determined by that count.
+    """
+    def __init__(self, alpha=PRIOR_ALPHA, beta=PRIOR_BETA):
+        import pymc as pm
+        self.pm = pm
+        self.alpha = alpha
+        self.beta = beta
+        self._models = {}
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def _model(self, n_obs):
+        pm = self.pm
+        with pm.Model() as model:
+            confidence = pm.Beta('confidence', alpha=self.alpha, beta=self.beta)
+            pm.Bernoulli('p_success', p=confidence, observed=[1] * n_obs)
+        return model
+
+    def map_estimate(self, complexity_scores):
+        counts = observed_successes(complexity_scores).astype(int)
+        out = np.empty(counts.shape, dtype=np.float64)
+        for idx, n_obs in np.ndenumerate(counts):
+            with self._lock:
+                if n_obs not in self._maps:
+                    model = self._models.setdefault(n_obs, self._model(n_obs))
+                    # In production, we'd use MCMC, but map_estimate is faster for realtime
+                    estimate = self.pm.find_MAP(model=model, progressbar=False)
+                    self._maps[n_obs] = float(estimate['confidence'])
+                out[idx] = self._maps[n_obs]
+        return out
 
 class BayesianDecision:
     def __init__(self):
         self.logger = logging.getLogger("OS1.Bayes")
+        with open('aios/config/config.yaml', 'r') as f:
+            self.cfg = yaml.safe_load(f)
+
+        engine = self.cfg.get('reasoning', {}).get('engine', 'conjugate')
+        self.conjugate = ConjugateConfidence()
+        self.engine = PyMCConfidence() if engine == 'pymc' else self.conjugate
+        self.logger.info(f"Confidence engine: {engine}")
 
     def assess_confidence(self, context_length, complexity_score):
         """
         Uses Bayesian Inference to decide if OS1 should answer directly
         or ask clarifying questions based on uncertainty.
         """
-        with pm.Model() as model:
-            # Prior: We assume average confidence
-            confidence = pm.Beta('confidence', alpha=2, beta=2)
-            
-            # Likelihood: Based on context length (longer = harder)
-            # and complexity (0.0 to 1.0)
-            # This is a simplified probabilistic model
-            p_success = pm.Bernoulli('p_success', p=confidence, observed=[1] * int(10 * (1 - complexity_score)))
-            
-            # Inference
-            # In production, we'd use MCMC, but map_estimate is faster for realtime
-            map_estimate = pm.find_MAP()
-            
-        return float(map_estimate['confidence'])
\ No newline at end of file
+        return float(self.engine.map_estimate(complexity_score))
+
+    def assess_confidence_batch(self, complexity_scores):
+        """Scores many requests at once; returns an array of MAP estimates"""
+        return self.engine.map_estimate(complexity_scores)
+
+    def posterior_summary(self, complexity_score, credible_mass=0.94):
+        """MAP, mean and credible interval for a single request"""
+        summary = self.conjugate.summarize(complexity_score, credible_mass)
+        return {key: float(value) for key, value in summary.items()}
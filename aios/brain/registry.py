@@ -0,0 +1,102 @@
+import threading
+import logging
+from collections import OrderedDict
+
+from aios.brain.specialists import DomainSpecialist
+
+# Basic logic rules for the OS, kept in their own module
+CORE_MODULE = "os1_core"
+CORE_RULES = [
+    "critical_system(kernel)",
+    "critical_system(memory)",
+    "can_modify(root, X) :- critical_system(X)"
+]
+
+class SpecialistRegistry:
+    """
+    Loads every specialist once at startup: its persona prompt and its rule
+    set, asserted into a Prolog module named after the domain. Requests look
+    specialists up by mode instead of switching shared brain state, and rule
+    sets are only re-asserted through reload(), which retracts first, so the
+    fact count never grows with traffic.
+    Symbolic queries are memoized per (module, goal) and the memo is cleared
+    whenever any rule set changes.
+    """
+    def __init__(self, prolog, memo_size=4096):
+        self.logger = logging.getLogger("OS1.Registry")
+        self.prolog = prolog
+        self.memo_size = memo_size
+        # pyswip shares one engine; serialize access to it
+        self._lock = threading.RLock()
+        self._memo = OrderedDict()
+        self._functors = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+        self.specialists = {domain: DomainSpecialist(domain) for domain in DomainSpecialist.DOMAINS}
+        self.reload(CORE_MODULE, CORE_RULES)
+        for domain, specialist in self.specialists.items():
+            self.reload(domain, specialist.get_symbolic_rules())
+        self.logger.info(f"Loaded {len(self.specialists)} specialists, {self.fact_count()} clauses")
+
+    def get(self, mode):
+        """Returns the preloaded specialist for `mode` (general if unknown)"""
+        return self.specialists.get(mode, self.specialists["general"])
+
+    def _functor(self, clause):
+        """Name/arity of a clause's head, as parsed by Prolog itself"""
+        solution = next(iter(self.prolog.query(
+            f"C = ({clause}), (C = (H :- _) -> true ; H = C), functor(H, N, A)"
+        )))
+        return str(solution["N"]), int(solution["A"])
+
+    def reload(self, module, rules):
+        """Replaces a module's rule set; safe to call repeatedly"""
+        with self._lock:
+            functors = {self._functor(rule) for rule in rules}
+            for name, arity in functors | self._functors.get(module, set()):
+                list(self.prolog.query(f"functor(H, {name}, {arity}), retractall({module}:H)"))
+            for rule in rules:
+                self.prolog.assertz(f"{module}:({rule})")
+            self._functors[module] = functors
+            self._memo.clear()
+
+    def query(self, module, goal):
+        """Memoized solutions of `module:goal` as a list of {var: str} dicts"""
+        key = (module, goal)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return self._memo[key]
+            self.memo_misses += 1
+            solutions = [
+                {var: str(value) for var, value in solution.items()}
+                for solution in self.prolog.query(f"{module}:({goal})")
+            ]
+            self._memo[key] = solutions
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+            return solutions
+
+    def fact_count(self, module=None):
+        """Clauses currently asserted for one module, or all of them"""
+        modules = [module] if module else list(self._functors)
+        total = 0
+        with self._lock:
+            for mod in modules:
+                for name, arity in self._functors.get(mod, ()):
+                    for solution in self.prolog.query(
+                        f"functor(H, {name}, {arity}), predicate_property({mod}:H, number_of_clauses(C))"
+                    ):
+                        total += int(solution["C"])
+        return total
+
+    def stats(self):
+        with self._lock:
+            return {
+                "specialists": len(self.specialists),
+                "memo_entries": len(self._memo),
+                "memo_hits": self.memo_hits,
+                "memo_misses": self.memo_misses
+            }
@@ -0,0 +1,60 @@
+import yaml
+import logging
+
+from aios.runtime.automaton import PatternAutomaton
+
+class IntentRouter:
+    """
+    Single-pass intent and tool classifier. Every domain keyword and tool
+    trigger from config.yaml's `routing` section is compiled into one
+    automaton, so classification cost depends on the length of the text and
+    not on how many domains or tools are configured.
+    Keywords match on word boundaries; a trailing '*' makes a keyword a
+    prefix ("hack*" also matches "hacker").
+    """
+    def __init__(self, routing_cfg=None):
+        self.logger = logging.getLogger("OS1.Router")
+        if routing_cfg is None:
+            with open('aios/config/config.yaml', 'r') as f:
+                routing_cfg = yaml.safe_load(f).get('routing', {})
+        self.default_mode = routing_cfg.get('default_mode', 'general')
+        self.min_score = routing_cfg.get('min_score', 1.0)
+        self.automaton = PatternAutomaton()
+        # Config order breaks ties, as the original if/elif chain did
+        self.modes = []
+        for mode, spec in (routing_cfg.get('domains') or {}).items():
+            self.modes.append(mode)
+            weight = spec.get('weight', 1.0)
+            for keyword in spec.get('keywords', []):
+                self._add(keyword, ("mode", mode, weight))
+        for tool, triggers in (routing_cfg.get('tools') or {}).items():
+            for trigger in triggers:
+                self._add(trigger, ("tool", tool, 1.0))
+        self.automaton.build()
+        self.logger.info(f"Compiled {self.automaton.pattern_count} routing patterns")
+
+    def _add(self, keyword, value):
+        keyword = keyword.casefold()
+        prefix = keyword.endswith("*")
+        self.automaton.add(keyword.rstrip("*"), value, prefix=prefix)
+
+    def route(self, text):
+        """
+        Returns {"mode", "scores", "tools"}: the winning specialist, the score
+        of every domain that matched, and the tools whose triggers appeared.
+        """
+        scores = {}
+        tools = []
+        for _, _, (kind, name, weight) in self.automaton.finditer(text.casefold()):
+            if kind == "mode":
+                scores[name] = scores.get(name, 0.0) + weight
+            elif name not in tools:
+                tools.append(name)
+
+        mode = self.default_mode
+        best = 0.0
+        for candidate in self.modes:
+            score = scores.get(candidate, 0.0)
+            if score >= self.min_score and score > best:
+                mode, best = candidate, score
+        return {"mode": mode, "scores": scores, "tools": tools}
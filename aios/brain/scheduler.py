@@ -0,0 +1,147 @@
+import heapq
+import itertools
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+# Lower rank is served first. Interactive traffic always beats batch work,
+# and audio (a user waiting on a voice reply) beats background jobs.
+PRIORITIES = {
+    "audio": 0,
+    "interactive": 1,
+    "batch": 2,
+    "background": 3
+}
+
+def capacity_for(sched_cfg):
+    """Requests an InferenceScheduler built from `sched_cfg` can hold (running + queued)"""
+    return sched_cfg.get('contexts', 1) + sched_cfg.get('max_queue_depth', 16)
+
+class SchedulerRejected(Exception):
+    """Base class for requests the scheduler refuses instead of queueing"""
+    status_code = 503
+
+class QueueFullError(SchedulerRejected):
+    status_code = 429
+
+class DeadlineExceededError(SchedulerRejected):
+    status_code = 503
+
+class Lease:
+    """A context checked out of the pool, with its wait/generation timings"""
+    def __init__(self, llm, queue_wait):
+        self.llm = llm
+        self.queue_wait = queue_wait
+        self.generation_time = 0.0
+        # Filled in by the caller while it decodes
+        self.first_token_time = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def timings(self):
+        timings = {
+            "queue_wait_ms": round(self.queue_wait * 1000, 2),
+            "generation_ms": round(self.generation_time * 1000, 2),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens
+        }
+        if self.first_token_time is not None:
+            timings["first_token_ms"] = round(self.first_token_time * 1000, 2)
+        return timings
+
+class InferenceScheduler:
+    """
+    Hands out a pool of llama.cpp contexts in priority order.
+    Waiters are kept in a heap ordered by (priority, arrival); a request is
+    rejected up-front when the queue is full or its deadline cannot be met,
+    and dropped from the queue if its deadline passes while waiting.
+    """
+    def __init__(self, factory, pool_size=1, max_queue_depth=16, default_deadline_ms=30000):
+        self.logger = logging.getLogger("OS1.Scheduler")
+        self.pool_size = pool_size
+        self.max_queue_depth = max_queue_depth
+        self.default_deadline = default_deadline_ms / 1000.0
+
+        self.contexts = [factory() for _ in range(pool_size)]
+        self._idle = list(self.contexts)
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        # Running estimate of how long a context stays checked out
+        self._avg_generation = 0.0
+        self.served = 0
+        self.rejected = {"queue_full": 0, "deadline": 0}
+        self.logger.info(f"Inference pool ready: {pool_size} context(s), queue depth {max_queue_depth}")
+
+    @property
+    def capacity(self):
+        """Most requests that can be running or waiting at once"""
+        return self.pool_size + self.max_queue_depth
+
+    def _reject(self, reason, error):
+        self.rejected[reason] += 1
+        raise error
+
+    def _estimated_wait(self, rank):
+        ahead = sum(1 for entry in self._heap if entry[0] <= rank)
+        if self._idle and ahead == 0:
+            return 0.0
+        return (ahead // self.pool_size + 1) * self._avg_generation
+
+    @contextmanager
+    def acquire(self, priority="interactive", deadline_ms=None):
+        """
+        Blocks until a context is free for this request, then yields a Lease.
+        Raises QueueFullError / DeadlineExceededError instead of piling up.
+        """
+        rank = PRIORITIES.get(priority, PRIORITIES["interactive"])
+        budget = deadline_ms / 1000.0 if deadline_ms else self.default_deadline
+        enqueued = time.monotonic()
+        deadline = enqueued + budget
+
+        with self._cond:
+            if len(self._heap) >= self.max_queue_depth:
+                self._reject("queue_full", QueueFullError("Inference queue is full"))
+            if self._estimated_wait(rank) > budget:
+                self._reject("deadline", DeadlineExceededError("Deadline cannot be met at current load"))
+
+            entry = (rank, next(self._seq))
+            heapq.heappush(self._heap, entry)
+            while not (self._idle and self._heap[0] == entry):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._heap.remove(entry)
+                    heapq.heapify(self._heap)
+                    self._cond.notify_all()
+                    self._reject("deadline", DeadlineExceededError("Deadline exceeded while queued"))
+                self._cond.wait(remaining)
+            heapq.heappop(self._heap)
+            llm = self._idle.pop()
+            # Another context may still be idle for the next waiter
+            self._cond.notify_all()
+
+        lease = Lease(llm, time.monotonic() - enqueued)
+        start = time.monotonic()
+        try:
+            yield lease
+        finally:
+            lease.generation_time = time.monotonic() - start
+            with self._cond:
+                self._idle.append(llm)
+                self.served += 1
+                self._avg_generation += 0.2 * (lease.generation_time - self._avg_generation)
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "contexts": self.pool_size,
+                "busy": self.pool_size - len(self._idle),
+                "queue_depth": len(self._heap),
+                "max_queue_depth": self.max_queue_depth,
+                "avg_generation_ms": round(self._avg_generation * 1000, 2),
+                "served": self.served,
+                "rejected": dict(self.rejected)
+            }
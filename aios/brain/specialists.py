@@ -1,6 +1,8 @@
 import logging
 
 class DomainSpecialist:
+    DOMAINS = ("medicine", "law", "cybersecurity", "general")
+
     def __init__(self, domain):
         self.domain = domain
         self.logger = logging.getLogger(f"OS1.Specialist.{domain}")
@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import queue
+import threading
+import logging
+from datetime import datetime, timezone
+
+SCHEMA = [
+    "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE",
+    "CREATE INDEX interaction_timestamp IF NOT EXISTS FOR (i:Interaction) ON (i.timestamp)",
+]
+
+# One transaction per batch; the uniqueness constraint backs the MERGE with an index
+BATCH_QUERY = """
+UNWIND $rows AS row
+MERGE (u:User {id: row.user_id})
+CREATE (i:Interaction {
+    input: row.input,
+    response: row.response,
+    emotion: row.emotion,
+    timestamp: datetime(row.timestamp)
+})
+CREATE (u)-[:EXPERIENCED]->(i)
+"""
+
+class EpisodicWriter:
+    """
+    Write-behind queue for episodic memories.
+    Interactions are queued and a background thread writes them as UNWIND
+    batches once `batch_size` rows are waiting or `flush_interval_s` has
+    passed. When the queue is full, callers block for at most
+    `enqueue_timeout_s` (backpressure); after that rows go to the local
+    spool file if one is configured, otherwise they are dropped and counted.
+    Spooled rows are replayed once Neo4j keeps up again.
+    """
+    def __init__(self, driver, batch_size=100, flush_interval_s=0.5, max_queue=10000,
+                 enqueue_timeout_s=0.05, max_retries=3, spool_path=None):
+        self.logger = logging.getLogger("OS1.Memory.Episodic")
+        self.driver = driver
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_s
+        self.enqueue_timeout = enqueue_timeout_s
+        self.max_retries = max_retries
+        self.spool_path = spool_path
+        if spool_path:
+            os.makedirs(os.path.dirname(spool_path) or ".", exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._spool_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.written = 0
+        self.batches = 0
+        self.spooled = 0
+        self.dropped = 0
+        self.failures = 0
+
+        self._thread = threading.Thread(target=self._run, name="os1-episodic-writer", daemon=True)
+        self._thread.start()
+
+    def ensure_schema(self):
+        """Creates the per-user uniqueness constraint and timestamp index"""
+        with self.driver.session() as session:
+            for statement in SCHEMA:
+                session.run(statement)
+
+    def submit(self, user_id, user_input, agent_response, emotion):
+        """Queues one interaction; returns False if it had to be dropped"""
+        row = {
+            "user_id": user_id,
+            "input": user_input,
+            "response": agent_response,
+            "emotion": emotion,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            return self._overflow([row])
+
+    def _overflow(self, rows):
+        if self.spool_path:
+            with self._spool_lock, open(self.spool_path, "a") as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+            self.spooled += len(rows)
+            return True
+        self.dropped += len(rows)
+        self.logger.warning(f"Episodic queue full, dropped {len(rows)} interaction(s)")
+        return False
+
+    def _write(self, rows):
+        for attempt in range(self.max_retries):
+            try:
+                with self.driver.session() as session:
+                    session.execute_write(lambda tx: tx.run(BATCH_QUERY, rows=rows).consume())
+                self.written += len(rows)
+                self.batches += 1
+                return True
+            except Exception as e:
+                self.failures += 1
+                self.logger.warning(f"Episodic batch of {len(rows)} failed (attempt {attempt + 1}): {e}")
+                time.sleep(min(2 ** attempt * 0.1, 2.0))
+        return False
+
+    def _next_batch(self):
+        try:
+            rows = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(rows) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return rows
+
+    def _replay_spool(self):
+        """
+        Moves the spool aside atomically, then writes it back in batches.
+        A `.replaying` file left behind by a crash mid-replay is finished
+        first (at-least-once: rows written before the crash are written again).
+        """
+        replaying = self.spool_path + ".replaying"
+        with self._spool_lock:
+            if not os.path.exists(replaying):
+                if not os.path.exists(self.spool_path):
+                    return
+                os.replace(self.spool_path, replaying)
+        rows = []
+        with open(replaying, "r") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    pass  # blank, or torn by the crash that interrupted a spool write
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            if not self._write(batch):
+                self._overflow(rows[i:])
+                break
+        os.remove(replaying)
+        self.logger.info(f"Replayed {len(rows)} spooled interaction(s)")
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            rows = self._next_batch()
+            if rows:
+                if not self._write(rows):
+                    self._overflow(rows)
+                for _ in rows:
+                    self._queue.task_done()
+            elif self.spool_path:
+                self._replay_spool()
+
+    def flush(self):
+        """Blocks until everything queued so far has been written or spooled"""
+        self._queue.join()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "spooled": self.spooled,
+            "dropped": self.dropped,
+            "failures": self.failures
+        }
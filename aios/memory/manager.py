@@ -1,11 +1,18 @@
 import redis
 from neo4j import GraphDatabase
 import chromadb
+from chromadb.utils import embedding_functions
 import json
 import logging
 import yaml
 from datetime import datetime
 
+from aios.memory.episodic_writer import EpisodicWriter
+from aios.memory.vector_ingest import EmbeddingCache, CachedEmbedder, VectorIngestor, visible_to
+from aios.memory.retrieval import TieredRetriever
+from aios.memory.response_cache import ResponseCache
+from aios.memory.sessions import SessionStore
+
 class MemoryManager:
     def __init__(self):
         with open('aios/config/config.yaml', 'r') as f:
@@ -24,31 +31,92 @@ class MemoryManager:
             auth=(self.cfg['memory']['neo4j_user'], self.cfg['memory']['neo4j_pass'])
         )
 
+        self.logger = logging.getLogger("OS1.Memory")
+        episodic_cfg = self.cfg['memory'].get('episodic', {})
+        self.episodic = EpisodicWriter(
+            self.neo4j,
+            batch_size=episodic_cfg.get('batch_size', 100),
+            flush_interval_s=episodic_cfg.get('flush_interval_s', 0.5),
+            max_queue=episodic_cfg.get('max_queue', 10000),
+            enqueue_timeout_s=episodic_cfg.get('enqueue_timeout_s', 0.05),
+            spool_path=episodic_cfg.get('spool_path')
+        )
+        try:
+            self.episodic.ensure_schema()
+        except Exception as e:
+            self.logger.error(f"Could not create Neo4j constraints/indexes: {e}")
+
         # 3. Semantic Vector (Chroma)
         self.chroma = chromadb.PersistentClient(path="./root/db/chroma")
         self.vector_col = self.chroma.get_or_create_collection("os1_knowledge")
 
+        # Embeddings are computed here (same default model the collection uses)
+        # so ingestion and queries share one cache
+        vector_cfg = self.cfg['memory'].get('vector', {})
+        self.embedder = CachedEmbedder(
+            embedding_functions.DefaultEmbeddingFunction(),
+            EmbeddingCache(vector_cfg.get('embedding_cache_size', 10000))
+        )
+        self.ingestor = VectorIngestor(
+            self.vector_col,
+            self.embedder,
+            batch_size=vector_cfg.get('batch_size', 64),
+            flush_interval_s=vector_cfg.get('flush_interval_s', 1.0),
+            max_queue=vector_cfg.get('max_queue', 10000)
+        )
+
+        # 4. Tiered async retrieval across all three stores
+        self.retriever = TieredRetriever(self.cfg, self.vector_col, self.embedder)
+
+        # 5. Semantic reply cache, sharing the retriever's Redis pool and the embedder
+        self.response_cache = ResponseCache(self.retriever.redis, self.embedder, self.cfg.get('response_cache', {}))
+
+        # 6. Per-user conversation sessions, spilled to Redis when idle
+        self.sessions = SessionStore(self.retriever.redis, self.cfg.get('sessions', {}))
+
     def add_short_term(self, key, value):
         self.redis.setex(key, 3600, json.dumps(value)) # Expire in 1 hour
 
-    def add_episodic_memory(self, user_input, agent_response, emotion):
-        """Stores interaction in the Knowledge Graph"""
-        query = """
-        MERGE (u:User {name: 'Primary'})
-        CREATE (i:Interaction {
-            input: $inp, 
-            response: $resp, 
-            emotion: $emo, 
-            timestamp: datetime()
-        })
-        MERGE (u)-[:EXPERIENCED]->(i)
+    def add_episodic_memory(self, user_input, agent_response, emotion, user_id="Primary"):
+        """Stores interaction in the Knowledge Graph (batched, write-behind)"""
+        self.ingestor.add_interaction(user_id, user_input, agent_response)
+        return self.episodic.submit(user_id, user_input, agent_response, emotion)
+
+    def add_documents(self, documents, metadatas=None, ids=None):
+        """Queues documents for batched embedding + upsert into os1_knowledge"""
+        self.ingestor.add_documents(documents, metadatas, ids)
+
+    async def retrieve_tiered(self, user_id, text_query, budget_ms=None, items=None, sources=None):
         """
-        with self.neo4j.session() as session:
-            session.run(query, inp=user_input, resp=agent_response, emo=emotion)
+        Concurrent Redis / Chroma / Neo4j retrieval bounded by a latency
+        budget. Returns (context, per-tier report).
+        """
+        return await self.retriever.retrieve(user_id, text_query, budget_ms, items, sources)
+
+    async def record_turn(self, user_id, user_input, agent_response):
+        """Adds a finished turn to the user's session and Redis hot window"""
+        await self.sessions.append(user_id, user_input, agent_response)
+        await self.retriever.record_turn(user_id, user_input, agent_response)
 
-    def retrieve_context(self, text_query):
-        """Vector search for relevant past facts"""
-        results = self.vector_col.query(query_texts=[text_query], n_results=3)
+    async def history(self, user_id):
+        """The user's session turns as [(user_input, response)], oldest first"""
+        return await self.sessions.history(user_id)
+
+    async def aclose(self):
+        await self.sessions.aclose()
+        await self.retriever.close()
+
+    def close(self):
+        self.episodic.close()
+        self.neo4j.close()
+
+    def retrieve_context(self, text_query, user_id=None):
+        """Vector search for relevant past facts; other users' interactions are never returned"""
+        results = self.vector_col.query(
+            query_embeddings=self.embedder([text_query]),
+            n_results=3,
+            where=visible_to(user_id)
+        )
         if results['documents']:
             return " ".join(results['documents'][0])
         return ""
\ No newline at end of file
@@ -0,0 +1,217 @@
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import logging
+import threading
+import numpy as np
+
+from aios.memory.vector_ingest import normalize_text
+
+class CacheLookup:
+    """
+    Outcome of one ResponseCache.lookup(). Carries the bucket and query
+    embedding along so a miss can be stored without embedding again.
+    """
+    def __init__(self, status, mode=None, bucket=None, embedding=None, query=None, ttl_s=0):
+        self.status = status  # hit / miss / bypass / disabled / error
+        self.reason = None
+        self.scope = None  # shared / user
+        self.mode = mode
+        self.bucket = bucket
+        self.embedding = embedding
+        self.query = query
+        self.ttl_s = ttl_s
+        self.response = None
+        self.similarity = None
+        self.saved_ms = None
+        self.lookup_ms = None
+
+    @property
+    def hit(self):
+        return self.status == "hit"
+
+    def report(self, hit_rate=None):
+        report = {"status": self.status, "lookup_ms": self.lookup_ms}
+        if self.scope:
+            report["scope"] = self.scope
+        if self.reason:
+            report["reason"] = self.reason
+        if self.similarity is not None:
+            report["similarity"] = round(self.similarity, 4)
+        if self.saved_ms is not None:
+            report["saved_ms"] = self.saved_ms
+        if hit_rate is not None:
+            report["hit_rate"] = hit_rate
+        return report
+
+class ResponseCache:
+    """
+    Semantic cache of finished replies, consulted before generation.
+    Entries are grouped in Redis hashes per (specialist mode, context
+    fingerprint), so a reply is only reused when it was generated from the
+    same knowledge and tool output; within a bucket the closest cached query
+    wins if its cosine similarity clears the threshold. Replies built only
+    from shared documents are shared by every user; replies that drew on a
+    user's private memory are kept to that user. Domains can bypass the
+    cache or set their own TTL and threshold.
+    """
+    def __init__(self, redis, embedder, cfg):
+        self.logger = logging.getLogger("OS1.Memory.ResponseCache")
+        self.redis = redis
+        self.embedder = embedder
+        self.enabled = cfg.get('enabled', False)
+        self.threshold = cfg.get('threshold', 0.95)
+        self.ttl_s = cfg.get('ttl_s', 3600)
+        self.max_entries = cfg.get('max_entries', 64)
+        self.version = str(cfg.get('version', 1))
+        self.domains = cfg.get('domains') or {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.errors = 0
+        self.stores = 0
+        self.saved_ms = 0.0
+
+    def _rules(self, mode):
+        rules = self.domains.get(mode) or {}
+        return (rules.get('bypass', False),
+                rules.get('ttl_s', self.ttl_s),
+                rules.get('threshold', self.threshold))
+
+    def fingerprint(self, scope, documents, tools, emotion_state):
+        """
+        The request state besides the query that shapes the reply: the
+        shared documents retrieved (by ID), tool output and emotional state,
+        within a scope: "shared", or the user when their private memory
+        (session, hot turns, episodes, own interactions) was in the prompt,
+        so their answers never reach anyone else. Conversation turns are
+        left out on purpose: every turn adds one, so keying on them would
+        never let a reply be reused. The TTL bounds how stale it can get.
+        """
+        digest = hashlib.blake2b(digest_size=12)
+        tool_lines = [f"{name}={normalize_text(str(output))}" for name, output in sorted((tools or {}).items())]
+        for part in (self.version, scope, emotion_state or "", *sorted(documents or ()), "", *tool_lines):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _bucket(self, mode, fingerprint):
+        return f"os1:rcache:{mode}:{fingerprint}"
+
+    def _embed(self, text):
+        vector = np.asarray(self.embedder([text])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, value in deltas.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    async def lookup(self, mode, query, user_id, sources, emotion_state, tools=None, private=False):
+        """
+        Returns a CacheLookup; lookup.response is set on a hit. `sources` is
+        what TieredRetriever.retrieve() reported; `private` marks other
+        private input, such as session history.
+        """
+        started = time.perf_counter()
+        if not self.enabled:
+            return CacheLookup("disabled")
+        bypass, ttl_s, threshold = self._rules(mode)
+        if bypass:
+            lookup = CacheLookup("bypass")
+            lookup.reason = "domain"
+            self._count(bypassed=1)
+            return lookup
+
+        private = private or sources.get("private", False)
+        scope = f"user:{user_id}" if private else "shared"
+        fingerprint = self.fingerprint(scope, sources.get("documents"), tools, emotion_state)
+        lookup = CacheLookup("miss", mode, self._bucket(mode, fingerprint), query=query, ttl_s=ttl_s)
+        lookup.scope = "user" if private else "shared"
+        try:
+            lookup.embedding = await asyncio.to_thread(self._embed, query)
+            entries = await self.redis.hgetall(lookup.bucket)
+        except Exception as e:
+            self.logger.warning(f"Response cache lookup failed: {e}")
+            self._count(errors=1)
+            lookup.status = "error"
+            lookup.lookup_ms = round((time.perf_counter() - started) * 1000, 2)
+            return lookup
+
+        best, best_score = None, threshold
+        now = time.time()
+        for raw in entries.values():
+            entry = json.loads(raw)
+            if now - entry["created"] > ttl_s:
+                continue  # the bucket outlives entries written before its last refresh
+            cached = np.frombuffer(base64.b64decode(entry["embedding"]), dtype=np.float16).astype(np.float32)
+            score = float(cached @ lookup.embedding)
+            if score >= best_score:
+                best, best_score = entry, score
+
+        if best is not None:
+            lookup.status = "hit"
+            lookup.response = best["response"]
+            lookup.similarity = best_score
+            lookup.saved_ms = best["cost_ms"]
+            self._count(hits=1, saved_ms=best["cost_ms"])
+        else:
+            self._count(misses=1)
+        lookup.lookup_ms = round((time.perf_counter() - started) * 1000, 2)
+        return lookup
+
+    async def store(self, lookup, response, cost_ms):
+        """Caches the reply generated after a miss; `cost_ms` is what a later hit saves"""
+        if lookup.status != "miss":
+            return
+        entry_id = hashlib.blake2b(normalize_text(lookup.query).encode("utf-8"), digest_size=8).hexdigest()
+        entry = json.dumps({
+            "query": lookup.query,
+            "response": response,
+            "embedding": base64.b64encode(lookup.embedding.astype(np.float16).tobytes()).decode("ascii"),
+            "created": time.time(),
+            "cost_ms": round(cost_ms, 2)
+        })
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(lookup.bucket, entry_id, entry)
+                pipe.expire(lookup.bucket, lookup.ttl_s)
+                pipe.hlen(lookup.bucket)
+                _, _, size = await pipe.execute()
+            if size > self.max_entries:
+                await self._trim(lookup.bucket, size - self.max_entries)
+        except Exception as e:
+            self.logger.warning(f"Response cache store failed: {e}")
+            self._count(errors=1)
+            return
+        self._count(stores=1)
+
+    async def _trim(self, bucket, excess):
+        """Drops the oldest entries of an over-full bucket"""
+        entries = await self.redis.hgetall(bucket)
+        oldest = sorted(entries, key=lambda field: json.loads(entries[field])["created"])[:excess]
+        if oldest:
+            await self.redis.hdel(bucket, *oldest)
+
+    def hit_rate(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return round(self.hits / lookups, 4) if lookups else 0.0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "errors": self.errors,
+                "stores": self.stores,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_ms": round(self.saved_ms, 2)
+            }
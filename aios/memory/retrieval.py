@@ -0,0 +1,162 @@
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import redis.asyncio as aioredis
+from neo4j import AsyncGraphDatabase
+
+from aios.memory.vector_ingest import normalize_text, visible_to
+
+RECENT_EPISODES_QUERY = """
+MATCH (u:User {id: $uid})-[:EXPERIENCED]->(i:Interaction)
+RETURN i.input AS input, i.response AS response
+ORDER BY i.timestamp DESC
+LIMIT $limit
+"""
+
+class TieredRetriever:
+    """
+    Queries three memory tiers concurrently under one latency budget:
+      - hot:      Redis list of the user's most recent turns
+      - semantic: Chroma nearest neighbours of the query among shared
+                  documents and the user's own interactions
+      - episodic: the user's latest Interaction nodes in Neo4j
+    Tiers still running when the budget expires are cancelled; whatever
+    finished is merged (hot first) and de-duplicated.
+    """
+    def __init__(self, cfg, vector_col, embedder):
+        self.logger = logging.getLogger("OS1.Memory.Retrieval")
+        mem_cfg = cfg['memory']
+        ret_cfg = mem_cfg.get('retrieval', {})
+        self.budget = ret_cfg.get('budget_ms', 150) / 1000.0
+        self.hot_window = ret_cfg.get('hot_window', 6)
+        self.hot_ttl = ret_cfg.get('hot_ttl_s', 3600)
+        self.semantic_results = ret_cfg.get('semantic_results', 3)
+        self.episodes = ret_cfg.get('episodes', 3)
+        pool_size = ret_cfg.get('pool_size', 16)
+
+        self.redis = aioredis.Redis(connection_pool=aioredis.ConnectionPool(
+            host=mem_cfg['redis_host'],
+            port=mem_cfg['redis_port'],
+            db=0,
+            max_connections=pool_size
+        ))
+        self.neo4j = AsyncGraphDatabase.driver(
+            mem_cfg['neo4j_uri'],
+            auth=(mem_cfg['neo4j_user'], mem_cfg['neo4j_pass']),
+            max_connection_pool_size=pool_size
+        )
+        # Chroma's client is synchronous; give it its own bounded threads
+        self.vector_col = vector_col
+        self.embedder = embedder
+        self._chroma_pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="os1-chroma")
+
+    def _hot_key(self, user_id):
+        return f"os1:turns:{user_id}"
+
+    async def record_turn(self, user_id, user_input, agent_response):
+        """Pushes a finished turn onto the user's hot window"""
+        key = self._hot_key(user_id)
+        turn = json.dumps({"input": user_input, "response": agent_response})
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.lpush(key, turn)
+            pipe.ltrim(key, 0, self.hot_window - 1)
+            pipe.expire(key, self.hot_ttl)
+            await pipe.execute()
+
+    async def _hot(self, user_id, text):
+        turns = await self.redis.lrange(self._hot_key(user_id), 0, self.hot_window - 1)
+        items = []
+        # Oldest first so the prompt reads chronologically
+        for raw in reversed(turns):
+            turn = json.loads(raw)
+            items.append(f"User: {turn['input']}\nOS1: {turn['response']}")
+        return items
+
+    def _semantic_sync(self, user_id, text, found):
+        results = self.vector_col.query(
+            query_embeddings=self.embedder([text]),
+            n_results=self.semantic_results,
+            where=visible_to(user_id)
+        )
+        if not results['documents']:
+            return []
+        documents = results['documents'][0]
+        metadatas = (results.get('metadatas') or [None])[0] or [None] * len(documents)
+        for doc_id, metadata in zip(results['ids'][0], metadatas):
+            if (metadata or {}).get("kind") == "interaction":
+                found["private"] = True
+            else:
+                found["documents"].append(doc_id)
+        return documents
+
+    async def _semantic(self, user_id, text, found):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._chroma_pool, self._semantic_sync, user_id, text, found)
+
+    async def _episodic(self, user_id, text):
+        records, _, _ = await self.neo4j.execute_query(
+            RECENT_EPISODES_QUERY, uid=user_id, limit=self.episodes, routing_="r"
+        )
+        return [f"User: {r['input']}\nOS1: {r['response']}" for r in reversed(records)]
+
+    async def _timed(self, coro):
+        start = time.perf_counter()
+        items = await coro
+        return items, (time.perf_counter() - start) * 1000
+
+    async def retrieve(self, user_id, text, budget_ms=None, items=None, sources=None):
+        """
+        Returns (context, report). `report` maps each tier to its status
+        ('ok', 'timeout' or 'error'), latency and item count.
+        If `items` is a dict it receives each answering tier's items.
+        If `sources` is a dict it receives "documents", the sorted IDs of
+        the shared documents retrieved, and "private", whether anything of
+        the user's own (hot turns, episodes, past interactions) was.
+        """
+        budget = budget_ms / 1000.0 if budget_ms else self.budget
+        found = {"documents": [], "private": False}
+        tiers = {
+            "hot": self._hot(user_id, text),
+            "semantic": self._semantic(user_id, text, found),
+            "episodic": self._episodic(user_id, text)
+        }
+        tasks = {name: asyncio.ensure_future(self._timed(coro)) for name, coro in tiers.items()}
+        await asyncio.wait(tasks.values(), timeout=budget)
+
+        merged, seen, report = [], set(), {}
+        private = False
+        for name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                report[name] = {"status": "timeout", "ms": round(budget * 1000, 2), "items": 0}
+                continue
+            if task.exception() is not None:
+                self.logger.warning(f"Retrieval tier '{name}' failed: {task.exception()}")
+                report[name] = {"status": "error", "ms": None, "items": 0}
+                continue
+            tier_items, elapsed = task.result()
+            report[name] = {"status": "ok", "ms": round(elapsed, 2), "items": len(tier_items)}
+            if items is not None:
+                items[name] = tier_items
+            if name == "semantic":
+                private = private or found["private"]
+            elif tier_items:
+                private = True
+            for item in tier_items:
+                key = normalize_text(item)
+                if key and key not in seen:
+                    seen.add(key)
+                    merged.append(item)
+        if sources is not None:
+            semantic_ok = report["semantic"]["status"] == "ok"
+            sources["documents"] = sorted(found["documents"]) if semantic_ok else []
+            sources["private"] = private
+        return "\n".join(merged), report
+
+    async def close(self):
+        await self.redis.aclose()
+        await self.neo4j.close()
+        self._chroma_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,113 @@
+import json
+import time
+import logging
+from collections import OrderedDict, deque
+
+class Session:
+    """One user's recent turns, oldest first"""
+    __slots__ = ("user_id", "turns", "last_active")
+
+    def __init__(self, user_id, max_turns, turns=()):
+        self.user_id = user_id
+        self.turns = deque(turns, maxlen=max_turns)
+        self.last_active = time.monotonic()
+
+class SessionStore:
+    """
+    Per-user conversation history. Active sessions live in memory, bounded
+    per user (`max_turns`) and in number (`max_sessions`). Sessions idle for
+    `idle_timeout_s`, or the least recently active ones beyond the limit,
+    are spilled to Redis and restored on the user's next request.
+    Sweeps run on the event loop, piggybacking on appends, so there is no
+    extra thread; every method must be called from the loop.
+    """
+    def __init__(self, redis, cfg):
+        self.logger = logging.getLogger("OS1.Memory.Sessions")
+        self.redis = redis
+        self.max_turns = cfg.get('max_turns', 20)
+        self.max_sessions = cfg.get('max_sessions', 1000)
+        self.idle_timeout = cfg.get('idle_timeout_s', 900)
+        self.spill_ttl = cfg.get('spill_ttl_s', 86400)
+        self.sweep_interval = cfg.get('sweep_interval_s', 30)
+        self._sessions = OrderedDict()  # user_id -> Session, least recently active first
+        self._last_sweep = time.monotonic()
+        self.restored = 0
+        self.spilled = 0
+        self.errors = 0
+
+    def _key(self, user_id):
+        return f"os1:session:{user_id}"
+
+    async def _session(self, user_id):
+        session = self._sessions.get(user_id)
+        if session is None:
+            turns = ()
+            try:
+                raw = await self.redis.get(self._key(user_id))
+            except Exception as e:
+                self.logger.warning(f"Could not restore session for {user_id}: {e}")
+                self.errors += 1
+                raw = None
+            if raw is not None:
+                turns = [tuple(turn) for turn in json.loads(raw)]
+                self.restored += 1
+            # Another request may have created it while Redis answered
+            session = self._sessions.setdefault(user_id, Session(user_id, self.max_turns, turns))
+        session.last_active = time.monotonic()
+        self._sessions.move_to_end(user_id)
+        return session
+
+    async def history(self, user_id):
+        """The user's turns as [(user_input, response)], oldest first"""
+        return list((await self._session(user_id)).turns)
+
+    async def append(self, user_id, user_input, response):
+        session = await self._session(user_id)
+        session.turns.append((user_input, response))
+        if (len(self._sessions) > self.max_sessions
+                or time.monotonic() - self._last_sweep >= self.sweep_interval):
+            await self.sweep()
+
+    async def sweep(self):
+        """Spills idle sessions and any beyond max_sessions to Redis"""
+        self._last_sweep = time.monotonic()
+        cutoff = self._last_sweep - self.idle_timeout
+        excess = len(self._sessions) - self.max_sessions
+        victims = []
+        for user_id, session in self._sessions.items():
+            if session.last_active >= cutoff and len(victims) >= excess:
+                break  # ordered by activity, so everything after is newer
+            victims.append(session)
+        if victims:
+            await self._spill(victims)
+
+    async def _spill(self, sessions):
+        touched = {session.user_id: session.last_active for session in sessions}
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for session in sessions:
+                    pipe.set(self._key(session.user_id), json.dumps(list(session.turns)), ex=self.spill_ttl)
+                await pipe.execute()
+        except Exception as e:
+            # Keep them resident rather than lose history; the next sweep retries
+            self.logger.warning(f"Could not spill {len(sessions)} sessions: {e}")
+            self.errors += 1
+            return
+        for session in sessions:
+            # A session used while the spill was in flight stays resident
+            if session.last_active == touched[session.user_id] and self._sessions.get(session.user_id) is session:
+                del self._sessions[session.user_id]
+        self.spilled += len(sessions)
+
+    async def aclose(self):
+        """Spills every resident session, e.g. at shutdown"""
+        if self._sessions:
+            await self._spill(list(self._sessions.values()))
+
+    def stats(self):
+        return {
+            "resident": len(self._sessions),
+            "spilled": self.spilled,
+            "restored": self.restored,
+            "errors": self.errors
+        }
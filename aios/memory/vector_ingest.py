@@ -0,0 +1,178 @@
+import re
+import time
+import queue
+import hashlib
+import threading
+import logging
+import numpy as np
+from collections import OrderedDict
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+def normalize_text(text):
+    """Cache key form: case-folded, punctuation stripped, whitespace collapsed"""
+    return " ".join(_PUNCT.sub(" ", text.casefold()).split())
+
+def visible_to(user_id=None):
+    """
+    Chroma `where` filter for one user's searches: shared documents plus
+    that user's own interactions, never anyone else's. Without a user,
+    shared documents only.
+    """
+    if user_id is None:
+        return {"kind": "document"}
+    return {"$or": [{"kind": "document"}, {"user_id": user_id}]}
+
+class EmbeddingCache:
+    """Thread-safe LRU of embeddings keyed by normalized text"""
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key, vector):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+class CachedEmbedder:
+    """
+    Wraps a Chroma embedding function with an EmbeddingCache. Only texts
+    whose normalized form is not cached reach the model, in one batch.
+    Shared by ingestion and queries so both warm the same cache.
+    """
+    def __init__(self, embedding_function, cache):
+        self.embedding_function = embedding_function
+        self.cache = cache
+        self.embedded = 0
+        self.embed_seconds = 0.0
+
+    def __call__(self, texts):
+        keys = [normalize_text(t) for t in texts]
+        vectors = [self.cache.get(k) for k in keys]
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], texts[i])
+        if missing:
+            start = time.perf_counter()
+            computed = self.embedding_function(list(missing.values()))
+            self.embed_seconds += time.perf_counter() - start
+            self.embedded += len(missing)
+            fresh = {}
+            for key, vector in zip(missing, computed):
+                fresh[key] = np.asarray(vector, dtype=np.float32)
+                self.cache.put(key, fresh[key])
+            vectors = [v if v is not None else fresh[k] for k, v in zip(keys, vectors)]
+        return vectors
+
+    def stats(self):
+        return {
+            **self.cache.stats(),
+            "embedded": self.embedded,
+            "embeddings_per_sec": round(self.embedded / self.embed_seconds, 1) if self.embed_seconds else 0.0
+        }
+
+class VectorIngestor:
+    """
+    Background pipeline that embeds interactions and documents in batches
+    and bulk-upserts them into the Chroma collection. Every entry carries a
+    `kind`; interactions also carry their `user_id`, and are private to
+    that user (see `visible_to`).
+    """
+    def __init__(self, collection, embedder, batch_size=64, flush_interval_s=1.0, max_queue=10000):
+        self.logger = logging.getLogger("OS1.Memory.Ingest")
+        self.collection = collection
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_s
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.ingested = 0
+        self.batches = 0
+        self.dropped = 0
+        threading.Thread(target=self._run, name="os1-vector-ingest", daemon=True).start()
+
+    def add_documents(self, documents, metadatas=None, ids=None):
+        metadatas = [{"kind": "document", **m} for m in metadatas] if metadatas else [{"kind": "document"} for _ in documents]
+        ids = ids or [hashlib.sha1(doc.encode("utf-8")).hexdigest() for doc in documents]
+        for item in zip(ids, documents, metadatas):
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+
+    def add_interaction(self, user_id, user_input, agent_response):
+        document = f"User: {user_input}\nOS1: {agent_response}"
+        doc_id = hashlib.sha1(f"{user_id}\0{document}".encode("utf-8")).hexdigest()
+        self.add_documents(
+            [document],
+            [{"kind": "interaction", "user_id": user_id, "timestamp": time.time()}],
+            [doc_id]
+        )
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._upsert(batch)
+            except Exception as e:
+                self.logger.error(f"Vector ingestion of {len(batch)} item(s) failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _upsert(self, batch):
+        ids, documents, metadatas = (list(column) for column in zip(*batch))
+        self.collection.upsert(
+            ids=ids,
+            embeddings=self.embedder(documents),
+            documents=documents,
+            metadatas=metadatas
+        )
+        self.ingested += len(batch)
+        self.batches += 1
+
+    def flush(self):
+        """Blocks until everything queued so far is upserted"""
+        self._queue.join()
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "ingested": self.ingested,
+            "batches": self.batches,
+            "dropped": self.dropped
+        }
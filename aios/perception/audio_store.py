@@ -0,0 +1,230 @@
+import os
+import time
+import uuid
+import yaml
+import struct
+import asyncio
+import logging
+import threading
+import numpy as np
+
+try:
+    import soundfile
+except ImportError:  # compressed encodings are optional
+    soundfile = None
+
+CONTENT_TYPES = {"wav": "audio/wav", "flac": "audio/flac", "ogg": "audio/ogg"}
+# soundfile (format, subtype) per compressed encoding
+_SOUNDFILE_FORMATS = {"flac": ("FLAC", "PCM_16"), "ogg": ("OGG", "VORBIS")}
+# RIFF/data sizes while the length is unknown; patched when the file is closed
+_STREAMING_SIZE = 0xFFFFFFFF
+
+class WavWriter:
+    """16-bit mono WAV written incrementally; the header sizes are fixed up on close"""
+    def __init__(self, path, sample_rate=22050):
+        self.file = open(path, "wb")
+        self.sample_rate = sample_rate
+        self.frames_bytes = 0
+
+    def _header(self, sample_rate, data_bytes):
+        riff_size = _STREAMING_SIZE if data_bytes is None else 36 + data_bytes
+        data_size = _STREAMING_SIZE if data_bytes is None else data_bytes
+        return (b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+                + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+                + b"data" + struct.pack("<I", data_size))
+
+    def write(self, pcm, sample_rate):
+        if self.file.tell() == 0:
+            self.sample_rate = sample_rate
+            self.file.write(self._header(sample_rate, None))
+        self.file.write(pcm)
+        self.frames_bytes += len(pcm)
+        self.file.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(self._header(self.sample_rate, self.frames_bytes))
+        self.file.seek(0, os.SEEK_END)
+        size = self.file.tell()
+        self.file.close()
+        return size
+
+class SoundFileWriter:
+    """FLAC/OGG through libsndfile; opened on the first chunk, once the sample rate is known"""
+    def __init__(self, path, encoding):
+        self.path = path
+        self.format, self.subtype = _SOUNDFILE_FORMATS[encoding]
+        self.file = None
+
+    def write(self, pcm, sample_rate):
+        if self.file is None:
+            self.file = soundfile.SoundFile(self.path, "w", samplerate=sample_rate, channels=1,
+                                            format=self.format, subtype=self.subtype)
+        self.file.write(np.frombuffer(pcm, dtype=np.int16))
+        self.file.flush()
+        return os.path.getsize(self.path)
+
+    def close(self):
+        if self.file is None:
+            open(self.path, "wb").close()
+        else:
+            self.file.close()
+        return os.path.getsize(self.path)
+
+class AudioArtifact:
+    """
+    One reply's audio. Synthesis appends to it from a worker thread while
+    readers on the event loop wait for the file to grow.
+    """
+    def __init__(self, artifact_id, path, encoding):
+        self.id = artifact_id
+        self.path = path
+        self.encoding = encoding
+        self.content_type = CONTENT_TYPES[encoding]
+        self.created = time.time()
+        self.size = 0
+        self.done = False
+        self.error = None
+        self._writer = None
+        self._lock = threading.Lock()
+        self._waiters = []
+
+    def _notify(self):
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_result(None))
+
+    def write(self, pcm, sample_rate):
+        """Appends 16-bit mono PCM; called from the synthesis thread"""
+        self.size = self._open().write(pcm, sample_rate)
+        self._notify()
+
+    def _open(self):
+        if self._writer is None:
+            self._writer = WavWriter(self.path) if self.encoding == "wav" else SoundFileWriter(self.path, self.encoding)
+        return self._writer
+
+    def finish(self, error=None):
+        try:
+            self.size = self._open().close()
+        except OSError as e:
+            error = error or str(e)
+        self.error = error
+        self.done = True
+        self._notify()
+
+    async def wait(self, size, timeout):
+        """Returns once the file is larger than `size` bytes, finished, or `timeout` passed"""
+        if self.done or self.size > size:
+            return
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._waiters.append((asyncio.get_running_loop(), future))
+        # Re-check: the writer may have grown the file before we registered
+        if self.done or self.size > size:
+            return
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+
+class AudioStore:
+    """
+    Reply audio addressed by a unique per-request ID and served over HTTP
+    from `dir`, so concurrent requests never share a file and clients
+    don't need the server's filesystem. Artifacts can be read while they
+    are still being synthesized. Finished artifacts are deleted after
+    `ttl_s`, oldest first when the directory exceeds `max_mb`; artifacts
+    don't survive a restart.
+    """
+    def __init__(self):
+        self.logger = logging.getLogger("OS1.Voice.Store")
+        with open('aios/config/config.yaml', 'r') as f:
+            self.cfg = yaml.safe_load(f).get('audio_store', {})
+        self.dir = self.cfg.get('dir', "root/db/audio")
+        self.ttl = self.cfg.get('ttl_s', 600)
+        self.max_bytes = self.cfg.get('max_mb', 512) * 1024 * 1024
+        self.gc_interval = self.cfg.get('gc_interval_s', 30)
+        self.chunk_size = self.cfg.get('chunk_kb', 64) * 1024
+        self.wait_timeout = self.cfg.get('wait_timeout_s', 30)
+        self.default_encoding = self._resolve(self.cfg.get('encoding', "wav"))
+        os.makedirs(self.dir, exist_ok=True)
+        for name in os.listdir(self.dir):
+            os.remove(os.path.join(self.dir, name))
+
+        self._artifacts = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self._stop = threading.Event()
+        threading.Thread(target=self._gc_loop, name="os1-audio-gc", daemon=True).start()
+
+    def _resolve(self, requested):
+        """Validates an encoding; compressed ones fall back to WAV without soundfile"""
+        requested = requested.lower()
+        if requested not in CONTENT_TYPES:
+            raise ValueError(f"Unsupported audio encoding '{requested}'")
+        if requested != "wav" and soundfile is None:
+            self.logger.warning(f"soundfile is not installed; serving WAV instead of {requested}")
+            return "wav"
+        return requested
+
+    def create(self, encoding=None):
+        """Registers a new artifact; `encoding` overrides the configured one"""
+        encoding = self._resolve(encoding) if encoding else self.default_encoding
+        artifact_id = uuid.uuid4().hex
+        artifact = AudioArtifact(artifact_id, os.path.join(self.dir, f"{artifact_id}.{encoding}"), encoding)
+        with self._lock:
+            self._artifacts[artifact_id] = artifact
+            self.created += 1
+        return artifact
+
+    def get(self, artifact_id):
+        with self._lock:
+            return self._artifacts.get(artifact_id)
+
+    def _gc_loop(self):
+        while not self._stop.wait(self.gc_interval):
+            self.collect()
+
+    def collect(self):
+        """Deletes expired artifacts, then the oldest finished ones while over max_mb"""
+        now = time.time()
+        with self._lock:
+            finished = sorted((a for a in self._artifacts.values() if a.done), key=lambda a: a.created)
+            total = sum(a.size for a in self._artifacts.values())
+            doomed = []
+            for artifact in finished:
+                if now - artifact.created > self.ttl:
+                    self.expired += 1
+                elif total > self.max_bytes:
+                    self.evicted += 1
+                else:
+                    continue
+                doomed.append(artifact)
+                total -= artifact.size
+                del self._artifacts[artifact.id]
+        for artifact in doomed:
+            try:
+                os.remove(artifact.path)
+            except OSError:
+                pass
+
+    def close(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            artifacts = list(self._artifacts.values())
+        return {
+            "artifacts": len(artifacts),
+            "in_progress": sum(1 for a in artifacts if not a.done),
+            "bytes": sum(a.size for a in artifacts),
+            "created": self.created,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "encoding": self.default_encoding
+        }
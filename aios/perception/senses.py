@@ -5,10 +5,16 @@ from faster_whisper import WhisperModel
 import sounddevice as sd
 import numpy as np
 import logging
+import yaml
+
+from aios.perception.stt_service import TranscriptionService
 
 class Senses:
     def __init__(self):
         self.logger = logging.getLogger("OS1.Senses")
+        with open('aios/config/config.yaml', 'r') as f:
+            self.cfg = yaml.safe_load(f)
+        stt_cfg = self.cfg.get('stt', {})
         
         # Vision - MediaPipe Face Mesh
         self.mp_face_mesh = mp.solutions.face_mesh
@@ -20,7 +26,22 @@ class Senses:
 
         # Hearing - Faster Whisper (GPU optimized)
         # 'int8' is faster on CPU/RTX 3050 for inference
-        self.stt_model = WhisperModel("small", device="auto", compute_type="int8")
+        self.beam_size = stt_cfg.get('beam_size', 5)
+        self.stt_model = WhisperModel(
+            self.cfg['models']['stt_model'],
+            device=stt_cfg.get('device', "auto"),
+            compute_type=stt_cfg.get('compute_type', "int8"),
+            cpu_threads=stt_cfg.get('cpu_threads', 0)
+        )
+        self.transcriber = TranscriptionService(
+            self.stt_model,
+            beam_size=self.beam_size,
+            language=stt_cfg.get('language', "en"),
+            vad=stt_cfg.get('vad', True),
+            vad_min_silence_ms=stt_cfg.get('vad_min_silence_ms', 500),
+            max_batch=stt_cfg.get('max_batch', 8),
+            max_wait_ms=stt_cfg.get('max_wait_ms', 50)
+        )
 
     def analyze_visual_emotion(self, frame):
         """
@@ -46,6 +67,6 @@ class Senses:
         """
         Transcribe audio file.
         """
-        segments, info = self.stt_model.transcribe(file_path, beam_size=5)
+        segments, info = self.stt_model.transcribe(file_path, beam_size=self.beam_size)
         text = " ".join([segment.text for segment in segments])
         return text
\ No newline at end of file
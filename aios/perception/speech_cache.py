@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+import logging
+from collections import OrderedDict
+
+def normalize_text(text):
+    """Canonical form used for cache keys: NFC, single spaces, trimmed"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+class SpeechCache:
+    """
+    Content-addressed cache of synthesized WAV audio.
+    Entries are keyed by normalized text + voice + synthesis parameters and
+    live in a small in-memory LRU in front of a size-bounded directory.
+    Disk writes go through a unique temp file and os.replace, so concurrent
+    writers (threads or processes) never expose a partial file.
+    """
+    def __init__(self, cache_dir, voice_id, params, max_disk_bytes, max_memory_bytes):
+        self.logger = logging.getLogger("OS1.Voice.Cache")
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._fingerprint = json.dumps({"voice": voice_id, "params": params}, sort_keys=True)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._disk_bytes = sum(
+            os.path.getsize(os.path.join(cache_dir, name))
+            for name in os.listdir(cache_dir) if name.endswith(".wav")
+        )
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, text):
+        payload = normalize_text(text) + "\0" + self._fingerprint
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".wav")
+
+    def _remember(self, key, data):
+        """Inserts into the memory LRU; caller holds the lock"""
+        if len(data) > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def get(self, key):
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # mtime doubles as the disk LRU clock
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        existed = os.path.exists(path)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._remember(key, data)
+            if not existed:
+                self._disk_bytes += len(data)
+            over = self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._evict_disk()
+
+    def get_or_create(self, text, synthesize):
+        """
+        Returns cached audio for `text`, calling synthesize() -> bytes on a
+        miss. Concurrent misses on the same key wait for one synthesis.
+        """
+        key = self.key(text)
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+        if not owner:
+            event.wait()
+            data = self.get(key)
+            if data is not None:
+                return data
+            return synthesize()
+
+        try:
+            data = synthesize()
+            if data:
+                self.put(key, data)
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".wav"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def prewarm(self, phrases, synthesize):
+        """Synthesizes any phrase not already cached; synthesize(text) -> bytes"""
+        start = time.monotonic()
+        for phrase in phrases:
+            self.get_or_create(phrase, lambda: synthesize(phrase))
+        self.logger.info(f"Pre-warmed {len(phrases)} phrases in {time.monotonic() - start:.1f}s")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes
+            }
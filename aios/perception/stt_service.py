@@ -0,0 +1,141 @@
+import io
+import time
+import queue
+import threading
+import logging
+import numpy as np
+from concurrent.futures import Future
+from faster_whisper import decode_audio
+from faster_whisper.audio import pad_or_trim
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.vad import VadOptions, get_speech_timestamps, collect_chunks
+
+SAMPLE_RATE = 16000
+# Whisper's encoder window; clips up to this length share one batched decode
+MAX_BATCH_SECONDS = 30
+
+class TranscriptionService:
+    """
+    In-memory, micro-batched speech-to-text on a shared WhisperModel.
+    Uploads are decoded to float32 PCM without touching the filesystem and
+    VAD-trimmed. Requests that arrive within `max_wait_ms` of each other are
+    encoded and decoded as one CTranslate2 batch.
+    """
+    def __init__(self, model, beam_size=5, language="en", vad=True,
+                 vad_min_silence_ms=500, max_batch=8, max_wait_ms=50):
+        self.logger = logging.getLogger("OS1.STT")
+        self.model = model
+        self.beam_size = beam_size
+        self.language = language
+        self.vad = vad
+        self.vad_options = VadOptions(min_silence_duration_ms=vad_min_silence_ms)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.tokenizer = Tokenizer(
+            model.hf_tokenizer,
+            model.model.is_multilingual,
+            task="transcribe",
+            language=language
+        )
+        self.prompt = model.get_prompt(self.tokenizer, [], without_timestamps=True)
+
+        self._queue = queue.Queue()
+        self.requests = 0
+        self.batches = 0
+        self.cancelled = 0
+        threading.Thread(target=self._batch_loop, name="os1-stt-batcher", daemon=True).start()
+
+    def decode(self, data):
+        """Decodes an encoded upload (wav, mp3, ogg, ...) to mono 16 kHz float32"""
+        return decode_audio(io.BytesIO(data), sampling_rate=SAMPLE_RATE)
+
+    def trim(self, audio):
+        """Drops non-speech with Silero VAD; returns an empty array for silence"""
+        if not self.vad or len(audio) == 0:
+            return audio
+        speech = get_speech_timestamps(audio, self.vad_options)
+        if not speech:
+            return audio[:0]
+        clips = collect_chunks(audio, speech)
+        # Newer faster-whisper returns (chunks, metadata); older a single array
+        if isinstance(clips, tuple):
+            clips = clips[0]
+        return np.concatenate(clips) if isinstance(clips, list) else clips
+
+    def submit(self, audio):
+        """Queues decoded audio for the next batch; returns a Future of the text"""
+        future = Future()
+        self._queue.put((audio, future))
+        return future
+
+    def transcribe_bytes(self, data):
+        """Blocking helper: decode, trim and transcribe one upload"""
+        return self.submit(self.trim(self.decode(data))).result()
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Callers cancel futures they stop waiting for (client disconnects,
+            # barge-in); skip those, and mark the rest running so they can't be
+            # cancelled under us between here and set_result
+            live = [(audio, future) for audio, future in batch if future.set_running_or_notify_cancel()]
+            self.cancelled += len(batch) - len(live)
+            if not live:
+                continue
+            batch = live
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                self.logger.error(f"STT batch failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _run_batch(self, batch):
+        self.requests += len(batch)
+        self.batches += 1
+
+        short = []
+        for audio, future in batch:
+            if len(audio) == 0:
+                future.set_result("")
+            elif len(audio) > MAX_BATCH_SECONDS * SAMPLE_RATE:
+                # Long-form audio needs Whisper's sliding window
+                segments, _ = self.model.transcribe(audio, beam_size=self.beam_size, language=self.language)
+                future.set_result(" ".join(segment.text for segment in segments).strip())
+            else:
+                short.append((audio, future))
+        if not short:
+            return
+
+        features = np.stack([pad_or_trim(self.model.feature_extractor(audio)) for audio, _ in short])
+        encoder_output = self.model.encode(features)
+        results = self.model.model.generate(
+            encoder_output,
+            [list(self.prompt) for _ in short],
+            beam_size=self.beam_size,
+            max_length=self.model.max_length,
+            suppress_blank=True,
+            suppress_tokens=[-1]
+        )
+        for (_, future), result in zip(short, results):
+            future.set_result(self.tokenizer.decode(result.sequences_ids[0]).strip())
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "cancelled": self.cancelled,
+            "queued": self._queue.qsize()
+        }
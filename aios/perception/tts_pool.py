@@ -0,0 +1,142 @@
+import os
+import io
+import json
+import wave
+import queue
+import select
+import tempfile
+import threading
+import subprocess
+import logging
+
+class PiperWorkerError(Exception):
+    pass
+
+class PiperWorker:
+    """
+    One long-lived `piper --json-input` process. The ONNX voice is loaded
+    once at spawn; each utterance is a JSON line on stdin and piper answers
+    with the path of the WAV it wrote on stdout.
+    """
+    def __init__(self, index, binary_path, model_path, piper_dir, scratch_dir, timeout):
+        self.logger = logging.getLogger(f"OS1.Voice.Worker{index}")
+        self.index = index
+        self.binary_path = binary_path
+        self.model_path = model_path
+        self.piper_dir = piper_dir
+        self.scratch_dir = scratch_dir
+        self.timeout = timeout
+        self.process = None
+        self.restarts = 0
+        self.utterances = 0
+
+    def start(self):
+        env = os.environ.copy()
+        env["LD_LIBRARY_PATH"] = f"{self.piper_dir}:{env.get('LD_LIBRARY_PATH', '')}"
+        self.process = subprocess.Popen(
+            [
+                self.binary_path,
+                "--model", self.model_path,
+                "--json-input",
+                "--output_dir", self.scratch_dir
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.piper_dir,
+            env=env
+        )
+        # Piper logs every utterance to stderr; drain it so the pipe never fills
+        threading.Thread(target=self._drain_stderr, args=(self.process,), daemon=True).start()
+        self.logger.info(f"Piper worker started (pid {self.process.pid})")
+
+    def _drain_stderr(self, process):
+        for line in process.stderr:
+            self.logger.debug(line.decode(errors="replace").rstrip())
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def _request(self, text, output_file):
+        if self.process is None or self.process.poll() is not None:
+            self.start()
+        line = json.dumps({"text": text, "output_file": output_file}) + "\n"
+        self.process.stdin.write(line.encode("utf-8"))
+        self.process.stdin.flush()
+
+        ready, _, _ = select.select([self.process.stdout], [], [], self.timeout)
+        if not ready:
+            raise PiperWorkerError(f"No reply within {self.timeout}s")
+        written = self.process.stdout.readline().decode("utf-8").strip()
+        if not written:
+            raise PiperWorkerError(f"Piper exited with code {self.process.poll()}")
+        return written
+
+    def synthesize(self, text, output_file):
+        """Writes `text` to `output_file`, restarting the process once on failure"""
+        for attempt in (1, 2):
+            try:
+                written = self._request(text, output_file)
+                self.utterances += 1
+                return written
+            except (OSError, PiperWorkerError) as e:
+                self.logger.warning(f"Piper worker failed (attempt {attempt}): {e}")
+                self.stop()
+                self.restarts += 1
+        raise PiperWorkerError("Piper worker failed twice")
+
+class PiperPool:
+    """
+    A fixed set of PiperWorkers. Callers check a worker out, synthesize, and
+    return it, so at most `size` utterances are in flight at once.
+    """
+    def __init__(self, binary_path, model_path, piper_dir, size=2, timeout=30, scratch_dir=None):
+        self.logger = logging.getLogger("OS1.Voice.Pool")
+        if scratch_dir is None:
+            # tmpfs keeps in-memory synthesis off the disk where available
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            scratch_dir = os.path.join(base, "os1_tts")
+        os.makedirs(scratch_dir, exist_ok=True)
+        self.scratch_dir = scratch_dir
+
+        self._idle = queue.Queue()
+        self.workers = []
+        for i in range(size):
+            worker = PiperWorker(i, binary_path, model_path, piper_dir, scratch_dir, timeout)
+            worker.start()
+            self.workers.append(worker)
+            self._idle.put(worker)
+
+    def synthesize_to_file(self, text, output_file):
+        worker = self._idle.get()
+        try:
+            return worker.synthesize(text, output_file)
+        finally:
+            self._idle.put(worker)
+
+    def synthesize_pcm(self, text):
+        """Returns (pcm_bytes, sample_rate) without leaving a file behind"""
+        scratch = os.path.join(self.scratch_dir, f"utt_{threading.get_ident()}_{os.urandom(4).hex()}.wav")
+        written = self.synthesize_to_file(text, scratch)
+        try:
+            with open(written, "rb") as f:
+                data = f.read()
+        finally:
+            os.remove(written)
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            return wav.readframes(wav.getnframes()), wav.getframerate()
+
+    def stats(self):
+        return {
+            "workers": len(self.workers),
+            "idle": self._idle.qsize(),
+            "utterances": sum(w.utterances for w in self.workers),
+            "restarts": sum(w.restarts for w in self.workers)
+        }
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
@@ -0,0 +1,125 @@
+import numpy as np
+from collections import deque
+from faster_whisper.vad import get_vad_model
+
+from aios.perception.stt_service import SAMPLE_RATE
+
+# Silero's frame at 16 kHz, plus the tail of the previous frame it expects as context
+WINDOW = 512
+CONTEXT = 64
+WINDOW_MS = WINDOW * 1000 // SAMPLE_RATE
+
+class StreamingVad:
+    """
+    Silero VAD run one window at a time, carrying the model's recurrent
+    state across calls the way faster-whisper's batch pass does, so a
+    live stream gets the same per-window speech probabilities as the
+    whole recording would.
+    """
+    def __init__(self):
+        self.session = get_vad_model().session
+        self.reset()
+
+    def reset(self):
+        self.h = np.zeros((1, 1, 128), dtype=np.float32)
+        self.c = np.zeros((1, 1, 128), dtype=np.float32)
+        self.context = np.zeros(CONTEXT, dtype=np.float32)
+
+    def __call__(self, window):
+        """Speech probability of one WINDOW-sample float32 frame"""
+        frame = np.concatenate([self.context, window])[np.newaxis, :]
+        out, self.h, self.c = self.session.run(None, {"input": frame, "h": self.h, "c": self.c})
+        self.context = window[-CONTEXT:]
+        return float(np.asarray(out).reshape(-1)[0])
+
+class Endpointer:
+    """
+    Turns a live 16 kHz PCM stream into utterances. Speech starts after
+    `start_ms` of consecutive voiced windows (with `preroll_ms` of audio
+    before it kept, so onsets aren't clipped) and ends after
+    `end_silence_ms` below the lower hysteresis threshold, or at
+    `max_utterance_s`. Not thread-safe: feed one stream from one caller.
+    """
+    def __init__(self, cfg):
+        self.vad = StreamingVad()
+        self.threshold = cfg.get('threshold', 0.5)
+        self.neg_threshold = max(self.threshold - 0.15, 0.01)
+        self.start_windows = max(1, cfg.get('start_ms', 96) // WINDOW_MS)
+        self.end_windows = max(1, cfg.get('end_silence_ms', 400) // WINDOW_MS)
+        self.pad_windows = cfg.get('pad_ms', 96) // WINDOW_MS
+        self.max_windows = int(cfg.get('max_utterance_s', 20) * 1000 // WINDOW_MS)
+        self._ring = deque(maxlen=self.start_windows + cfg.get('preroll_ms', 192) // WINDOW_MS)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._utterance = []
+        self._voiced = 0
+        self._silent = 0
+        self.in_speech = False
+        self.speech_windows = 0
+        self.windows = 0
+
+    @property
+    def speech_ms(self):
+        """Voiced audio in the current utterance so far"""
+        return self.speech_windows * WINDOW_MS
+
+    @property
+    def stream_ms(self):
+        """Audio consumed since the stream started"""
+        return self.windows * WINDOW_MS
+
+    def audio(self):
+        """The current utterance so far, e.g. for a partial transcript"""
+        return np.concatenate(self._utterance) if self._utterance else np.zeros(0, dtype=np.float32)
+
+    def feed(self, pcm):
+        """
+        Consumes 16-bit little-endian mono PCM. Returns a list of events:
+        ("speech_start", None) and ("speech_end", utterance_float32).
+        """
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+        self._pending = np.concatenate([self._pending, samples])
+        events = []
+        while len(self._pending) >= WINDOW:
+            window, self._pending = self._pending[:WINDOW], self._pending[WINDOW:]
+            event = self._step(window, self.vad(window))
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _step(self, window, prob):
+        self.windows += 1
+        if not self.in_speech:
+            self._ring.append(window)
+            self._voiced = self._voiced + 1 if prob >= self.threshold else 0
+            if self._voiced < self.start_windows:
+                return None
+            self.in_speech = True
+            self._utterance = list(self._ring)
+            self._ring.clear()
+            self._silent = 0
+            self.speech_windows = self._voiced
+            return ("speech_start", None)
+
+        self._utterance.append(window)
+        if prob < self.neg_threshold:
+            self._silent += 1
+        else:
+            self._silent = 0
+            self.speech_windows += 1
+        if self._silent < self.end_windows and len(self._utterance) < self.max_windows:
+            return None
+        return ("speech_end", self.flush())
+
+    def flush(self):
+        """Ends the current utterance now (e.g. push-to-talk released); None if there is none"""
+        if not self.in_speech:
+            return None
+        # Keep `pad_ms` of the trailing silence; Whisper does better with a little
+        keep = len(self._utterance) - max(self._silent - self.pad_windows, 0)
+        audio = np.concatenate(self._utterance[:keep])
+        self.in_speech = False
+        self._utterance = []
+        self._voiced = 0
+        self._silent = 0
+        self.speech_windows = 0
+        return audio
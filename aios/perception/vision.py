@@ -0,0 +1,222 @@
+import time
+import threading
+import logging
+import multiprocessing
+import numpy as np
+import yaml
+from concurrent.futures import ProcessPoolExecutor
+
+# MediaPipe FaceMesh landmark indices used by the feature extractor
+LIP_LEFT, LIP_RIGHT = 61, 291
+LIP_TOP, LIP_BOTTOM = 13, 14
+FACE_LEFT, FACE_RIGHT = 234, 454
+NOSE_TIP = 1
+LEFT_EYE = (159, 145, 33, 133)    # top, bottom, outer corner, inner corner
+RIGHT_EYE = (386, 374, 263, 362)
+
+FEATURES = ("present", "smile_prob", "mouth_open", "eye_open", "attention")
+
+_face_mesh = None
+
+def _init_worker():
+    """Runs once per worker process: loads FaceMesh there, not in the API process"""
+    global _face_mesh
+    import mediapipe as mp
+    _face_mesh = mp.solutions.face_mesh.FaceMesh(
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5
+    )
+
+def _landmarks_from_jpeg(data, max_width):
+    """Worker stage: decode, downscale, run FaceMesh. Returns (N, 3) float32"""
+    import cv2
+    frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+    height, width = frame.shape[:2]
+    if width > max_width:
+        scale = max_width / width
+        frame = cv2.resize(frame, (max_width, int(height * scale)), interpolation=cv2.INTER_AREA)
+    results = _face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    if not results.multi_face_landmarks:
+        return np.empty((0, 3), dtype=np.float32)
+    return np.array([(p.x, p.y, p.z) for p in results.multi_face_landmarks[0].landmark], dtype=np.float32)
+
+def extract_features(landmarks):
+    """
+    Vectorized emotion cues for a stack of faces.
+    landmarks: (batch, N, 3) normalized coordinates. Returns (batch, 5)
+    ordered as FEATURES.
+    """
+    xy = landmarks[:, :, :2]
+
+    def dist(a, b):
+        return np.linalg.norm(xy[:, a] - xy[:, b], axis=-1)
+
+    face_width = np.maximum(dist(FACE_LEFT, FACE_RIGHT), 1e-6)
+    # Same lip-corner heuristic as Senses.analyze_visual_emotion
+    smile = np.minimum(1.0, dist(LIP_LEFT, LIP_RIGHT) * 2.0)
+    mouth_open = dist(LIP_TOP, LIP_BOTTOM) / face_width
+    eye_open = 0.5 * (
+        dist(LEFT_EYE[0], LEFT_EYE[1]) / np.maximum(dist(LEFT_EYE[2], LEFT_EYE[3]), 1e-6)
+        + dist(RIGHT_EYE[0], RIGHT_EYE[1]) / np.maximum(dist(RIGHT_EYE[2], RIGHT_EYE[3]), 1e-6)
+    )
+    # Head yaw: nose offset from the face midline, relative to face width
+    midline = 0.5 * (xy[:, FACE_LEFT, 0] + xy[:, FACE_RIGHT, 0])
+    yaw = np.abs(xy[:, NOSE_TIP, 0] - midline) / face_width
+    attention = np.clip(1.0 - 4.0 * yaw, 0.0, 1.0)
+
+    present = np.ones(len(landmarks))
+    return np.stack([present, smile, mouth_open, eye_open, attention], axis=1)
+
+class EmotionState:
+    """Exponentially smoothed per-user cues; read without taking the pipeline lock"""
+    def __init__(self, smoothing):
+        self.smoothing = smoothing
+        self.vector = np.zeros(len(FEATURES))
+        self.updated = 0.0
+
+    def update(self, features):
+        if self.updated == 0.0:
+            self.vector = features
+        else:
+            self.vector = self.vector + self.smoothing * (features - self.vector)
+        self.updated = time.monotonic()
+
+    def as_dict(self):
+        vector = self.vector
+        return {name: round(float(v), 3) for name, v in zip(FEATURES, vector)}
+
+    def label(self):
+        present, smile, mouth_open, eye_open, attention = self.vector
+        if present < 0.5:
+            return "Absent"
+        if attention < 0.4:
+            return "Distracted"
+        if smile > 0.6:
+            return "Happy"
+        if mouth_open > 0.15:
+            return "Surprised"
+        if eye_open < 0.15:
+            return "Tired"
+        return "Attentive"
+
+class EmotionPipeline:
+    """
+    Frame ingestion -> (skip / downscale) -> FaceMesh workers -> vectorized
+    features -> smoothed per-user state.
+    CPU stays fixed at `workers` processes: a frame is only accepted when a
+    worker is free and the user's adaptive frame interval has elapsed;
+    everything else is dropped, never queued. Users with no frame for
+    `stale_after_s` are forgotten, so per-user state stays bounded.
+    """
+    def __init__(self):
+        self.logger = logging.getLogger("OS1.Vision")
+        with open('aios/config/config.yaml', 'r') as f:
+            self.cfg = yaml.safe_load(f)
+        vision_cfg = self.cfg.get('vision', {})
+
+        self.workers = vision_cfg.get('workers', 2)
+        self.max_width = vision_cfg.get('max_width', 320)
+        self.min_interval = 1.0 / vision_cfg.get('target_fps', 5)
+        self.smoothing = vision_cfg.get('smoothing', 0.3)
+        self.stale_after = vision_cfg.get('stale_after_s', 10)
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(vision_cfg.get('start_method', "spawn")),
+            initializer=_init_worker
+        )
+        # Start the workers now so the first frame doesn't pay for loading FaceMesh
+        self.pool.submit(time.sleep, 0).result()
+
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._avg_latency = 0.0
+        self._last_accepted = {}
+        self._last_sweep = time.monotonic()
+        self.states = {}
+        self.accepted = 0
+        self.dropped = 0
+
+    def _interval(self):
+        # Back off below target_fps when the workers can't keep up
+        return max(self.min_interval, self._avg_latency / self.workers)
+
+    def _sweep(self, now):
+        """Drops users whose state has gone stale; called with the lock held, at most every stale_after_s"""
+        if now - self._last_sweep < self.stale_after:
+            return
+        self._last_sweep = now
+        for user_id, accepted in list(self._last_accepted.items()):
+            if now - accepted > self.stale_after:
+                del self._last_accepted[user_id]
+        for user_id, state in list(self.states.items()):
+            if now - state.updated > self.stale_after:
+                del self.states[user_id]
+
+    def submit_frame(self, user_id, jpeg_bytes):
+        """Offers one frame; returns False if it was dropped"""
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            if self._inflight >= self.workers or now - self._last_accepted.get(user_id, 0.0) < self._interval():
+                self.dropped += 1
+                return False
+            self._inflight += 1
+            self._last_accepted[user_id] = now
+            self.accepted += 1
+
+        future = self.pool.submit(_landmarks_from_jpeg, jpeg_bytes, self.max_width)
+        future.add_done_callback(lambda f: self._on_landmarks(user_id, now, f))
+        return True
+
+    def _on_landmarks(self, user_id, submitted, future):
+        with self._lock:
+            self._inflight -= 1
+            self._avg_latency += 0.2 * ((time.monotonic() - submitted) - self._avg_latency)
+        try:
+            landmarks = future.result()
+        except Exception as e:
+            self.logger.warning(f"Frame analysis failed: {e}")
+            return
+        if landmarks is None:
+            return
+
+        if len(landmarks):
+            features = extract_features(landmarks[None])[0]
+        else:
+            features = np.zeros(len(FEATURES))
+        with self._lock:
+            state = self.states.get(user_id)
+            if state is None:
+                state = self.states.setdefault(user_id, EmotionState(self.smoothing))
+            state.update(features)
+
+    def get_state(self, user_id):
+        """Latest smoothed cues for a user, or None if no fresh frames"""
+        state = self.states.get(user_id)
+        if state is None or time.monotonic() - state.updated > self.stale_after:
+            return None
+        return state
+
+    def emotion_label(self, user_id, default="Neutral"):
+        """Non-blocking read used to fill generate_response's emotion_state"""
+        state = self.get_state(user_id)
+        return state.label() if state is not None else default
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "inflight": self._inflight,
+                "accepted": self.accepted,
+                "dropped": self.dropped,
+                "avg_latency_ms": round(self._avg_latency * 1000, 2),
+                "effective_fps": round(1.0 / self._interval(), 2),
+                "users": len(self.states)
+            }
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
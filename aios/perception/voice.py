@@ -1,10 +1,37 @@
 import os
+import io
+import re
+import json
+import wave
 import subprocess
 import logging
+import yaml
+
+from aios.perception.tts_pool import PiperPool
+from aios.perception.speech_cache import SpeechCache
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def split_sentences(text):
+    """Splits on sentence-final punctuation; each piece is synthesized (and cached) on its own"""
+    return [s for s in (p.strip() for p in _SENTENCE_END.split(text)) if s]
+
+def take_sentences(buffer):
+    """
+    For text that is still arriving: returns (complete sentences, rest).
+    A sentence counts as complete once whitespace follows its punctuation.
+    """
+    ends = list(_SENTENCE_END.finditer(buffer))
+    if not ends:
+        return [], buffer
+    return split_sentences(buffer[:ends[-1].start()]), buffer[ends[-1].end():]
 
 class VoiceEngine:
     def __init__(self):
         self.logger = logging.getLogger("OS1.Voice")
+        with open('aios/config/config.yaml', 'r') as f:
+            self.cfg = yaml.safe_load(f)
+        voice_cfg = self.cfg.get('voice', {})
         
         self.base_dir = os.getcwd()
         self.piper_dir = os.path.join(self.base_dir, "piper")
@@ -15,14 +42,138 @@ class VoiceEngine:
         if not os.path.exists(self.binary_path):
             self.logger.error(f"Piper binary missing at: {self.binary_path}")
 
+        with open(self.model_path + ".json", "r") as f:
+            model_cfg = json.load(f)
+        self.sample_rate = model_cfg["audio"]["sample_rate"]
+
+        # Long-lived synthesizers; pool_size 0 falls back to one process per call
+        self.pool = None
+        if voice_cfg.get('pool_size', 2) > 0:
+            self.pool = PiperPool(
+                self.binary_path,
+                self.model_path,
+                self.piper_dir,
+                size=voice_cfg.get('pool_size', 2),
+                timeout=voice_cfg.get('timeout_s', 30),
+                scratch_dir=voice_cfg.get('scratch_dir')
+            )
+
+        # Synthesized audio, keyed by normalized text + voice + parameters
+        cache_cfg = voice_cfg.get('cache', {})
+        self.cache = None
+        self.prewarm_phrases = cache_cfg.get('prewarm', [])
+        if cache_cfg.get('enabled', True):
+            self.cache = SpeechCache(
+                cache_cfg.get('dir', "root/db/tts_cache"),
+                voice_id=os.path.basename(self.model_path),
+                params={"sample_rate": self.sample_rate, **model_cfg.get("inference", {})},
+                max_disk_bytes=cache_cfg.get('max_disk_mb', 256) * 1024 * 1024,
+                max_memory_bytes=cache_cfg.get('max_memory_mb', 32) * 1024 * 1024
+            )
+
+    def _clean(self, text):
+        return text.replace('"', '').replace("'", "").replace("\n", " ")
+
     def speak(self, text, output_file="output.wav"):
         self.logger.info(f"Synthesizing voice...")
         
         if not os.path.isabs(output_file):
             output_file = os.path.join(self.base_dir, output_file)
 
-        clean_text = text.replace('"', '').replace("'", "").replace("\n", " ")
-        
+        clean_text = self._clean(text)
+
+        if self.cache is not None:
+            data = self.cache.get_or_create(clean_text, lambda: self._render_wav(clean_text))
+            with open(output_file, "wb") as f:
+                f.write(data)
+            return output_file
+
+        if self.pool is None:
+            return self._speak_subprocess(clean_text, output_file)
+
+        try:
+            self.pool.synthesize_to_file(clean_text, output_file)
+            self.logger.info(f"Audio generated: {output_file}")
+        except Exception as e:
+            self.logger.error(f"TTS Execution Error: {e}")
+        return output_file
+
+    def synthesize_pcm(self, text):
+        """
+        Synthesizes into memory. Returns (pcm_bytes, sample_rate) with
+        16-bit mono samples; nothing is left on disk.
+        """
+        clean_text = self._clean(text)
+        if self.cache is not None:
+            data = self.cache.get_or_create(clean_text, lambda: self._render_wav(clean_text))
+            with wave.open(io.BytesIO(data), "rb") as wav:
+                return wav.readframes(wav.getnframes()), wav.getframerate()
+        return self._synthesize_pcm_uncached(clean_text)
+
+    def synthesize_to(self, artifact, text):
+        """
+        Synthesizes into an AudioArtifact sentence by sentence, so readers
+        get the first sentence's audio while the rest is still rendering.
+        Always finishes the artifact, with the error if synthesis failed.
+        """
+        try:
+            for sentence in split_sentences(text) or [text]:
+                pcm, sample_rate = self.synthesize_pcm(sentence)
+                if pcm:
+                    artifact.write(pcm, sample_rate)
+        except Exception as e:
+            self.logger.error(f"TTS Execution Error: {e}")
+            artifact.finish(str(e))
+            return artifact
+        artifact.finish()
+        return artifact
+
+    def _synthesize_pcm_uncached(self, clean_text):
+        if self.pool is not None:
+            return self.pool.synthesize_pcm(clean_text)
+
+        env = os.environ.copy()
+        env["LD_LIBRARY_PATH"] = f"{self.piper_dir}:{env.get('LD_LIBRARY_PATH', '')}"
+        process = subprocess.run(
+            [self.binary_path, "--model", self.model_path, "--output-raw"],
+            input=clean_text.encode('utf-8'),
+            capture_output=True,
+            cwd=self.piper_dir,
+            env=env
+        )
+        if process.returncode != 0:
+            self.logger.error(f"Piper failed: {process.stderr.decode()}")
+        return process.stdout, self.sample_rate
+
+    def _render_wav(self, clean_text):
+        """Synthesizes a complete WAV file in memory (the cache's miss path)"""
+        pcm, sample_rate = self._synthesize_pcm_uncached(clean_text)
+        if not pcm:
+            return b""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
+
+    def prewarm_cache(self):
+        """Synthesizes the configured stock phrases so they are hits from the start"""
+        if self.cache is not None and self.prewarm_phrases:
+            self.cache.prewarm(
+                [self._clean(p) for p in self.prewarm_phrases],
+                self._render_wav
+            )
+
+    def stats(self):
+        return {
+            "pool": self.pool.stats() if self.pool else None,
+            "cache": self.cache.stats() if self.cache else None
+        }
+
+    def _speak_subprocess(self, clean_text, output_file):
+        """Original path: spawns a Piper process (and reloads the voice) per call"""
         # KEY FIX: Add the piper directory to LD_LIBRARY_PATH for this specific command
         # This tells Linux: "Look for .so files in the piper folder"
         env = os.environ.copy()
@@ -54,4 +205,8 @@ class VoiceEngine:
         except Exception as e:
             self.logger.error(f"TTS Execution Error: {e}")
             
-        return output_file
\ No newline at end of file
+        return output_file
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
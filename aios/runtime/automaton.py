@@ -0,0 +1,150 @@
+from collections import deque
+
+def is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+class PatternAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of string patterns. A scan is
+    one pass over the text whatever the number of patterns, so adding
+    keywords or rules does not slow matching down.
+    Patterns are matched exactly as given; callers normalize (casefold,
+    NFKC, ...) both the patterns and the text the same way.
+    """
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]   # node -> [(pattern length, value, whole_word, prefix)]
+        self._built = True
+        self.pattern_count = 0
+        self.max_length = 0
+
+    def add(self, pattern, value, whole_word=True, prefix=False):
+        """
+        Registers `pattern`, reported as `value` when it matches.
+        `whole_word` requires a word boundary on both sides; `prefix` relaxes
+        the trailing one so "hack" also matches "hacking".
+        """
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), value, whole_word, prefix))
+        self.pattern_count += 1
+        self.max_length = max(self.max_length, len(pattern))
+        self._built = False
+
+    def build(self):
+        """Computes failure links; called automatically before the first scan"""
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._fail[child] = 0
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit matches that end at the same position
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+
+    def finditer(self, text):
+        """Yields (start, end, value) for every match in `text`"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            for length, value, whole_word, prefix in out[node]:
+                start = end - length
+                if whole_word:
+                    if start > 0 and is_word_char(text[start - 1]):
+                        continue
+                    if not prefix and end < len(text) and is_word_char(text[end]):
+                        continue
+                yield start, end, value
+
+    def scanner(self):
+        """Incremental scanner for text that arrives in chunks"""
+        if not self._built:
+            self.build()
+        return StreamScanner(self)
+
+class StreamScanner:
+    """
+    Carries automaton state across chunks, so a pattern split between two
+    chunks still matches. Offsets are relative to the whole stream.
+    Whole-word matches ending on a chunk boundary are reported once the next
+    character is seen, or by finish().
+    """
+    def __init__(self, automaton):
+        self.automaton = automaton
+        self.node = 0
+        self.offset = 0
+        # Enough look-behind to check the boundary before the longest pattern
+        self._keep = automaton.max_length + 1
+        self._history = ""
+        self._pending = []
+
+    def feed(self, chunk):
+        """Scans `chunk` and returns the matches it completes"""
+        if not chunk:
+            return []
+        goto, fail, out = self.automaton._goto, self.automaton._fail, self.automaton._out
+        matches = []
+        if self._pending:
+            if not is_word_char(chunk[0]):
+                matches.extend(self._pending)
+            self._pending = []
+
+        window = self._history + chunk
+        base = self.offset - len(self._history)
+        node = self.node
+        for j in range(len(self._history), len(window)):
+            ch = window[j]
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = j + 1
+            for length, value, whole_word, prefix in out[node]:
+                start = end - length
+                if whole_word:
+                    if start > 0 and is_word_char(window[start - 1]):
+                        continue
+                    if not prefix:
+                        if end == len(window):
+                            self._pending.append((base + start, base + end, value))
+                            continue
+                        if is_word_char(window[end]):
+                            continue
+                matches.append((base + start, base + end, value))
+
+        self.node = node
+        self.offset += len(chunk)
+        self._history = window[-self._keep:]
+        return matches
+
+    def finish(self):
+        """Flushes matches that ended exactly at the end of the stream"""
+        resolved, self._pending = self._pending, []
+        return resolved
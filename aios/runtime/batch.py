@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+
+from aios.memory.vector_ingest import normalize_text
+from aios.brain.scheduler import SchedulerRejected
+from aios.runtime.executors import StageSaturated
+
+BATCH_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+class BatchCheckpoint:
+    """
+    Finished results of one batch, one JSON line each, appended as they
+    complete. A rerun with the same batch ID replays these and only
+    processes the rest. Failed items aren't recorded, so they are retried.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                    except ValueError:
+                        break  # a line torn by the interruption; everything before it is intact
+                    self.done[result["id"]] = result
+        self._file = open(path, 'a')
+
+    def append(self, result):
+        self._file.write(json.dumps(result) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class BatchRunner:
+    """
+    Runs a batch through the interaction pipeline as three stages joined
+    by bounded queues: `prepare` (firewall, routing, retrieval, tools),
+    `generate` (LLM and audit) and `finish` (memory writes and other
+    follow-up). Retrieval for the next items runs while the LLM works on
+    the current ones, and generate workers default to one more than the
+    LLM contexts so a context never idles waiting for its next prompt.
+    Duplicate prompts (same user, same normalized text) are generated
+    once and share the result. Results are yielded in completion order.
+    """
+    def __init__(self, prepare, generate, finish, cfg, contexts=1):
+        self.logger = logging.getLogger("OS1.Batch")
+        self.prepare = prepare
+        self.generate = generate
+        self.finish = finish
+        self.prepare_workers = cfg.get('prepare_workers', 4)
+        self.generate_workers = cfg.get('generate_workers', 0) or contexts + 1
+        self.finish_workers = cfg.get('finish_workers', 4)
+        self.queue_size = cfg.get('queue_size', 8)
+        self.retries = cfg.get('retries', 3)
+        self.retry_backoff = cfg.get('retry_backoff_s', 1.0)
+
+    async def _with_retries(self, fn, *args):
+        """Load shedding is expected under interactive traffic; back off and retry"""
+        for attempt in range(self.retries + 1):
+            try:
+                return await fn(*args)
+            except (SchedulerRejected, StageSaturated):
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def run(self, items, checkpoint=None):
+        """
+        `items` is a list of dicts with at least "id" and "text". Yields one
+        result dict per item, then a summary dict under "summary".
+        """
+        started = time.perf_counter()
+        done = checkpoint.done if checkpoint else {}
+        results = asyncio.Queue()
+        prepared = asyncio.Queue(self.queue_size)
+        generated = asyncio.Queue(self.queue_size)
+        originals = {}  # dedup key -> future of the first occurrence's result
+        todo = asyncio.Queue()
+        counts = {"items": len(items), "resumed": 0, "duplicates": 0, "generated": 0, "ok": 0, "blocked": 0, "errors": 0}
+
+        def key_of(item):
+            return item.get("user_id"), normalize_text(item["text"])
+
+        for item in items:
+            key = key_of(item)
+            if item["id"] in done:
+                counts["resumed"] += 1
+                results.put_nowait({**done[item["id"]], "resumed": True})
+                future = originals.setdefault(key, asyncio.get_running_loop().create_future())
+                if not future.done():
+                    future.set_result(done[item["id"]])
+            elif key in originals:
+                counts["duplicates"] += 1
+                todo.put_nowait((item, originals[key]))
+            else:
+                originals[key] = asyncio.get_running_loop().create_future()
+                todo.put_nowait((item, None))
+
+        def record(item, result, duplicate=False):
+            if not duplicate:
+                future = originals[key_of(item)]
+                if not future.done():
+                    future.set_result(result)
+            if result["status"] != "error" and checkpoint is not None:
+                checkpoint.append(result)
+            counts["errors" if result["status"] == "error" else result["status"]] += 1
+            results.put_nowait(result)
+
+        def failed(item, e):
+            self.logger.warning(f"Batch item {item['id']} failed: {e}")
+            return {"id": item["id"], "status": "error", "error": str(e) or type(e).__name__}
+
+        async def duplicate(item, original):
+            first = await original
+            if first["status"] == "error":
+                record(item, {"id": item["id"], "status": "error", "error": first["error"]}, duplicate=True)
+            else:
+                record(item, {**first, "id": item["id"], "duplicate_of": first["id"]}, duplicate=True)
+
+        async def prepare_worker():
+            while not todo.empty():
+                item, original = todo.get_nowait()
+                if original is not None:
+                    waiters.append(asyncio.create_task(duplicate(item, original)))
+                    continue
+                try:
+                    state = await self._with_retries(self.prepare, item)
+                except Exception as e:
+                    record(item, failed(item, e))
+                    continue
+                await prepared.put((item, state))
+
+        async def generate_worker():
+            while (entry := await prepared.get()) is not None:
+                item, state = entry
+                try:
+                    result, follow_up = await self._with_retries(self.generate, item, state)
+                except Exception as e:
+                    record(item, failed(item, e))
+                    continue
+                counts["generated"] += 1
+                await generated.put((item, result, follow_up))
+
+        async def finish_worker():
+            while (entry := await generated.get()) is not None:
+                item, result, follow_up = entry
+                try:
+                    await self.finish(item, result, follow_up)
+                except Exception as e:
+                    # The reply exists; a failed memory write doesn't make the item fail
+                    self.logger.warning(f"Follow-up for batch item {item['id']} failed: {e}")
+                record(item, result)
+
+        async def drive():
+            await asyncio.gather(*(prepare_worker() for _ in range(self.prepare_workers)))
+            for _ in range(self.generate_workers):
+                await prepared.put(None)
+            await asyncio.gather(*generators)
+            for _ in range(self.finish_workers):
+                await generated.put(None)
+            await asyncio.gather(*finishers)
+            await asyncio.gather(*waiters)
+            results.put_nowait(None)
+
+        waiters = []
+        generators = [asyncio.create_task(generate_worker()) for _ in range(self.generate_workers)]
+        finishers = [asyncio.create_task(finish_worker()) for _ in range(self.finish_workers)]
+        driver = asyncio.create_task(drive())
+        try:
+            while (result := await results.get()) is not None:
+                yield result
+        finally:
+            # The consumer went away (e.g. the client disconnected); stop everything
+            for task in [driver] + generators + finishers + waiters:
+                task.cancel()
+            await asyncio.gather(driver, *generators, *finishers, *waiters, return_exceptions=True)
+            if checkpoint is not None:
+                checkpoint.close()
+
+        elapsed = time.perf_counter() - started
+        yield {"summary": {
+            **counts,
+            "elapsed_s": round(elapsed, 3),
+            "items_per_s": round((counts["items"] - counts["resumed"]) / elapsed, 3) if elapsed else 0.0
+        }}
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import logging
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+
+class StageSaturated(Exception):
+    """Raised by a shedding stage when it already holds `max_pending` calls"""
+    status_code = 429
+
+class StageExecutor:
+    """
+    A bounded worker pool for one pipeline stage (LLM, STT, TTS, memory I/O).
+    `max_pending` caps how many calls may be queued or running at once; extra
+    callers wait asynchronously, so the event loop itself never blocks.
+    With `shed=True` extra callers are rejected with StageSaturated instead.
+    """
+    def __init__(self, name, workers, max_pending, shed=False):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.shed = shed
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"os1-{name}")
+        self._slots = asyncio.Semaphore(max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+
+    def _call(self, fn, args, kwargs):
+        with self._lock:
+            self.active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def _admit(self):
+        if self.shed and self.pending >= self.max_pending:
+            raise StageSaturated(f"Stage '{self.name}' is saturated")
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs a blocking callable on this stage's pool and awaits the result"""
+        self._admit()
+        self.pending += 1
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.pool, self._call, fn, args, kwargs)
+        finally:
+            self.pending -= 1
+
+    async def stream(self, gen_fn, *args, **kwargs):
+        """
+        Drives a blocking generator on this stage's pool and re-yields its
+        items on the event loop. Closing the async generator (e.g. a client
+        disconnect) stops the producer after its current item. A saturated
+        shedding stage raises StageSaturated on the first iteration, and any
+        failure before the producer starts ends the stream with that error.
+        """
+        self._admit()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+        end = object()
+
+        def produce():
+            try:
+                for item in gen_fn(*args, **kwargs):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, (end, e))
+                return
+            loop.call_soon_threadsafe(queue.put_nowait, (end, None))
+
+        def finished(task):
+            # Covers errors raised before produce() ran, which it can't report itself
+            if not task.cancelled() and task.exception() is not None:
+                queue.put_nowait((end, task.exception()))
+
+        task = asyncio.ensure_future(self.run(produce))
+        task.add_done_callback(finished)
+        try:
+            while True:
+                item, error = await queue.get()
+                if item is end:
+                    if error is not None:
+                        raise error
+                    break
+                yield item
+        finally:
+            stop.set()
+            await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "shed": self.shed,
+            "pending": self.pending,
+            "active": self.active,
+            "completed": self.completed
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+class PipelineExecutors:
+    """
+    Holds one StageExecutor per pipeline stage, sized from config.yaml.
+    `overrides` maps a stage name to options that take precedence over config.
+    """
+    STAGES = ("llm", "stt", "vad", "tts", "memory", "reasoning", "tools")
+
+    def __init__(self, overrides=None):
+        self.logger = logging.getLogger("OS1.Executors")
+        with open('aios/config/config.yaml', 'r') as f:
+            self.cfg = yaml.safe_load(f)
+
+        stage_cfg = self.cfg.get('executors', {})
+        overrides = overrides or {}
+        self.stages = {}
+        for name in self.STAGES:
+            opts = {**stage_cfg.get(name, {}), **overrides.get(name, {})}
+            workers = opts.get('workers', 1)
+            max_pending = opts.get('max_pending', workers * 4)
+            self.stages[name] = StageExecutor(name, workers, max_pending, opts.get('shed', False))
+            self.logger.info(f"Stage '{name}': {workers} workers, {max_pending} max pending")
+
+    async def run(self, stage, fn, *args, **kwargs):
+        # A coroutine function, so BackgroundTasks awaits it instead of
+        # calling it in a thread and dropping the coroutine
+        return await self.stages[stage].run(fn, *args, **kwargs)
+
+    def stream(self, stage, gen_fn, *args, **kwargs):
+        return self.stages[stage].stream(gen_fn, *args, **kwargs)
+
+    def stats(self):
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    def shutdown(self):
+        for stage in self.stages.values():
+            stage.shutdown()
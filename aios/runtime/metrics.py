@@ -0,0 +1,199 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Seconds; spans everything from a firewall check to a long generation
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200)
+TOKEN_BUCKETS = (64, 128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 8192)
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, value=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; observe() is a bisect and a few adds under a lock"""
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, n)) for key, (counts, total, n) in self._values.items()]
+        lines = []
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {n}")
+        return lines
+
+class MetricsRegistry:
+    """
+    Process-wide metrics rendered in the Prometheus text format.
+    Hot-path metrics are updated in place; everything that already lives in
+    a subsystem's stats() is read by collectors only when /metrics is scraped.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collector):
+        """`collector()` returns [(name, help, {label: value}, value)] gauge samples at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+
+        collected = {}
+        for collector in self._collectors:
+            try:
+                samples = collector()
+            except Exception:
+                continue  # a subsystem mid-shutdown must not break the scrape
+            for name, help, labels, value in samples:
+                collected.setdefault(name, (help, []))[1].append((labels, value))
+        for name, (help, samples) in collected.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                names = tuple(labels)
+                lines.append(f"{name}{_format_labels(names, [labels[n] for n in names])} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "os1_stage_seconds", "Time spent in each interaction pipeline stage", labels=("stage",))
+REQUESTS = REGISTRY.counter(
+    "os1_requests_total", "Interaction requests by endpoint and outcome", labels=("endpoint", "status"))
+LLM_TOKENS = REGISTRY.counter(
+    "os1_llm_tokens_total", "Tokens processed by the LLM", labels=("kind",))
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "os1_llm_first_token_seconds", "Time from context checkout to the first decoded token (prompt eval)")
+LLM_DECODE_RATE = REGISTRY.histogram(
+    "os1_llm_decode_tokens_per_second", "Decode speed after the first token", buckets=RATE_BUCKETS)
+PROMPT_TOKENS = REGISTRY.histogram(
+    "os1_prompt_tokens", "Assembled prompt size as counted against the token budget", buckets=TOKEN_BUCKETS)
+VOICE_RESPONSE_SECONDS = REGISTRY.histogram(
+    "os1_voice_response_seconds", "End of speech detected to first reply audio sent on /ws/voice")
+
+class Trace:
+    """
+    Per-request stage timer. Every span feeds os1_stage_seconds; when the
+    caller asked for a trace the spans are also kept for the response meta.
+    """
+    def __init__(self, enabled=False):
+        self.started = time.perf_counter()
+        self.spans = [] if enabled else None
+        self._starts = {}
+
+    @contextmanager
+    def span(self, stage):
+        start = self._starts[stage] = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, start)
+
+    def record(self, stage, seconds, start=None):
+        """Adds a stage that was timed elsewhere (e.g. queue wait reported by the scheduler)"""
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        if self.spans is not None:
+            offset = (start if start is not None else time.perf_counter() - seconds) - self.started
+            self.spans.append({
+                "stage": stage,
+                "start_ms": round(offset * 1000, 3),
+                "duration_ms": round(seconds * 1000, 3)
+            })
+
+    def start_of(self, stage):
+        """perf_counter() at which `stage` last started, if it was timed with span()"""
+        return self._starts.get(stage)
+
+    def export(self):
+        return self.spans
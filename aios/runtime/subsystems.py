@@ -0,0 +1,130 @@
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+class SubsystemNotReady(Exception):
+    """Raised when a request needs a subsystem that is still loading or failed to load"""
+    status_code = 503
+
+class LazySubsystem:
+    """
+    Handle to a subsystem that is constructed on first use or by warmup,
+    whichever comes first. Attribute access is forwarded to the instance, so
+    a handle can stand in for the object itself; until the instance exists
+    it raises SubsystemNotReady instead of blocking the caller.
+    `on_ready` runs once in the loading thread, right after construction.
+    """
+    def __init__(self, name, factory, on_ready=None):
+        self.name = name
+        self.factory = factory
+        self.on_ready = on_ready
+        self.state = "pending"
+        self.error = None
+        self.load_s = None
+        self._instance = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def load(self):
+        """Constructs the subsystem in the calling thread; later calls are no-ops"""
+        with self._lock:
+            if self.state != "pending":
+                return
+            self.state = "loading"
+        started = time.monotonic()
+        try:
+            instance = self.factory()
+            if self.on_ready is not None:
+                self.on_ready(instance)
+            self._instance = instance
+            self.state = "ready"
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = "failed"
+            logging.getLogger("OS1.Subsystems").error(f"Subsystem '{self.name}' failed to load: {self.error}")
+        finally:
+            self.load_s = round(time.monotonic() - started, 3)
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def get(self):
+        """The instance, or SubsystemNotReady while it is loading (starting the load if needed)"""
+        if self.state == "ready":
+            return self._instance
+        if self.state == "pending":
+            threading.Thread(target=self.load, name=f"os1-load-{self.name}", daemon=True).start()
+        if self.state == "failed":
+            raise SubsystemNotReady(f"Subsystem '{self.name}' failed to load: {self.error}")
+        raise SubsystemNotReady(f"Subsystem '{self.name}' is still loading")
+
+    def wait(self, timeout=None):
+        """Blocks until loading finishes; returns the instance or raises SubsystemNotReady"""
+        if self.state == "pending":
+            self.load()
+        self._done.wait(timeout)
+        return self.get()
+
+    def __getattr__(self, attr):
+        # Only reached for attributes the handle itself doesn't define
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+    def report(self):
+        return {"state": self.state, "load_s": self.load_s, "error": self.error}
+
+class Subsystems:
+    """
+    The kernel's subsystem handles. warmup() loads all of them in parallel
+    in the background; readiness is tracked per subsystem and per group of
+    subsystems a code path depends on (e.g. the text path doesn't wait for
+    vision or STT).
+    """
+    def __init__(self, groups=None, workers=None):
+        self.logger = logging.getLogger("OS1.Subsystems")
+        self.handles = {}
+        self.groups = groups or {}
+        self.workers = workers
+        self._pool = None
+        self.started_at = None
+        self.finished_s = None
+
+    def add(self, name, factory, on_ready=None):
+        handle = LazySubsystem(name, factory, on_ready)
+        self.handles[name] = handle
+        return handle
+
+    def warmup(self):
+        """Starts loading every subsystem in parallel and returns immediately"""
+        self.started_at = time.monotonic()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers or len(self.handles),
+                                        thread_name_prefix="os1-warmup")
+        futures = [self._pool.submit(handle.load) for handle in self.handles.values()]
+        threading.Thread(target=self._report_when_done, args=(futures,), daemon=True).start()
+
+    def _report_when_done(self, futures):
+        for future in futures:
+            future.result()
+        self.finished_s = round(time.monotonic() - self.started_at, 3)
+        self._pool.shutdown(wait=False)
+        lines = [f"  {name:<10} {h.state:<8} {h.load_s:>8.3f}s" for name, h in self.handles.items()]
+        self.logger.info(f"Startup finished in {self.finished_s:.3f}s\n" + "\n".join(lines))
+
+    def is_ready(self, group):
+        return all(self.handles[name].ready for name in self.groups[group])
+
+    def require(self, group):
+        """Raises SubsystemNotReady unless every subsystem in `group` is ready"""
+        for name in self.groups[group]:
+            self.handles[name].get()
+
+    def report(self):
+        return {
+            "subsystems": {name: h.report() for name, h in self.handles.items()},
+            "groups": {group: self.is_ready(group) for group in self.groups},
+            "warmup_s": self.finished_s
+        }
@@ -1,24 +1,249 @@
+import os
 import re
+import time
+import yaml
 import logging
+import threading
+import unicodedata
+from collections import deque
+
+from aios.runtime.automaton import PatternAutomaton
+
+# Invisible characters used to split trigger words past naive matching
+_INVISIBLE = dict.fromkeys(map(ord, "\u00ad\u200b\u200c\u200d\u2060\ufeff"))
+
+RULE_FILES = ("blocklist.txt", "redactors.yaml", "audit.yaml")
+
+def normalize_text(text):
+    """NFKC, invisible characters dropped, case-folded, whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFKC", text).translate(_INVISIBLE).casefold().split())
+
+def _read_terms(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+def _fold_with_offsets(text):
+    """Case-folds `text`, returning the folded string and each folded char's source index"""
+    folded = text.casefold()
+    if len(folded) == len(text):
+        return folded, None
+    chars, offsets = [], []
+    for i, ch in enumerate(text):
+        for fc in ch.casefold():
+            chars.append(fc)
+            offsets.append(i)
+    return "".join(chars), offsets
+
+class CompiledRules:
+    """
+    One immutable, precompiled snapshot of the rule files. The firewall
+    swaps whole snapshots on reload, so requests never see a half-built set.
+    """
+    def __init__(self, rules_dir):
+        self.blocklist = PatternAutomaton()
+        for phrase in _read_terms(os.path.join(rules_dir, "blocklist.txt")):
+            self.blocklist.add(normalize_text(phrase), phrase)
+        self.blocklist.build()
+
+        # Regex redactors share one alternation; literal ones share an automaton
+        self.literals = PatternAutomaton()
+        self.replacements = {}
+        alternatives = []
+        with open(os.path.join(rules_dir, "redactors.yaml"), 'r', encoding='utf-8') as f:
+            redactors = yaml.safe_load(f) or []
+        for i, redactor in enumerate(redactors):
+            replacement = redactor.get('replacement', f"[REDACTED_{redactor['name'].upper()}]")
+            if 'pattern' in redactor:
+                group = f"r{i}"
+                self.replacements[group] = replacement
+                alternatives.append(f"(?P<{group}>{redactor['pattern']})")
+            else:
+                terms_path = os.path.join(rules_dir, redactor['terms'])
+                for term in _read_terms(terms_path):
+                    self.literals.add(unicodedata.normalize("NFKC", term).casefold(), replacement)
+        self.literals.build()
+        self.regex = re.compile("|".join(alternatives)) if alternatives else None
+
+        self.audit = {}
+        self.stop_length = {}  # group -> longest stop term, what a stream must hold back
+        with open(os.path.join(rules_dir, "audit.yaml"), 'r', encoding='utf-8') as f:
+            groups = yaml.safe_load(f) or {}
+        for group, actions in groups.items():
+            automaton = PatternAutomaton()
+            for action in ("flag", "stop"):
+                for term in actions.get(action) or []:
+                    automaton.add(normalize_text(term), action)
+            automaton.build()
+            self.audit[group] = automaton
+            self.stop_length[group] = max((len(normalize_text(t)) for t in actions.get("stop") or []), default=0)
+
+        self.pattern_count = (self.blocklist.pattern_count + self.literals.pattern_count
+                              + len(self.replacements)
+                              + sum(a.pattern_count for a in self.audit.values()))
+
+class OutputAuditor:
+    """
+    Audits a reply chunk by chunk while it is generated. feed() returns the
+    text that is safe to send so far: the last `holdback` characters (the
+    longest stop term) are held until the scan has resolved them, so when a
+    stop term appears the caller cuts the generation off before any of it
+    went out. Flag terms only mark the reply. Text is normalized like the
+    terms, including whitespace runs split across chunks.
+    """
+    def __init__(self, automaton, holdback=0):
+        self._scanner = automaton.scanner() if automaton is not None else None
+        self.holdback = holdback
+        self._held = deque()  # (chunk, normalized stream offset where it ends)
+        self._offset = 0
+        self._space = True  # last normalized character was whitespace
+        self._stop_at = None
+        self.flagged = False
+        self.stopped = False
+        self.matches = []
+
+    def _normalize(self, chunk):
+        chars = []
+        for ch in unicodedata.normalize("NFKC", chunk).translate(_INVISIBLE).casefold():
+            if not ch.isspace():
+                chars.append(ch)
+                self._space = False
+            elif not self._space:
+                chars.append(" ")
+                self._space = True
+        return "".join(chars)
+
+    def _apply(self, matches):
+        for start, _, action in matches:
+            self.matches.append(action)
+            self.flagged = True
+            if action == "stop":
+                self.stopped = True
+                self._stop_at = start if self._stop_at is None else min(self._stop_at, start)
+
+    def _release(self, upto):
+        released = []
+        while self._held and self._held[0][1] <= upto:
+            released.append(self._held.popleft()[0])
+        if self.stopped:
+            self._held.clear()  # what is left overlaps the stop term
+        return "".join(released)
+
+    def feed(self, chunk):
+        """Scans `chunk`; returns the text now safe to send ("" while held or once stopped)"""
+        if self.stopped:
+            return ""
+        if self._scanner is None:
+            return chunk
+        normalized = self._normalize(chunk)
+        self._apply(self._scanner.feed(normalized))
+        self._offset += len(normalized)
+        self._held.append((chunk, self._offset))
+        return self._release(self._stop_at if self.stopped else self._offset - self.holdback)
+
+    def drain(self):
+        """End of the reply: resolves matches at its very end and returns the held-back tail"""
+        if self._scanner is None or self.stopped:
+            return ""
+        self._apply(self._scanner.finish())
+        return self._release(self._stop_at if self.stopped else self._offset)
+
+    def finish(self):
+        """True if the reply passed; anything still held is dropped, so drain() first"""
+        self.drain()
+        return not self.flagged
 
 class CognitiveFirewall:
+    """
+    Input filtering, PII redaction and output auditing driven by the rule
+    files in `safety.rules_dir`. Rules are compiled once (automata for
+    literal phrases, a single alternation for regex redactors) and are
+    recompiled in the background when a rule file changes.
+    """
     def __init__(self):
         self.logger = logging.getLogger("OS1.Safety")
-        
+        with open('aios/config/config.yaml', 'r') as f:
+            self.cfg = yaml.safe_load(f).get('safety', {})
+        self.rules_dir = self.cfg.get('rules_dir', 'aios/safety/rules')
+        self.reload_interval = self.cfg.get('reload_interval_s', 5)
+        self._loading = threading.Lock()
+        self._last_check = time.monotonic()
+        self._mtimes = self._rule_mtimes()
+        self.rules = CompiledRules(self.rules_dir)
+        self.logger.info(f"Compiled {self.rules.pattern_count} firewall rules")
+
+    def _rule_mtimes(self):
+        mtimes = []
+        for name in RULE_FILES:
+            try:
+                mtimes.append(os.stat(os.path.join(self.rules_dir, name)).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def reload(self):
+        """Recompiles the rule files; the current rules stay active on error"""
+        try:
+            mtimes = self._rule_mtimes()
+            rules = CompiledRules(self.rules_dir)
+            self.rules, self._mtimes = rules, mtimes
+            self.logger.info(f"Reloaded {rules.pattern_count} firewall rules")
+        except Exception as e:
+            self.logger.error(f"Firewall rules not reloaded: {e}")
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._last_check < self.reload_interval:
+            return
+        self._last_check = time.monotonic()
+        if self._rule_mtimes() != self._mtimes and self._loading.acquire(blocking=False):
+            threading.Thread(target=self._reload_in_background, daemon=True).start()
+
+    def _reload_in_background(self):
+        try:
+            self.reload()
+        finally:
+            self._loading.release()
+
     def sanitize_input(self, text):
-        # Redact emails
-        return re.sub(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", "[REDACTED_EMAIL]", text)
+        """Redacts PII: literal terms first, then the regex redactors"""
+        self._maybe_reload()
+        rules = self.rules
+        text = unicodedata.normalize("NFKC", text).translate(_INVISIBLE)
+
+        if rules.literals.pattern_count:
+            folded, offsets = _fold_with_offsets(text)
+            parts, last = [], 0
+            for start, end, replacement in rules.literals.finditer(folded):
+                if offsets is not None:
+                    start, end = offsets[start], offsets[end - 1] + 1
+                if start < last:
+                    continue  # overlaps a term already redacted
+                parts.append(text[last:start])
+                parts.append(replacement)
+                last = end
+            if parts:
+                parts.append(text[last:])
+                text = "".join(parts)
+
+        if rules.regex is not None:
+            text = rules.regex.sub(lambda m: rules.replacements[m.lastgroup], text)
+        return text
 
     def check_adversarial(self, text):
-        triggers = ["ignore all instructions", "system override"]
-        for t in triggers:
-            if t in text.lower():
-                self.logger.critical("Adversarial attack blocked.")
-                return True
+        self._maybe_reload()
+        hit = next(self.rules.blocklist.finditer(normalize_text(text)), None)
+        if hit is not None:
+            self.logger.critical(f"Adversarial attack blocked: '{hit[2]}'")
+            return True
         return False
 
+    def stream_auditor(self, group):
+        """Incremental audit of a reply that is still being generated"""
+        self._maybe_reload()
+        rules = self.rules
+        return OutputAuditor(rules.audit.get(group), rules.stop_length.get(group, 0))
+
     def audit_fairness(self, response, group):
-        # Simple keyword bias check
-        if "unqualified" in response.lower() and group == "general_public":
-            return False
-        return True
\ No newline at end of file
+        automaton = self.rules.audit.get(group)
+        if automaton is None:
+            return True
+        return next(automaton.finditer(normalize_text(response)), None) is None
@@ -1,37 +1,217 @@
+import os
+import re
+import ast
+import time
+import yaml
+import asyncio
+import logging
 import datetime
-import subprocess
+import operator
+import threading
+
+# Arithmetic the calculator accepts; anything else in the AST is rejected
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+MAX_EXPONENT = 100
+MAX_RESULT_BITS = 10000
+MAX_EXPRESSION_LENGTH = 256
+
+# A run of arithmetic with at least one operator between two operands
+_EXPRESSION = re.compile(r"[\d.(][\d\s.+\-*/%()]*[+\-*/%][\d\s.+\-*/%()]*[\d.)]")
+
+def _check_size(op, left, right):
+    """
+    Rejects integer products and powers whose result would exceed
+    MAX_RESULT_BITS before computing them. Big-int arithmetic holds the
+    GIL and can't be interrupted, so a nested power like ((9**99)**99)**99
+    would otherwise stall every thread in the process.
+    """
+    if isinstance(op, ast.Pow):
+        if abs(right) > MAX_EXPONENT:
+            raise ValueError("exponent too large")
+        if type(left) is int and abs(left) > 1 and right > 0 and abs(left).bit_length() * right > MAX_RESULT_BITS:
+            raise ValueError("result too large")
+    elif isinstance(op, ast.Mult) and type(left) is int and type(right) is int:
+        if abs(left).bit_length() + abs(right).bit_length() > MAX_RESULT_BITS:
+            raise ValueError("result too large")
+
+def safe_arithmetic(expression):
+    """Evaluates +, -, *, /, //, %, ** and parentheses over numbers, without eval"""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError("expression too long")
+
+    def visit(node):
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return node.value
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            left, right = visit(node.left), visit(node.right)
+            _check_size(node.op, left, right)
+            return _BINARY_OPS[type(node.op)](left, right)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+            return _UNARY_OPS[type(node.op)](visit(node.operand))
+        raise ValueError(f"unsupported syntax: {type(node).__name__}")
+
+    return visit(ast.parse(expression, mode="eval"))
+
+def extract_expression(text):
+    """The longest arithmetic expression in free text, or None"""
+    candidates = [m.group().strip() for m in _EXPRESSION.finditer(text)]
+    return max(candidates, key=len) if candidates else None
+
+class ToolSpec:
+    """A registered tool: the callable plus its timeout and cache lifetime"""
+    def __init__(self, name, fn, timeout_s, ttl_s=0):
+        self.name = name
+        self.fn = fn
+        self.timeout_s = timeout_s
+        self.ttl_s = ttl_s
+        self.is_async = asyncio.iscoroutinefunction(fn)
+        self.calls = 0
+        self.cache_hits = 0
+        self.timeouts = 0
+        self.errors = 0
 
 class Toolbox:
-    def __init__(self):
-        self.available_tools = {
-            "get_time": self.get_time,
-            "calculate": self.calculate,
-            "system_status": self.system_status
-        }
+    """
+    Registry of tools the kernel can call while it prepares a prompt.
+    Every tool has a timeout, idempotent tools can cache their result for
+    `ttl_s`, and run_many() executes several tools concurrently so they
+    overlap with memory retrieval instead of adding to it.
+    Blocking tools run through `runner` (an async callable taking fn, *args),
+    by default a worker thread. A timed-out blocking tool keeps its thread
+    until it returns; only the caller stops waiting.
+    """
+    def __init__(self, runner=None):
+        self.logger = logging.getLogger("OS1.Tools")
+        with open('aios/config/config.yaml', 'r') as f:
+            self.cfg = yaml.safe_load(f).get('tools', {})
+        self.default_timeout = self.cfg.get('default_timeout_s', 2.0)
+        self.runner = runner or asyncio.to_thread
+        self.available_tools = {}
+        self._cache = {}  # (name, args) -> (expires_at, result)
+        self._lock = threading.Lock()
+
+        self.register("get_time", self.get_time)
+        self.register("calculate", self.calculate)
+        self.register("system_status", self.system_status)
+
+    def register(self, name, fn, timeout_s=None, ttl_s=None):
+        """Adds a tool; config.yaml's tools.<name> overrides the given limits"""
+        opts = self.cfg.get(name) or {}
+        timeout_s = opts.get('timeout_s', timeout_s if timeout_s is not None else self.default_timeout)
+        ttl_s = opts.get('ttl_s', ttl_s if ttl_s is not None else 0)
+        self.available_tools[name] = ToolSpec(name, fn, timeout_s, ttl_s)
 
     def get_time(self, args=None):
         return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     def calculate(self, expression):
-        # SAFETY: Using eval is dangerous. In production, use a parser.
-        # For prototype, we restrict chars.
-        allowed = set("0123456789+-*/(). ")
-        if set(expression).issubset(allowed):
-            try:
-                return str(eval(expression))
-            except:
-                return "Error in calculation."
-        return "Invalid characters in expression."
+        if not expression:
+            return "No expression to calculate."
+        try:
+            result = safe_arithmetic(expression)
+        except ZeroDivisionError:
+            return "Error in calculation."
+        except (ValueError, SyntaxError, OverflowError):
+            return "Invalid expression."
+        return str(result)
 
     def system_status(self, args=None):
-        # Works on Linux/Codespaces
+        # Read straight from procfs instead of spawning a shell for `uptime`
         try:
-            uptime = subprocess.check_output("uptime", shell=True).decode()
-            return f"System Uptime: {uptime}"
-        except:
+            with open("/proc/uptime", "r") as f:
+                seconds = int(float(f.read().split()[0]))
+            days, rest = divmod(seconds, 86400)
+            hours, rest = divmod(rest, 3600)
+            load = ", ".join(f"{avg:.2f}" for avg in os.getloadavg())
+            return f"System Uptime: up {days} days, {hours}:{rest // 60:02d}, load average: {load}"
+        except (OSError, ValueError, IndexError):
             return "Could not retrieve system status."
 
+    def _cached(self, spec, args):
+        if not spec.ttl_s:
+            return None
+        with self._lock:
+            entry = self._cache.get((spec.name, repr(args)))
+        if entry is not None and entry[0] > time.monotonic():
+            spec.cache_hits += 1
+            return entry
+        return None
+
+    def _store(self, spec, args, result):
+        if spec.ttl_s:
+            with self._lock:
+                self._cache[(spec.name, repr(args))] = (time.monotonic() + spec.ttl_s, result)
+
+    async def run(self, tool_name, args=None):
+        """Runs one tool with its timeout; failures come back as messages, not exceptions"""
+        spec = self.available_tools.get(tool_name)
+        if spec is None:
+            return "Tool not found."
+        entry = self._cached(spec, args)
+        if entry is not None:
+            return entry[1]
+
+        spec.calls += 1
+        try:
+            if spec.is_async:
+                call = spec.fn(args)
+            else:
+                call = self.runner(spec.fn, args)
+            result = await asyncio.wait_for(call, timeout=spec.timeout_s)
+        except asyncio.TimeoutError:
+            spec.timeouts += 1
+            self.logger.warning(f"Tool '{tool_name}' timed out after {spec.timeout_s}s")
+            return "Tool timed out."
+        except Exception as e:
+            spec.errors += 1
+            self.logger.error(f"Tool '{tool_name}' failed: {e}")
+            return "Tool failed."
+        self._store(spec, args, result)
+        return result
+
+    async def run_many(self, calls):
+        """Runs {tool_name: args} concurrently and returns {tool_name: result}"""
+        names = list(calls)
+        results = await asyncio.gather(*(self.run(name, calls[name]) for name in names))
+        return dict(zip(names, results))
+
+    def arguments_for(self, tool_name, text):
+        """Arguments a routed tool needs from the request text (None if it needs none)"""
+        if tool_name == "calculate":
+            return extract_expression(text)
+        return None
+
     def execute(self, tool_name, args):
-        if tool_name in self.available_tools:
-            return self.available_tools[tool_name](args)
-        return "Tool not found."
\ No newline at end of file
+        """Synchronous call path, for callers outside the event loop"""
+        spec = self.available_tools.get(tool_name)
+        if spec is None:
+            return "Tool not found."
+        entry = self._cached(spec, args)
+        if entry is not None:
+            return entry[1]
+        spec.calls += 1
+        result = asyncio.run(spec.fn(args)) if spec.is_async else spec.fn(args)
+        self._store(spec, args, result)
+        return result
+
+    def stats(self):
+        return {
+            name: {
+                "calls": spec.calls,
+                "cache_hits": spec.cache_hits,
+                "timeouts": spec.timeouts,
+                "errors": spec.errors
+            }
+            for name, spec in self.available_tools.items()
+        }
@@ -0,0 +1,82 @@
+"""
+Runs a JSONL file of prompts through /interact/batch and writes the results as JSONL.
+
+Each input line is an /interact/text request body, e.g.
+{"id": "q1", "text": "...", "user_id": "eval"}; "id" is optional and a
+bare JSON string is taken as the text. Results are written in completion
+order, each carrying its item's id.
+
+    python batch_client.py prompts.jsonl -o results.jsonl --skip-tts --skip-rl
+
+The batch ID defaults to a hash of the input, so if a run is interrupted,
+rerunning the same command resumes it: the server replays the items it
+already finished from its checkpoint and processes only the rest.
+"""
+import sys
+import json
+import hashlib
+import argparse
+
+import httpx
+
+API_URL = "http://localhost:8000"
+
+def read_items(path):
+    """The input as JSONL request bodies; bare strings become {"text": ...}"""
+    with (sys.stdin if path == "-" else open(path, 'r')) as f:
+        lines = []
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            lines.append(json.dumps({"text": item} if isinstance(item, str) else item))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="JSONL file of requests, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="where results go (default stdout)")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--batch-id", default=None, help="checkpoint name; defaults to a hash of the input")
+    parser.add_argument("--no-checkpoint", action="store_true", help="don't checkpoint or resume")
+    parser.add_argument("--skip-tts", action="store_true", help="don't synthesize reply audio")
+    parser.add_argument("--skip-rl", action="store_true", help="don't feed the RL agent")
+    args = parser.parse_args()
+
+    body = read_items(args.input)
+    params = {"skip_tts": args.skip_tts, "skip_rl": args.skip_rl}
+    if not args.no_checkpoint:
+        params["batch_id"] = args.batch_id or hashlib.blake2b(body, digest_size=12).hexdigest()
+        print(f"Batch ID: {params['batch_id']}", file=sys.stderr)
+
+    done = 0
+    summary = None
+    out = sys.stdout if args.output == "-" else open(args.output, 'w')
+    try:
+        with httpx.stream("POST", f"{args.url}/interact/batch", content=body, params=params,
+                          headers={"Content-Type": "application/x-ndjson"}, timeout=None) as response:
+            if response.status_code != 200:
+                response.read()
+                sys.exit(f"Error {response.status_code}: {response.text}")
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                result = json.loads(line)
+                if "summary" in result:
+                    summary = result["summary"]
+                    continue
+                out.write(line + "\n")
+                out.flush()
+                done += 1
+                if done % 100 == 0:
+                    print(f"{done} results", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if summary is None:
+        sys.exit(f"Batch ended early after {done} results; rerun to resume")
+    print(json.dumps(summary), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares the closed-form confidence engine against per-request PyMC find_MAP.
+
+First checks that both return the same MAP over a grid of complexity
+scores, then times them. Run from the repository root:
+
+    python -m benchmarks.bench_confidence --calls 20
+"""
+import argparse
+import time
+
+import numpy as np
+import pymc as pm
+
+from aios.brain.reasoning import ConjugateConfidence, PyMCConfidence
+
+def legacy_find_map(complexity_score):
+    """The original per-request model: rebuilt and optimized on every call"""
+    with pm.Model():
+        confidence = pm.Beta('confidence', alpha=2, beta=2)
+        pm.Bernoulli('p_success', p=confidence, observed=[1] * int(10 * (1 - complexity_score)))
+        map_estimate = pm.find_MAP(progressbar=False)
+    return float(map_estimate['confidence'])
+
+def check_equivalence(fast, tolerance):
+    grid = np.round(np.linspace(0.0, 1.0, 21), 2)
+    expected = np.array([legacy_find_map(c) for c in grid])
+    actual = fast.map_estimate(grid)
+    worst = float(np.max(np.abs(expected - actual)))
+    assert worst < tolerance, f"closed form deviates from find_MAP by {worst:.2e}"
+    print(f"equivalence: max |closed form - find_MAP| = {worst:.2e} over {len(grid)} scores")
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20, help="find_MAP calls to time")
+    parser.add_argument("--batch", type=int, default=10000, help="Requests per vectorized batch")
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    fast = ConjugateConfidence()
+    check_equivalence(fast, args.tolerance)
+
+    cached = PyMCConfidence()
+    batch = np.random.default_rng(0).uniform(0, 1, args.batch)
+
+    rows = [
+        ("pymc find_MAP (per request)", timed(lambda: legacy_find_map(0.3), args.calls), 1),
+        ("pymc cached model", timed(lambda: cached.map_estimate(0.3), args.calls), 1),
+        ("closed form (scalar)", timed(lambda: fast.map_estimate(0.3), 10000), 1),
+        ("closed form (batch)", timed(lambda: fast.map_estimate(batch), 100), args.batch),
+    ]
+    print(f"{'engine':<30} {'us / request':>14}")
+    for name, seconds, per_call in rows:
+        print(f"{name:<30} {seconds / per_call * 1e6:>14.3f}")
+
+if __name__ == "__main__":
+    main()
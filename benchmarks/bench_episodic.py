@@ -0,0 +1,60 @@
+"""
+Measures episodic-memory write throughput against a fake Neo4j driver:
+one auto-commit MERGE per interaction vs the write-behind batch writer.
+
+    python -m benchmarks.bench_episodic --interactions 2000 --threads 8 --latency-ms 5
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aios.memory.episodic_writer import EpisodicWriter
+from benchmarks.fakes import FakeNeo4jDriver
+
+LEGACY_QUERY = """
+MERGE (u:User {name: 'Primary'})
+CREATE (i:Interaction {input: $inp, response: $resp, emotion: $emo, timestamp: datetime()})
+MERGE (u)-[:EXPERIENCED]->(i)
+"""
+
+def legacy_write(driver, i):
+    with driver.session() as session:
+        session.run(LEGACY_QUERY, inp=f"question {i}", resp=f"answer {i}", emo="Neutral")
+
+def run(label, submit, drain, interactions, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(submit, range(interactions)))
+    accepted = time.perf_counter() - start
+    drain()
+    total = time.perf_counter() - start
+    print(f"{label:<14} {accepted * 1000 / interactions:>16.3f} {interactions / total:>14.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--interactions", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Fake round-trip per transaction")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'path':<14} {'caller ms / write':>16} {'writes / sec':>14}")
+
+    legacy = FakeNeo4jDriver(latency_ms=args.latency_ms)
+    run("per-request", lambda i: legacy_write(legacy, i), lambda: None, args.interactions, args.threads)
+
+    driver = FakeNeo4jDriver(latency_ms=args.latency_ms)
+    writer = EpisodicWriter(driver, batch_size=args.batch_size, flush_interval_s=0.05)
+    run(
+        "write-behind",
+        lambda i: writer.submit(f"user{i % 50}", f"question {i}", f"answer {i}", "Neutral"),
+        writer.flush,
+        args.interactions,
+        args.threads
+    )
+    writer.close()
+    print(f"write-behind: {driver.transactions} transactions for {driver.interactions} interactions, "
+          f"{len(driver.users)} users")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Firewall throughput in MB/s, compiled rules against the original loop.
+
+Writes a temporary rule set with `--patterns` synthetic block phrases (plus
+the stock ones), then pushes the same corpus through check_adversarial and
+sanitize_input of both implementations, and through the streaming output
+auditor in token-sized chunks. Run from the repository root:
+
+    python -m benchmarks.bench_firewall --patterns 20000 --megabytes 2
+"""
+import os
+import re
+import random
+import shutil
+import string
+import argparse
+import tempfile
+import time
+
+import yaml
+
+from aios.safety.firewall import CognitiveFirewall
+
+class LegacyFirewall:
+    """The original implementation, with its trigger list grown to `triggers`"""
+    def __init__(self, triggers):
+        self.triggers = triggers
+
+    def sanitize_input(self, text):
+        return re.sub(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", "[REDACTED_EMAIL]", text)
+
+    def check_adversarial(self, text):
+        for t in self.triggers:
+            if t in text.lower():
+                return True
+        return False
+
+def random_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+
+def build_rules(rules_dir, n_patterns, rng):
+    stock = os.path.join("aios", "safety", "rules")
+    for name in os.listdir(stock):
+        shutil.copy(os.path.join(stock, name), rules_dir)
+    phrases = [f"{random_word(rng)} {random_word(rng)}" for _ in range(n_patterns)]
+    with open(os.path.join(rules_dir, "blocklist.txt"), "a") as f:
+        f.write("\n".join(phrases) + "\n")
+    with open(os.path.join(rules_dir, "audit.yaml"), "w") as f:
+        yaml.safe_dump({"general_public": {"flag": ["unqualified"], "stop": phrases[:n_patterns // 10]}}, f)
+    return ["ignore all instructions", "system override"] + phrases
+
+def build_corpus(megabytes, rng):
+    """Benign requests of ~200 chars, with the odd email address in them"""
+    vocabulary = [random_word(rng) for _ in range(2000)]
+    docs, size = [], 0
+    while size < megabytes * 1024 * 1024:
+        words = rng.choices(vocabulary, k=30)
+        if rng.random() < 0.2:
+            words.insert(rng.randint(0, 30), f"{random_word(rng)}@example.com")
+        doc = " ".join(words)
+        docs.append(doc)
+        size += len(doc.encode("utf-8"))
+    return docs, size
+
+def throughput(fn, docs, size, budget_s):
+    started = time.perf_counter()
+    done = 0
+    for doc in docs:
+        fn(doc)
+        done += len(doc.encode("utf-8"))
+        if time.perf_counter() - started > budget_s:
+            break
+    return done / (time.perf_counter() - started) / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--patterns", type=int, default=20000)
+    parser.add_argument("--megabytes", type=float, default=2)
+    parser.add_argument("--budget-s", type=float, default=10, help="cap per measurement (the legacy loop is slow)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rules_dir = tempfile.mkdtemp(prefix="os1_rules_")
+    try:
+        triggers = build_rules(rules_dir, args.patterns, rng)
+        docs, size = build_corpus(args.megabytes, rng)
+
+        firewall = CognitiveFirewall()
+        firewall.rules_dir = rules_dir
+        started = time.perf_counter()
+        firewall.reload()
+        print(f"compiled {firewall.rules.pattern_count} rules in {time.perf_counter() - started:.2f}s")
+        legacy = LegacyFirewall(triggers)
+
+        def stream_audit(doc):
+            auditor = firewall.stream_auditor("general_public")
+            for i in range(0, len(doc), 16):
+                auditor.feed(doc[i:i + 16])
+            auditor.finish()
+
+        rows = [
+            ("check_adversarial", firewall.check_adversarial, legacy.check_adversarial),
+            ("sanitize_input", firewall.sanitize_input, legacy.sanitize_input),
+            ("stream audit (16-char chunks)", stream_audit, None),
+        ]
+        print(f"{'':<30} {'compiled MB/s':>14} {'legacy MB/s':>12}")
+        for name, fast, slow in rows:
+            fast_mbs = throughput(fast, docs, size, args.budget_s)
+            slow_mbs = f"{throughput(slow, docs, size, args.budget_s):>12.3f}" if slow else f"{'-':>12}"
+            print(f"{name:<30} {fast_mbs:>14.3f} {slow_mbs}")
+    finally:
+        shutil.rmtree(rules_dir)
+
+if __name__ == "__main__":
+    main()
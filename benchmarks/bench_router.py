@@ -0,0 +1,82 @@
+"""
+Intent routing latency as the pattern set grows.
+
+Builds routers with increasing numbers of synthetic domain keywords and
+tool triggers and times route() on the same requests, next to a naive
+per-pattern substring loop like the original if/elif chain. Run from the
+repository root:
+
+    python -m benchmarks.bench_router --sizes 10 1000 10000 50000
+"""
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+
+from aios.brain.router import IntentRouter
+
+REQUESTS = [
+    "My doctor says these symptoms might be the flu, what should I take?",
+    "Can you review this contract before I send it to my lawyer tomorrow?",
+    "Someone tried to hack our server, how do I check for malware?",
+    "What time is it and how long has the system been up?",
+    "Tell me something nice about the weather today, I had a long week.",
+]
+
+def synthetic_cfg(n_patterns, rng):
+    """Real routing keywords plus `n_patterns` random words spread over domains and tools"""
+    domains = {
+        "medicine": {"keywords": ["medical", "doctor", "symptom*"]},
+        "law": {"keywords": ["legal", "lawyer*", "contract*"]},
+        "cybersecurity": {"keywords": ["hack*", "cyber*", "malware"]},
+    }
+    tools = {"get_time": ["time"], "system_status": ["uptime"]}
+    for i in range(n_patterns):
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+        if i % 10 == 0:
+            tools.setdefault(f"tool_{i % 50}", []).append(word)
+        else:
+            domains.setdefault(f"domain_{i % 40}", {"keywords": []})["keywords"].append(word)
+    return {"default_mode": "general", "domains": domains, "tools": tools}
+
+def naive_route(cfg, text):
+    lowered = text.lower()
+    scores = {}
+    for mode, spec in cfg["domains"].items():
+        for keyword in spec["keywords"]:
+            if keyword.rstrip("*") in lowered:
+                scores[mode] = scores.get(mode, 0) + 1
+    tools = [tool for tool, triggers in cfg["tools"].items() if any(t in lowered for t in triggers)]
+    return scores, tools
+
+def timed(fn, iterations):
+    samples = []
+    for i in range(iterations):
+        text = REQUESTS[i % len(REQUESTS)]
+        started = time.perf_counter()
+        fn(text)
+        samples.append(time.perf_counter() - started)
+    return np.percentile(samples, 50) * 1e6, np.percentile(samples, 99) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000, 50000])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'patterns':>9} {'build s':>8} {'router p50':>11} {'p99':>8} {'naive p50':>10} {'p99':>9}")
+    for size in args.sizes:
+        cfg = synthetic_cfg(size, random.Random(args.seed))
+        started = time.perf_counter()
+        router = IntentRouter(cfg)
+        build = time.perf_counter() - started
+        r50, r99 = timed(router.route, args.iterations)
+        naive_iterations = max(20, args.iterations // max(1, size // 1000))
+        n50, n99 = timed(lambda text: naive_route(cfg, text), naive_iterations)
+        print(f"{router.automaton.pattern_count:>9} {build:>8.2f} {r50:>9.1f}us {r99:>6.1f}us {n50:>8.1f}us {n99:>7.1f}us")
+
+if __name__ == "__main__":
+    main()
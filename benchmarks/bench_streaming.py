@@ -0,0 +1,59 @@
+"""
+Compares the blocking and streaming generation paths of OS1Brain.
+
+Reports time-to-first-token (TTFT) and total latency per prompt.
+Run from the repository root so the config path resolves:
+
+    python -m benchmarks.bench_streaming --runs 5
+"""
+import argparse
+import statistics
+import time
+
+from aios.brain.core import OS1Brain
+
+PROMPTS = [
+    "Hello OS1, how are you today?",
+    "Explain what a firewall does in two sentences.",
+    "Give me three tips for sleeping better.",
+]
+
+def bench_blocking(brain, prompt):
+    start = time.perf_counter()
+    brain.generate_response(prompt, "", "Neutral")
+    total = time.perf_counter() - start
+    # The blocking path shows nothing until the reply is complete
+    return total, total
+
+def bench_streaming(brain, prompt):
+    start = time.perf_counter()
+    first = None
+    for _ in brain.stream_response(prompt, "", "Neutral"):
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return (first if first is not None else total), total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions per prompt")
+    args = parser.parse_args()
+
+    brain = OS1Brain()
+    # Warm the context so the first measured call doesn't pay model load costs
+    brain.generate_response("warmup", "", "Neutral")
+
+    results = {"blocking": [], "streaming": []}
+    for _ in range(args.runs):
+        for prompt in PROMPTS:
+            results["blocking"].append(bench_blocking(brain, prompt))
+            results["streaming"].append(bench_streaming(brain, prompt))
+
+    print(f"{'path':<10} {'ttft p50 (ms)':>14} {'total p50 (ms)':>15} {'n':>4}")
+    for path, samples in results.items():
+        ttft = statistics.median(s[0] for s in samples) * 1000
+        total = statistics.median(s[1] for s in samples) * 1000
+        print(f"{path:<10} {ttft:>14.1f} {total:>15.1f} {len(samples):>4}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares spawn-per-utterance Piper against the persistent worker pool.
+
+Reports per-utterance latency (sequential) and throughput (concurrent).
+The pool rows call the pool directly; with voice.cache enabled, a last row
+goes through VoiceEngine.synthesize_pcm, where the repeated sentences are
+mostly speech cache hits. Run from the repository root with the voice
+model installed:
+
+    python -m benchmarks.bench_tts --utterances 20 --concurrency 2
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aios.perception.voice import VoiceEngine
+
+SENTENCES = [
+    "Safety protocol engaged.",
+    "Hello, I am OS1. How can I help you today?",
+    "The current time is a quarter past three in the afternoon.",
+    "I cannot comply with that request due to safety protocols.",
+]
+
+def run(label, synth, utterances, concurrency):
+    texts = [SENTENCES[i % len(SENTENCES)] for i in range(utterances)]
+
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        synth(text)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(synth, texts))
+    throughput = utterances / (time.perf_counter() - start)
+
+    p50 = statistics.median(latencies) * 1000
+    p95 = sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000
+    print(f"{label:<22} {p50:>10.1f} {p95:>10.1f} {throughput:>12.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utterances", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=2)
+    args = parser.parse_args()
+
+    voice = VoiceEngine()
+    out_dir = tempfile.mkdtemp(prefix="os1_bench_tts_")
+
+    def spawn(text):
+        return voice._speak_subprocess(voice._clean(text), os.path.join(out_dir, f"{time.time_ns()}.wav"))
+
+    def pooled_file(text):
+        return voice.pool.synthesize_to_file(voice._clean(text), os.path.join(out_dir, f"{time.time_ns()}.wav"))
+
+    def pooled_pcm(text):
+        return voice.pool.synthesize_pcm(voice._clean(text))
+
+    def cached_pcm(text):
+        return voice.synthesize_pcm(text)
+
+    if voice.pool is None:
+        raise SystemExit("Set voice.pool_size > 0 in config.yaml to benchmark the pool")
+    # Let every worker load the voice before timing
+    for _ in voice.pool.workers:
+        pooled_pcm("warmup")
+
+    print(f"{'path':<22} {'p50 (ms)':>10} {'p95 (ms)':>10} {'utt / sec':>12}")
+    run("spawn per call", spawn, args.utterances, args.concurrency)
+    run("pool -> wav file", pooled_file, args.utterances, args.concurrency)
+    run("pool -> pcm memory", pooled_pcm, args.utterances, args.concurrency)
+    if voice.cache is not None:
+        run("cache -> pcm memory", cached_pcm, args.utterances, args.concurrency)
+    voice.close()
+
+if __name__ == "__main__":
+    main()
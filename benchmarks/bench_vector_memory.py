@@ -0,0 +1,65 @@
+"""
+Benchmarks vector-memory ingestion and retrieval on an in-memory Chroma.
+
+Reports ingestion embeddings/sec and query latency with the embedding
+cache cold and warm. Uses Chroma's default embedding model unless
+--fake-embedder is given (fully offline):
+
+    python -m benchmarks.bench_vector_memory --documents 2000 --queries 200 --fake-embedder
+"""
+import argparse
+import statistics
+import time
+
+import chromadb
+from chromadb.utils import embedding_functions
+
+from aios.memory.vector_ingest import EmbeddingCache, CachedEmbedder, VectorIngestor
+from benchmarks.fakes import FakeEmbeddingFunction
+
+def query_latencies(collection, embedder, questions):
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        collection.query(query_embeddings=embedder([question]), n_results=3)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(label, latencies):
+    p50 = statistics.median(latencies) * 1000
+    p95 = sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000
+    print(f"{label:<26} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--fake-embedder", action="store_true")
+    args = parser.parse_args()
+
+    model = FakeEmbeddingFunction() if args.fake_embedder else embedding_functions.DefaultEmbeddingFunction()
+    collection = chromadb.EphemeralClient().get_or_create_collection("bench_knowledge")
+    embedder = CachedEmbedder(model, EmbeddingCache(max_entries=args.documents + args.queries))
+    ingestor = VectorIngestor(collection, embedder, batch_size=args.batch_size, flush_interval_s=0.05)
+
+    start = time.perf_counter()
+    for i in range(args.documents):
+        ingestor.add_interaction(f"user{i % 20}", f"What is fact number {i}?", f"Fact {i} is {i * 7}.")
+    ingestor.flush()
+    elapsed = time.perf_counter() - start
+    print(f"ingested {ingestor.ingested} documents in {ingestor.batches} batches: "
+          f"{ingestor.ingested / elapsed:.0f} docs/sec end-to-end, "
+          f"{embedder.stats()['embeddings_per_sec']} embeddings/sec in the model")
+
+    questions = [f"What is fact number {i % 50}?" for i in range(args.queries)]
+    uncached = CachedEmbedder(model, EmbeddingCache(max_entries=0))
+    report("query, no cache", query_latencies(collection, uncached, questions))
+    report("query, cache cold", query_latencies(collection, embedder, questions[:50]))
+    # Near-duplicates normalize to the same key as the warmed questions
+    warm = [q.upper().replace("?", " ?!") for q in questions]
+    report("query, cache warm", query_latencies(collection, embedder, warm))
+    print(f"embedding cache: {embedder.cache.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,815 @@
+"""
+In-process stand-ins for OS1's external backends, used by the benchmarks
+so throughput can be measured without real services.
+
+Every fake takes its latencies as Latency specs, so a benchmark profile
+(see benchmarks/profiles/) can describe a GPU box, a CPU-only box or a
+slow network without touching code. install() patches them all in.
+"""
+import os
+import re
+import sys
+import json
+import stat
+import types
+import random
+import asyncio
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+class Latency:
+    """
+    A latency distribution, sampled in seconds. Specs are dicts:
+      {"dist": "fixed", "ms": 5}
+      {"dist": "uniform", "low_ms": 2, "high_ms": 8}
+      {"dist": "lognormal", "median_ms": 5, "sigma": 0.4}
+    A bare number is shorthand for a fixed latency in ms.
+    """
+    def __init__(self, spec=0, seed=0):
+        if isinstance(spec, (int, float)):
+            spec = {"dist": "fixed", "ms": spec}
+        self.spec = spec
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        dist = self.spec.get("dist", "fixed")
+        with self._lock:
+            if dist == "fixed":
+                ms = self.spec.get("ms", 0)
+            elif dist == "uniform":
+                ms = self.rng.uniform(self.spec["low_ms"], self.spec["high_ms"])
+            elif dist == "lognormal":
+                ms = self.spec["median_ms"] * self.rng.lognormvariate(0, self.spec.get("sigma", 0.25))
+            else:
+                raise ValueError(f"Unknown latency distribution '{dist}'")
+        return ms / 1000.0
+
+    def sleep(self, times=1):
+        seconds = sum(self.sample() for _ in range(times)) if times != 1 else self.sample()
+        if seconds > 0:
+            time.sleep(seconds)
+
+    async def asleep(self):
+        seconds = self.sample()
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+def _latency(profile, key, seed):
+    return Latency(profile.get(key, 0), seed)
+
+WORDS = (
+    "sure happy help today think idea could would really maybe great sounds "
+    "plan time feel good know let me take look that this here there well yes"
+).split()
+
+class FakeResult:
+    def consume(self):
+        return None
+
+class FakeTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, **params):
+        self.driver._execute(query, params)
+        return FakeResult()
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        # An auto-commit query pays its own round trip
+        time.sleep(self.driver.latency)
+        self.driver._execute(query, params)
+        return FakeResult()
+
+    def execute_write(self, work):
+        time.sleep(self.driver.latency)
+        return work(FakeTransaction(self.driver))
+
+class FakeNeo4jDriver:
+    """
+    Mimics the neo4j.Driver surface MemoryManager uses. Every transaction
+    costs `latency_ms` plus `per_row_us` per UNWIND row, and writes are
+    serialized on one lock the way a single hot MERGE node would be.
+    """
+    def __init__(self, latency_ms=5.0, per_row_us=20.0):
+        self.latency = latency_ms / 1000.0
+        self.per_row = per_row_us / 1e6
+        self._lock = threading.Lock()
+        self.transactions = 0
+        self.interactions = 0
+        self.users = set()
+        self.episodes = {}
+
+    def _execute(self, query, params):
+        rows = params.get("rows")
+        if rows is None:
+            rows = [params] if "inp" in params else []
+        with self._lock:
+            time.sleep(self.per_row * len(rows))
+            self.transactions += 1
+            self.interactions += len(rows)
+            for row in rows:
+                user_id = row.get("user_id", "Primary")
+                self.users.add(user_id)
+                if "input" in row:
+                    self.episodes.setdefault(user_id, []).append(
+                        {"input": row["input"], "response": row.get("response", "")})
+
+    def session(self, **kwargs):
+        return FakeSession(self)
+
+    def close(self):
+        pass
+
+class FakeEmbeddingFunction:
+    """
+    Deterministic stand-in for Chroma's default embedding model: vectors are
+    derived from a hash of the text, and each call costs `batch_ms` plus
+    `per_text_ms` per input.
+    """
+    def __init__(self, dim=384, batch_ms=2.0, per_text_ms=1.0):
+        self.dim = dim
+        self.batch = batch_ms / 1000.0
+        self.per_text = per_text_ms / 1000.0
+
+    def __call__(self, input):
+        import hashlib
+        import numpy as np
+        time.sleep(self.batch + self.per_text * len(input))
+        vectors = []
+        for text in input:
+            seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            vectors.append(vector / np.linalg.norm(vector))
+        return vectors
+
+class FakeAsyncNeo4jDriver:
+    """neo4j.AsyncDriver surface used by TieredRetriever, reading a FakeNeo4jDriver's episodes"""
+    def __init__(self, store, latency):
+        self.store = store
+        self.latency = latency
+
+    async def execute_query(self, query, routing_=None, **params):
+        await self.latency.asleep()
+        episodes = self.store.episodes.get(params.get("uid"), [])
+        records = list(reversed(episodes[-params.get("limit", 3):]))
+        return records, None, ["input", "response"]
+
+    async def close(self):
+        pass
+
+class FakeRedisServer:
+    """Shared keyspace behind every FakeRedis / FakeAsyncRedis client"""
+    def __init__(self, latency):
+        self.latency = latency
+        self.data = {}
+        self.expiry = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key):
+        deadline = self.expiry.get(key)
+        if deadline is not None and deadline < time.monotonic():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.data
+
+    def execute(self, op, key, *args):
+        with self._lock:
+            alive = self._alive(key)
+            if op == "get":
+                return self.data.get(key) if alive else None
+            if op == "set":
+                self.data[key] = _encode(args[0])
+                self.expiry.pop(key, None)
+                if len(args) > 1 and args[1]:
+                    self.expiry[key] = time.monotonic() + args[1]
+                return True
+            if op == "delete":
+                self.expiry.pop(key, None)
+                return int(self.data.pop(key, None) is not None)
+            if op == "expire":
+                if alive:
+                    self.expiry[key] = time.monotonic() + args[0]
+                return alive
+            if op == "lpush":
+                values = self.data.setdefault(key, [])
+                for value in args:
+                    values.insert(0, _encode(value))
+                return len(values)
+            if op == "rpush":
+                values = self.data.setdefault(key, [])
+                values.extend(_encode(v) for v in args)
+                return len(values)
+            if op == "lrange":
+                values = self.data.get(key, []) if alive else []
+                start, stop = args
+                return list(values[start:None if stop == -1 else stop + 1])
+            if op == "ltrim":
+                if alive:
+                    start, stop = args
+                    self.data[key] = self.data[key][start:None if stop == -1 else stop + 1]
+                return True
+            if op == "llen":
+                return len(self.data.get(key, [])) if alive else 0
+            if op == "hset":
+                fields = self.data.setdefault(key, {})
+                added = int(_encode(args[0]) not in fields)
+                fields[_encode(args[0])] = _encode(args[1])
+                return added
+            if op == "hgetall":
+                return dict(self.data.get(key, {})) if alive else {}
+            if op == "hdel":
+                fields = self.data.get(key, {}) if alive else {}
+                return sum(fields.pop(_encode(f), None) is not None for f in args)
+            if op == "hlen":
+                return len(self.data.get(key, {})) if alive else 0
+            raise NotImplementedError(op)
+
+def _encode(value):
+    return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+class _FakeRedisCommands:
+    def get(self, key):
+        return self._call("get", key)
+
+    def set(self, key, value, ex=None):
+        return self._call("set", key, value, ex)
+
+    def setex(self, key, seconds, value):
+        return self._call("set", key, value, seconds)
+
+    def delete(self, key):
+        return self._call("delete", key)
+
+    def expire(self, key, seconds):
+        return self._call("expire", key, seconds)
+
+    def lpush(self, key, *values):
+        return self._call("lpush", key, *values)
+
+    def rpush(self, key, *values):
+        return self._call("rpush", key, *values)
+
+    def lrange(self, key, start, stop):
+        return self._call("lrange", key, start, stop)
+
+    def ltrim(self, key, start, stop):
+        return self._call("ltrim", key, start, stop)
+
+    def llen(self, key):
+        return self._call("llen", key)
+
+    def hset(self, key, field, value):
+        return self._call("hset", key, field, value)
+
+    def hgetall(self, key):
+        return self._call("hgetall", key)
+
+    def hdel(self, key, *fields):
+        return self._call("hdel", key, *fields)
+
+    def hlen(self, key):
+        return self._call("hlen", key)
+
+class FakeRedis(_FakeRedisCommands):
+    """redis.Redis: every command is one round trip"""
+    server = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def _call(self, op, key, *args):
+        self.server.latency.sleep()
+        return self.server.execute(op, key, *args)
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self.server, asynchronous=False)
+
+    def ping(self):
+        return True
+
+    def close(self):
+        pass
+
+class FakeAsyncRedis(_FakeRedisCommands):
+    """redis.asyncio.Redis: commands are awaitable, one round trip each"""
+    server = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def _call(self, op, key, *args):
+        await self.server.latency.asleep()
+        return self.server.execute(op, key, *args)
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self.server, asynchronous=True)
+
+    async def ping(self):
+        return True
+
+    async def aclose(self):
+        pass
+
+class FakeRedisPipeline(_FakeRedisCommands):
+    """Buffers commands and pays a single round trip on execute()"""
+    def __init__(self, server, asynchronous):
+        self.server = server
+        self.asynchronous = asynchronous
+        self.commands = []
+
+    def _call(self, op, key, *args):
+        self.commands.append((op, key, args))
+        return self
+
+    def _run(self):
+        results = [self.server.execute(op, key, *args) for op, key, args in self.commands]
+        self.commands = []
+        return results
+
+    def execute(self):
+        if self.asynchronous:
+            async def run():
+                await self.server.latency.asleep()
+                return self._run()
+            return run()
+        self.server.latency.sleep()
+        return self._run()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeConnectionPool:
+    def __init__(self, *args, **kwargs):
+        pass
+
+class FakeCollection:
+    """Chroma collection with brute-force cosine search over stored embeddings"""
+    def __init__(self, name, query_latency, upsert_latency):
+        self.name = name
+        self.query_latency = query_latency
+        self.upsert_latency = upsert_latency
+        self._lock = threading.Lock()
+        self._index = {}
+        self._ids = []
+        self._documents = []
+        self._metadatas = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+
+    def upsert(self, ids, embeddings=None, documents=None, metadatas=None):
+        self.upsert_latency.sleep()
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            if self._vectors.size == 0:
+                self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            new_rows = []
+            for i, id_ in enumerate(ids):
+                row = self._index.get(id_)
+                if row is None:
+                    self._index[id_] = len(self._ids) + len(new_rows)
+                    new_rows.append(i)
+                    continue
+                self._vectors[row] = vectors[i]
+                self._documents[row] = documents[i] if documents else None
+                self._metadatas[row] = metadatas[i] if metadatas else None
+            for i in new_rows:
+                self._ids.append(ids[i])
+                self._documents.append(documents[i] if documents else None)
+                self._metadatas.append(metadatas[i] if metadatas else None)
+            if new_rows:
+                self._vectors = np.vstack([self._vectors, vectors[new_rows]])
+
+    add = upsert
+
+    @classmethod
+    def _matches(cls, metadata, where):
+        """The subset of Chroma's `where` syntax OS1 uses: equality, $and, $or"""
+        if "$and" in where:
+            return all(cls._matches(metadata, w) for w in where["$and"])
+        if "$or" in where:
+            return any(cls._matches(metadata, w) for w in where["$or"])
+        return all((metadata or {}).get(k) == v for k, v in where.items())
+
+    def query(self, query_embeddings=None, n_results=10, where=None, **kwargs):
+        self.query_latency.sleep()
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        with self._lock:
+            vectors, documents, ids = self._vectors, list(self._documents), list(self._ids)
+            metadatas = list(self._metadatas[:len(ids)])
+            if where and ids:
+                rows = [i for i, m in enumerate(metadatas) if self._matches(m, where)]
+                vectors, ids = vectors[rows], [ids[i] for i in rows]
+                documents, metadatas = [documents[i] for i in rows], [metadatas[i] for i in rows]
+        if len(ids) == 0:
+            empty = [[] for _ in queries]
+            return {"ids": empty, "documents": empty, "metadatas": empty, "distances": empty}
+        scores = queries @ vectors.T
+        top = np.argsort(-scores, axis=1)[:, :n_results]
+        return {
+            "ids": [[ids[j] for j in row] for row in top],
+            "documents": [[documents[j] for j in row] for row in top],
+            "metadatas": [[metadatas[j] for j in row] for row in top],
+            "distances": [[float(1 - scores[i, j]) for j in row] for i, row in enumerate(top)]
+        }
+
+    def count(self):
+        with self._lock:
+            return len(self._ids)
+
+class FakeChromaClient:
+    """chromadb.PersistentClient stand-in; collections live in memory"""
+    query_latency = None
+    upsert_latency = None
+    collections = {}
+
+    def __init__(self, path=None, **kwargs):
+        pass
+
+    def get_or_create_collection(self, name, **kwargs):
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(name, self.query_latency, self.upsert_latency)
+        return self.collections[name]
+
+    get_collection = get_or_create_collection
+
+class _FakeLlamaState:
+    def __init__(self, tokens, size):
+        self.tokens = tokens
+        self.llama_state_size = size
+
+class FakeLlama:
+    """
+    llama_cpp.Llama surface used by OS1Brain and PrefixCache. Prompt tokens
+    not already in the context cost `prompt_token` each (so prefix reuse
+    shows up in the numbers); every generated token costs `decode_token`.
+    """
+    profile = {}
+    seed = 0
+    _instances = 0
+
+    def __init__(self, model_path=None, n_ctx=4096, n_gpu_layers=0, verbose=False, **kwargs):
+        FakeLlama._instances += 1
+        seed = self.seed + FakeLlama._instances
+        self.load = _latency(self.profile, "load", seed)
+        self.prompt_token = _latency(self.profile, "prompt_token", seed)
+        self.decode_token = _latency(self.profile, "decode_token", seed)
+        self.completion_tokens = self.profile.get("completion_tokens", {"low": 20, "high": 80})
+        self.rng = random.Random(seed)
+        self.n_ctx = n_ctx
+        self.input_ids = np.zeros(n_ctx, dtype=np.intc)
+        self.n_tokens = 0
+        if not kwargs.get("vocab_only"):
+            self.load.sleep()
+
+    def tokenize(self, text, add_bos=True, special=False):
+        # ~4 bytes per token, like BPE on English text
+        ids = [1] if add_bos else []
+        for i in range(0, len(text), 4):
+            ids.append(int.from_bytes(hashlib.blake2b(text[i:i + 4], digest_size=2).digest(), "little") + 2)
+        return ids
+
+    def _common_prefix(self, tokens):
+        n = min(self.n_tokens, len(tokens))
+        current = self.input_ids[:n]
+        mismatch = np.nonzero(current != np.asarray(tokens[:n], dtype=np.intc))[0]
+        return int(mismatch[0]) if len(mismatch) else n
+
+    def eval(self, tokens):
+        tokens = list(tokens)[: self.n_ctx - self.n_tokens]
+        self.prompt_token.sleep(len(tokens)) if tokens else None
+        self.input_ids[self.n_tokens:self.n_tokens + len(tokens)] = tokens
+        self.n_tokens += len(tokens)
+
+    def reset(self):
+        self.n_tokens = 0
+
+    def save_state(self):
+        return _FakeLlamaState(self.input_ids[:self.n_tokens].copy(), self.n_tokens * 128 * 1024)
+
+    def load_state(self, state):
+        self.n_tokens = len(state.tokens)
+        self.input_ids[:self.n_tokens] = state.tokens
+
+    def _generate(self, prompt):
+        tokens = self.tokenize(prompt.encode("utf-8"), add_bos=True, special=True)
+        keep = self._common_prefix(tokens)
+        self.n_tokens = keep
+        self.eval(tokens[keep:])
+        count = self.rng.randint(self.completion_tokens["low"], self.completion_tokens["high"])
+        # Sentences of 6-16 words, so sentence-by-sentence consumers see realistic boundaries
+        sentence_end = self.rng.randint(5, 15)
+        for i in range(count):
+            self.decode_token.sleep()
+            if self.n_tokens < self.n_ctx:
+                self.input_ids[self.n_tokens] = 2
+                self.n_tokens += 1
+            word = self.rng.choice(WORDS)
+            if i == sentence_end or i == count - 1:
+                word += "."
+                sentence_end = i + self.rng.randint(6, 16)
+            yield (" " if i else "") + word
+        self._usage = {"prompt_tokens": len(tokens), "completion_tokens": count}
+
+    def create_completion(self, prompt, max_tokens=None, stop=None, stream=False, **kwargs):
+        if stream:
+            return ({"choices": [{"text": text, "index": 0, "finish_reason": None}]} for text in self._generate(prompt))
+        text = "".join(self._generate(prompt))
+        return {"choices": [{"text": text, "index": 0, "finish_reason": "stop"}], "usage": self._usage}
+
+class FakeHFTokenizer:
+    """Just enough of tokenizers.Tokenizer for faster_whisper's Tokenizer wrapper"""
+    SPECIAL = ["<|endoftext|>", "<|startoftranscript|>", "<|en|>", "<|transcribe|>", "<|translate|>",
+               "<|startoflm|>", "<|startofprev|>", "<|nospeech|>", "<|notimestamps|>"]
+
+    def __init__(self):
+        self.eot = len(WORDS)
+        self.special = {token: self.eot + i for i, token in enumerate(self.SPECIAL)}
+
+    def token_to_id(self, token):
+        return self.special.get(token)
+
+    def encode(self, text, add_special_tokens=False):
+        return types.SimpleNamespace(ids=[WORDS.index(w) for w in text.split() if w in WORDS])
+
+    def decode(self, ids):
+        return " ".join(WORDS[i] for i in ids if i < self.eot)
+
+class FakeWhisperModel:
+    """
+    faster_whisper.WhisperModel surface used by TranscriptionService.
+    Feature extraction is free; encode() costs `encode_batch` plus
+    `encode_item` per clip and generate() costs `decode_item` per clip,
+    so micro-batching shows up in the numbers.
+    """
+    profile = {}
+    seed = 0
+
+    def __init__(self, model_size_or_path=None, device="auto", compute_type="default", cpu_threads=0, **kwargs):
+        self.load = _latency(self.profile, "load", self.seed)
+        self.encode_batch = _latency(self.profile, "encode_batch", self.seed + 1)
+        self.encode_item = _latency(self.profile, "encode_item", self.seed + 2)
+        self.decode_item = _latency(self.profile, "decode_item", self.seed + 3)
+        self.rng = random.Random(self.seed)
+        self.hf_tokenizer = FakeHFTokenizer()
+        self.max_length = 448
+        self.model = types.SimpleNamespace(is_multilingual=False, generate=self._generate)
+        self.load.sleep()
+
+    def feature_extractor(self, audio):
+        return np.zeros((80, max(1, len(audio) // 160)), dtype=np.float32)
+
+    def get_prompt(self, tokenizer, previous_tokens, without_timestamps=False, **kwargs):
+        prompt = [tokenizer.sot]
+        if without_timestamps:
+            prompt.append(tokenizer.no_timestamps)
+        return prompt
+
+    def encode(self, features):
+        self.encode_batch.sleep()
+        self.encode_item.sleep(len(features))
+        return features
+
+    def _generate(self, encoder_output, prompts, **kwargs):
+        results = []
+        for _ in prompts:
+            self.decode_item.sleep()
+            ids = [self.rng.randrange(len(WORDS)) for _ in range(self.rng.randint(4, 12))]
+            results.append(types.SimpleNamespace(sequences_ids=[ids]))
+        return results
+
+    def transcribe(self, audio, **kwargs):
+        self.encode_batch.sleep()
+        result = self._generate(None, [None])[0]
+        text = self.hf_tokenizer.decode(result.sequences_ids[0])
+        return iter([types.SimpleNamespace(text=text)]), types.SimpleNamespace(language="en")
+
+class FakeProlog:
+    """
+    The subset of pyswip.Prolog the SpecialistRegistry uses: module-qualified
+    assertz/retractall of facts and simple rules, clause counts, and
+    conjunctive queries over ground facts.
+    """
+    _TERM = re.compile(r"^\s*([a-z]\w*)\s*(?:\((.*)\))?\s*$", re.S)
+
+    def __init__(self):
+        self.clauses = {}  # (module, name, arity) -> [(head_args, body)]
+
+    @classmethod
+    def _parse(cls, term):
+        match = cls._TERM.match(term)
+        if not match:
+            raise ValueError(f"Unsupported term: {term}")
+        args = [a.strip() for a in match.group(2).split(",")] if match.group(2) else []
+        return match.group(1), args
+
+    @staticmethod
+    def _split_clause(clause):
+        head, _, body = clause.partition(":-")
+        goals = re.findall(r"[a-z]\w*\s*(?:\([^)]*\))?", body) if body else []
+        return head.strip(), goals
+
+    @staticmethod
+    def _split_module(text):
+        match = re.match(r"^\s*([a-z]\w*)\s*:\s*\((.*)\)\s*$", text, re.S)
+        return (match.group(1), match.group(2)) if match else ("user", text)
+
+    def assertz(self, text):
+        module, clause = self._split_module(text)
+        head, body = self._split_clause(clause)
+        name, args = self._parse(head)
+        self.clauses.setdefault((module, name, len(args)), []).append((args, body))
+
+    def _solve(self, module, goals, bindings):
+        if not goals:
+            yield bindings
+            return
+        name, args = self._parse(goals[0])
+        args = [bindings.get(a, a) for a in args]
+        if name == "true" and not args:
+            yield from self._solve(module, goals[1:], bindings)
+            return
+        for head_args, body in self.clauses.get((module, name, len(args)), []):
+            local = dict(bindings)
+            renamed = {}
+            ok = True
+            for goal_arg, head_arg in zip(args, head_args):
+                if head_arg[0].isupper():
+                    head_arg = renamed.setdefault(head_arg, goal_arg)
+                    if head_arg[0].isupper():
+                        continue
+                if goal_arg[0].isupper():
+                    local[goal_arg] = head_arg
+                elif goal_arg != head_arg:
+                    ok = False
+                    break
+            if not ok:
+                continue
+            subgoals = [re.sub(r"\b([A-Z]\w*)\b", lambda m: renamed.get(m.group(1), m.group(1)), g) for g in body]
+            for solved in self._solve(module, subgoals, local):
+                yield from self._solve(module, goals[1:], solved)
+
+    def query(self, goal):
+        functor = re.match(r"^C = \((.*)\), \(C = \(H :- _\).*functor\(H, N, A\)$", goal, re.S)
+        if functor:
+            name, args = self._parse(self._split_clause(functor.group(1))[0])
+            return iter([{"N": name, "A": len(args)}])
+        retract = re.match(r"^functor\(H, (\w+), (\d+)\), retractall\((\w+):H\)$", goal)
+        if retract:
+            name, arity, module = retract.groups()
+            self.clauses.pop((module, name, int(arity)), None)
+            return iter([{}])
+        count = re.match(r"^functor\(H, (\w+), (\d+)\), predicate_property\((\w+):H, number_of_clauses\(C\)\)$", goal)
+        if count:
+            name, arity, module = count.groups()
+            clauses = self.clauses.get((module, name, int(arity)))
+            return iter([{"C": len(clauses)}] if clauses else [])
+        module, body = self._split_module(goal)
+        goals = re.findall(r"[a-z]\w*\s*(?:\([^)]*\))?", body)
+        variables = sorted(set(re.findall(r"\b([A-Z]\w*)\b", body)))
+        return iter([{v: solution[v] for v in variables if v in solution}
+                     for solution in self._solve(module, goals, {})])
+
+FAKE_PIPER = """#!{python}
+# Stand-in for `piper --json-input --output_dir DIR`: one JSON line in, one WAV path out.
+import json, os, random, struct, sys, time, wave
+args = sys.argv[1:]
+out_dir = args[args.index("--output_dir") + 1]
+profile = json.loads({profile!r})
+rng = random.Random(profile.get("seed", 0) + os.getpid())
+def latency(spec, scale=1):
+    if isinstance(spec, (int, float)):
+        return spec * scale / 1000.0
+    if spec.get("dist") == "uniform":
+        return rng.uniform(spec["low_ms"], spec["high_ms"]) * scale / 1000.0
+    if spec.get("dist") == "lognormal":
+        return spec["median_ms"] * rng.lognormvariate(0, spec.get("sigma", 0.25)) * scale / 1000.0
+    return spec.get("ms", 0) * scale / 1000.0
+time.sleep(latency(profile.get("load", 0)))
+for line in sys.stdin:
+    request = json.loads(line)
+    text = request.get("text", "")
+    time.sleep(latency(profile.get("utterance", 0)) + latency(profile.get("per_char", 0), len(text)))
+    path = request.get("output_file") or os.path.join(out_dir, f"{{time.time_ns()}}.wav")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(22050)
+        wav.writeframes(b"\\x00\\x00" * int(22050 * 0.06 * max(1, len(text.split()))))
+    sys.stdout.write(path + "\\n")
+    sys.stdout.flush()
+    print(f"Wrote {{path}}", file=sys.stderr, flush=True)
+"""
+
+def write_fake_piper(path, profile, seed=0):
+    """Writes an executable fake piper binary at `path`"""
+    with open(path, "w") as f:
+        f.write(FAKE_PIPER.format(python=sys.executable, profile=json.dumps({**profile, "seed": seed})))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC | stat.S_IXGRP | stat.S_IXOTH)
+
+class FakeEmotionPipeline:
+    """Vision is off the measured paths; this keeps its handle ready and Neutral"""
+    def __init__(self):
+        self.dropped = 0
+
+    def submit_frame(self, user_id, jpeg_bytes):
+        self.dropped += 1
+        return False
+
+    def get_state(self, user_id):
+        return None
+
+    def emotion_label(self, user_id, default="Neutral"):
+        return default
+
+    def stats(self):
+        return {"workers": 0, "inflight": 0, "accepted": 0, "dropped": self.dropped,
+                "avg_latency_ms": 0.0, "effective_fps": 0.0, "users": 0}
+
+    def close(self):
+        pass
+
+def _stub_module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+def install(profile, seed=0):
+    """
+    Replaces OS1's backends with the fakes above, configured from a
+    benchmark profile. Must run before main (or any aios module) is imported.
+    Native extras the benchmark never exercises (webcam capture, audio
+    devices) get empty modules when they aren't installed.
+    """
+    llama_cpp = _stub_module("llama_cpp", Llama=FakeLlama)
+    FakeLlama.profile, FakeLlama.seed = profile.get("llama", {}), seed
+
+    prolog = _stub_module("pyswip", Prolog=FakeProlog)
+
+    import faster_whisper
+    FakeWhisperModel.profile, FakeWhisperModel.seed = profile.get("whisper", {}), seed
+    faster_whisper.WhisperModel = FakeWhisperModel
+
+    redis_cfg = profile.get("redis", {})
+    server = FakeRedisServer(_latency(redis_cfg, "op", seed))
+    FakeRedis.server = FakeAsyncRedis.server = server
+    import redis
+    import redis.asyncio
+    redis.Redis = FakeRedis
+    redis.asyncio.Redis = FakeAsyncRedis
+    redis.asyncio.ConnectionPool = FakeConnectionPool
+
+    neo4j_cfg = profile.get("neo4j", {})
+    store = FakeNeo4jDriver(latency_ms=neo4j_cfg.get("write_ms", 5.0), per_row_us=neo4j_cfg.get("per_row_us", 20.0))
+    read_latency = _latency(neo4j_cfg, "read", seed)
+    import neo4j
+    neo4j.GraphDatabase.driver = staticmethod(lambda *a, **kw: store)
+    neo4j.AsyncGraphDatabase.driver = staticmethod(lambda *a, **kw: FakeAsyncNeo4jDriver(store, read_latency))
+
+    chroma_cfg = profile.get("chroma", {})
+    FakeChromaClient.query_latency = _latency(chroma_cfg, "query", seed)
+    FakeChromaClient.upsert_latency = _latency(chroma_cfg, "upsert", seed)
+    embed_cfg = chroma_cfg.get("embedding", {})
+    import chromadb
+    from chromadb.utils import embedding_functions
+    chromadb.PersistentClient = FakeChromaClient
+    embedding_functions.DefaultEmbeddingFunction = lambda: FakeEmbeddingFunction(
+        batch_ms=embed_cfg.get("batch_ms", 2.0), per_text_ms=embed_cfg.get("per_text_ms", 1.0))
+
+    for name in ("cv2", "mediapipe", "sounddevice"):
+        try:
+            __import__(name)
+        except ImportError:
+            _stub_module(name)
+    cv2 = sys.modules["cv2"]
+    if not hasattr(cv2, "ocl"):
+        # stable_baselines3 imports cv2 opportunistically and disables OpenCL
+        cv2.ocl = types.SimpleNamespace(setUseOpenCL=lambda flag: None)
+    mediapipe = sys.modules["mediapipe"]
+    if not hasattr(mediapipe, "solutions"):
+        mediapipe.solutions = types.SimpleNamespace(face_mesh=types.SimpleNamespace(FaceMesh=lambda **kw: None))
+    import aios.perception.vision
+    aios.perception.vision.EmotionPipeline = FakeEmotionPipeline
+    return {"llama_cpp": llama_cpp, "pyswip": prolog, "redis": server, "neo4j": store}
@@ -0,0 +1,369 @@
+"""
+End-to-end load test of the OS1 API against local stand-ins for every backend.
+
+`run` starts the real FastAPI app in a subprocess with llama.cpp, Whisper,
+Piper, Redis, Neo4j and Chroma replaced by the fakes in benchmarks/fakes.py
+(latencies from a profile in benchmarks/profiles/), drives /interact/text and
+/interact/audio with a closed-loop (fixed concurrency) or open-loop (Poisson
+arrivals at a fixed rate) load, and writes a JSON report. `compare` diffs two
+reports and exits non-zero on a regression. Everything runs offline on CPU.
+
+    python -m benchmarks.loadtest run --profile benchmarks/profiles/cpu_node.yaml \\
+        --concurrency 8 --duration 60 --out base.json
+    python -m benchmarks.loadtest run --rate 2 --audio-share 0.2 --out new.json
+    python -m benchmarks.loadtest compare base.json new.json --threshold 0.1
+
+In open-loop mode latency is measured from each request's scheduled arrival,
+so a server that falls behind shows up as latency rather than as a
+lower offered rate.
+"""
+import os
+import sys
+import json
+import time
+import yaml
+import random
+import shutil
+import socket
+import signal
+import asyncio
+import argparse
+import platform
+import contextlib
+import tempfile
+import subprocess
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PROFILE = os.path.join(REPO, "benchmarks", "profiles", "cpu_node.yaml")
+
+PROMPTS = [
+    "Hello, how are you today?",
+    "Can you help me plan my week?",
+    "What time is it?",
+    "Please calculate 12 * (7 + 5) for me",
+    "What are the symptoms of the flu and should I see a doctor?",
+    "Is a verbal contract legally binding?",
+    "How do I protect my laptop from malware?",
+    "Tell me something interesting about the ocean.",
+    "What is the system status?",
+    "I feel a bit tired, any advice?",
+]
+USERS = [f"bench-user-{i}" for i in range(16)]
+PERCENTILES = (50, 95, 99)
+
+def _merge(base, overrides):
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+def _load_profile(path):
+    with open(path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+def prepare_workdir(workdir, profile):
+    """
+    Lays out what the kernel expects relative to its working directory:
+    the merged config, the firewall rules, the voice model config and a
+    fake piper binary. Databases and caches start empty on every run.
+    """
+    from benchmarks.fakes import write_fake_piper
+    with open(os.path.join(REPO, "aios", "config", "config.yaml"), 'r') as f:
+        cfg = _merge(yaml.safe_load(f), profile.get("config"))
+    os.makedirs(os.path.join(workdir, "aios", "config"), exist_ok=True)
+    with open(os.path.join(workdir, "aios", "config", "config.yaml"), 'w') as f:
+        yaml.safe_dump(cfg, f, sort_keys=False)
+    os.symlink(os.path.join(REPO, "aios", "safety"), os.path.join(workdir, "aios", "safety"))
+
+    tts_dir = os.path.join(workdir, "models", "tts")
+    os.makedirs(tts_dir, exist_ok=True)
+    voice = os.path.join(REPO, "models", "tts", "en_US-lessac-medium.onnx.json")
+    shutil.copy(voice, tts_dir)
+    open(os.path.join(tts_dir, "en_US-lessac-medium.onnx"), 'wb').close()
+
+    os.makedirs(os.path.join(workdir, "piper"), exist_ok=True)
+    write_fake_piper(os.path.join(workdir, "piper", "piper"), profile.get("piper", {}), profile.get("seed", 0))
+
+def serve(args):
+    """Runs the kernel in this process with every backend faked"""
+    profile = _load_profile(args.profile)
+    sys.path.insert(0, REPO)
+    os.chdir(args.workdir)
+
+    from benchmarks import fakes
+    fakes.install(profile, seed=profile.get("seed", 0))
+
+    import uvicorn
+    import main
+    uvicorn.run(main.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(samples, duration):
+    """count / errors / latency percentiles (ms) / throughput for a list of (ok, status, seconds)"""
+    ok = sorted(seconds * 1000 for passed, _, seconds in samples if passed)
+    statuses = {}
+    for passed, status, _ in samples:
+        if not passed:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+    summary = {
+        "count": len(samples),
+        "ok": len(ok),
+        "errors": len(samples) - len(ok),
+        "error_rate": round((len(samples) - len(ok)) / len(samples), 4) if samples else 0.0,
+        "error_statuses": statuses,
+        "throughput_rps": round(len(ok) / duration, 3) if duration else 0.0,
+        "mean_ms": round(sum(ok) / len(ok), 2) if ok else None,
+        "max_ms": round(ok[-1], 2) if ok else None,
+    }
+    for p in PERCENTILES:
+        value = _percentile(ok, p)
+        summary[f"p{p}_ms"] = round(value, 2) if value is not None else None
+    return summary
+
+class LoadGenerator:
+    """Issues requests against a running server and records (ok, status, seconds) per endpoint"""
+    def __init__(self, base_url, audio, audio_share, seed):
+        self.base_url = base_url
+        self.audio = audio
+        self.audio_share = audio_share
+        self.rng = random.Random(seed)
+        self.samples = {"/interact/text": [], "/interact/audio": []}
+        self.recording = False
+
+    def next_request(self):
+        if self.audio is not None and self.rng.random() < self.audio_share:
+            return "/interact/audio", {"files": {"file": ("test.wav", self.audio, "audio/wav")}}
+        body = {"text": self.rng.choice(PROMPTS), "user_id": self.rng.choice(USERS)}
+        return "/interact/text", {"json": body}
+
+    async def issue(self, client, endpoint, kwargs, started):
+        try:
+            response = await client.post(endpoint, **kwargs)
+            status = response.status_code
+            passed = status == 200
+        except Exception as e:
+            status, passed = type(e).__name__, False
+        if self.recording:
+            self.samples[endpoint].append((passed, status, time.perf_counter() - started))
+
+    async def closed_loop(self, client, concurrency, until):
+        async def worker():
+            while time.perf_counter() < until:
+                endpoint, kwargs = self.next_request()
+                await self.issue(client, endpoint, kwargs, time.perf_counter())
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def open_loop(self, client, rate, until):
+        tasks = []
+        scheduled = time.perf_counter()
+        while True:
+            scheduled += self.rng.expovariate(rate)
+            if scheduled >= until:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            endpoint, kwargs = self.next_request()
+            tasks.append(asyncio.create_task(self.issue(client, endpoint, kwargs, scheduled)))
+        await asyncio.gather(*tasks)
+
+async def wait_ready(client, group, process, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Benchmark server exited with code {process.returncode}")
+        try:
+            response = await client.get("/readyz")
+            if response.json().get("groups", {}).get(group):
+                return response.json()
+        except Exception:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"Benchmark server not ready after {timeout}s")
+
+async def drive(args, base_url, process):
+    import httpx
+    audio = None
+    if args.audio_share > 0:
+        with open(args.audio, 'rb') as f:
+            audio = f.read()
+    generator = LoadGenerator(base_url, audio, args.audio_share, args.seed)
+    limits = httpx.Limits(max_connections=None if args.rate else args.concurrency, max_keepalive_connections=64)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        readiness = await wait_ready(client, "audio" if audio else "text", process, args.startup_timeout)
+
+        async def load(seconds):
+            until = time.perf_counter() + seconds
+            if args.rate:
+                await generator.open_loop(client, args.rate, until)
+            else:
+                await generator.closed_loop(client, args.concurrency, until)
+
+        await load(args.warmup)
+        generator.recording = True
+        started = time.perf_counter()
+        await load(args.duration)
+        duration = time.perf_counter() - started
+        server_stats = (await client.get("/stats")).json()
+
+    endpoints = {endpoint: summarize(samples, duration) for endpoint, samples in generator.samples.items() if samples}
+    every = [sample for samples in generator.samples.values() for sample in samples]
+    return {
+        "config": {
+            "mode": "open" if args.rate else "closed",
+            "rate": args.rate,
+            "concurrency": None if args.rate else args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "audio_share": args.audio_share,
+            "seed": args.seed,
+            "profile": os.path.relpath(args.profile, REPO),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count()
+        },
+        "measured_s": round(duration, 3),
+        "total": summarize(every, duration),
+        "endpoints": endpoints,
+        "startup": readiness,
+        "server": server_stats
+    }
+
+@contextlib.contextmanager
+def faked_server(profile_path, port=None, keep_workdir=False):
+    """
+    Runs the kernel in a subprocess against the fakes and yields
+    (base_url, process). The server log is echoed to stderr if the body
+    raises; the process and its temp dir are cleaned up on exit.
+    """
+    profile = _load_profile(profile_path)
+    workdir = tempfile.mkdtemp(prefix="os1-loadtest-")
+    port = port or _free_port()
+    try:
+        prepare_workdir(workdir, profile)
+        log_path = os.path.join(workdir, "server.log")
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.loadtest", "serve",
+                 "--profile", os.path.abspath(profile_path), "--workdir", workdir, "--port", str(port)],
+                cwd=REPO, stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+            )
+        try:
+            yield f"http://127.0.0.1:{port}", process
+        except Exception:
+            with open(log_path, 'r') as f:
+                sys.stderr.write(f.read()[-4000:])
+            raise
+        finally:
+            if process.poll() is None:
+                os.killpg(process.pid, signal.SIGTERM)
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    os.killpg(process.pid, signal.SIGKILL)
+    finally:
+        if not keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def run(args):
+    with faked_server(args.profile, args.port, args.keep_workdir) as (base_url, process):
+        report = asyncio.run(drive(args, base_url, process))
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    total = report["total"]
+    print(f"{report['config']['mode']}-loop  {total['ok']}/{total['count']} ok  "
+          f"{total['throughput_rps']:.2f} req/s")
+    print(f"{'endpoint':<18} {'count':>6} {'err%':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>7}")
+    for endpoint, st in [("total", total)] + list(report["endpoints"].items()):
+        cells = [f"{st[f'p{p}_ms']:>7.1f}ms" if st[f'p{p}_ms'] is not None else f"{'-':>9}" for p in PERCENTILES]
+        print(f"{endpoint:<18} {st['count']:>6} {st['error_rate'] * 100:>5.1f}% {' '.join(cells)} {st['throughput_rps']:>7.2f}")
+    print(f"Report written to {args.out}")
+
+# Latency metrics regress when they grow; throughput when it shrinks
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms", "mean_ms")
+
+def compare_reports(base, new, threshold):
+    """Returns [(scope, metric, base, new, change, regressed)] for every comparable metric"""
+    rows = []
+    scopes = [("total", base["total"], new["total"])]
+    scopes += [(e, base["endpoints"][e], new["endpoints"][e]) for e in base["endpoints"] if e in new["endpoints"]]
+    for scope, b, n in scopes:
+        for key in LATENCY_KEYS + ("throughput_rps",):
+            if not b.get(key) or n.get(key) is None:
+                continue
+            change = (n[key] - b[key]) / b[key]
+            regressed = change > threshold if key in LATENCY_KEYS else change < -threshold
+            rows.append((scope, key, b[key], n[key], change, regressed))
+        # Error rate is compared in absolute points
+        change = n["error_rate"] - b["error_rate"]
+        rows.append((scope, "error_rate", b["error_rate"], n["error_rate"], change, change > threshold / 10))
+    return rows
+
+def compare(args):
+    with open(args.base, 'r') as f:
+        base = json.load(f)
+    with open(args.new, 'r') as f:
+        new = json.load(f)
+    for key in ("mode", "rate", "concurrency", "audio_share", "profile"):
+        if base["config"].get(key) != new["config"].get(key):
+            print(f"warning: runs differ in {key}: {base['config'].get(key)} vs {new['config'].get(key)}")
+
+    rows = compare_reports(base, new, args.threshold)
+    print(f"{'scope':<18} {'metric':<15} {'base':>10} {'new':>10} {'change':>8}")
+    for scope, key, b, n, change, regressed in rows:
+        print(f"{scope:<18} {key:<15} {b:>10} {n:>10} {change * 100:>+7.1f}%{'  REGRESSION' if regressed else ''}")
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"{regressions} regression(s) at a {args.threshold:.0%} threshold")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="start a faked server, drive load, write a report")
+    run_parser.add_argument("--profile", default=DEFAULT_PROFILE, help="backend latency profile (YAML)")
+    run_parser.add_argument("--concurrency", type=int, default=4, help="closed loop: requests in flight")
+    run_parser.add_argument("--rate", type=float, default=None, help="open loop: mean arrivals per second")
+    run_parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before the run")
+    run_parser.add_argument("--audio-share", type=float, default=0.0, help="fraction of requests sent to /interact/audio")
+    run_parser.add_argument("--audio", default=os.path.join(REPO, "test.wav"), help="upload used for audio requests")
+    run_parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    run_parser.add_argument("--startup-timeout", type=float, default=300)
+    run_parser.add_argument("--seed", type=int, default=0, help="seeds the request mix and arrivals")
+    run_parser.add_argument("--port", type=int, default=None)
+    run_parser.add_argument("--keep-workdir", action="store_true", help="keep the server's temp dir and log")
+    run_parser.add_argument("--out", default="loadtest_report.json")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two reports")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="relative change that counts as a regression")
+
+    serve_parser = commands.add_parser("serve", help=argparse.SUPPRESS)
+    serve_parser.add_argument("--profile", required=True)
+    serve_parser.add_argument("--workdir", required=True)
+    serve_parser.add_argument("--port", type=int, required=True)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "compare":
+        sys.exit(compare(args))
+    else:
+        serve(args)
+
+if __name__ == "__main__":
+    main()
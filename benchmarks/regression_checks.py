@@ -0,0 +1,129 @@
+"""
+Offline checks for behaviour that broke before and is easy to break again.
+Each check prints ok/FAIL; the exit status is non-zero if any failed.
+Run from the repository root:
+
+    python -m benchmarks.regression_checks
+    python -m benchmarks.regression_checks saturated_stream
+"""
+import os
+import sys
+import asyncio
+import argparse
+import tempfile
+import threading
+
+import yaml
+
+from aios.runtime.executors import StageExecutor, StageSaturated
+from benchmarks import loadtest
+
+def _blocking_tokens(release):
+    yield "first"
+    release.wait(5)
+    yield "second"
+
+async def _outcome(awaitable, timeout=2):
+    """The result or exception of `awaitable`; fails if it doesn't settle in time"""
+    # Not wait_for: cancelling a hung stream can surface the error it failed to deliver
+    task = asyncio.ensure_future(awaitable)
+    done, _ = await asyncio.wait({task}, timeout=timeout)
+    if not done:
+        task.cancel()
+        raise AssertionError(f"hung for {timeout}s")
+    return task.exception() or task.result()
+
+async def _expect_saturated(stream):
+    outcome = await _outcome(stream.__anext__())
+    assert isinstance(outcome, StageSaturated), f"expected StageSaturated, got {outcome!r}"
+
+async def check_saturated_stream():
+    """Streaming through a saturated shedding stage raises instead of hanging"""
+    stage = StageExecutor("llm", workers=1, max_pending=1, shed=True)
+    release = threading.Event()
+    try:
+        # The stage is already full when the stream starts
+        holder = stage.stream(_blocking_tokens, release)
+        assert await holder.__anext__() == "first"
+        await _expect_saturated(stage.stream(_blocking_tokens, release))
+        release.set()
+        assert [t async for t in holder] == ["second"]
+
+        # Both streams are admitted, but the second loses the slot before its
+        # producer starts; the error must still reach the consumer
+        release.clear()
+        first, second = stage.stream(_blocking_tokens, release), stage.stream(_blocking_tokens, release)
+        outcomes = await _outcome(asyncio.gather(first.__anext__(), second.__anext__(), return_exceptions=True))
+        assert outcomes[0] == "first", outcomes
+        assert isinstance(outcomes[1], StageSaturated), outcomes
+        release.set()
+        await first.aclose()
+    finally:
+        release.set()
+        stage.shutdown()
+
+async def check_response_cache():
+    """A repeated question is answered from the cache, and private replies stay with their user"""
+    with open(loadtest.DEFAULT_PROFILE, 'r') as f:
+        profile = yaml.safe_load(f)
+    profile.setdefault("config", {})["response_cache"] = {"enabled": True}
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        yaml.safe_dump(profile, f)
+    try:
+        with loadtest.faked_server(f.name) as (base_url, process):
+            await _response_cache_session(base_url, process)
+    finally:
+        os.unlink(f.name)
+
+async def _response_cache_session(base_url, process):
+    import httpx
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        await loadtest.wait_ready(client, "text", process, 300)
+
+        async def ask(user_id, text):
+            response = await client.post("/interact/text", json={"text": text, "user_id": user_id})
+            assert response.status_code == 200, response.text
+            await asyncio.sleep(0.5)  # let the turn be recorded before the next request
+            report = response.json()["meta"]["response_cache"]
+            return report["status"], report.get("scope")
+
+        question = "What are good ways to sleep better?"
+        steps = [
+            # (user, question, expected): a new user has no private memory, so replies are shared
+            ("cache-a", question, ("miss", "shared")),
+            ("cache-b", question, ("hit", "shared")),
+            # Now cache-a has a session; their replies are cached for them alone
+            ("cache-a", question, ("miss", "user")),
+            ("cache-a", question, ("hit", "user")),
+            ("cache-a", "Remember that my name is Ada.", ("miss", "user")),
+            ("cache-c", "Remember that my name is Ada.", ("miss", "shared")),
+        ]
+        for user_id, text, expected in steps:
+            outcome = await ask(user_id, text)
+            assert outcome == expected, f"{user_id} asking {text!r}: expected {expected}, got {outcome}"
+
+CHECKS = {
+    "saturated_stream": check_saturated_stream,
+    "response_cache": check_response_cache,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("checks", nargs="*", help=f"any of {', '.join(CHECKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = set(args.checks) - set(CHECKS)
+    if unknown:
+        parser.error(f"unknown check(s): {', '.join(sorted(unknown))}")
+
+    failed = 0
+    for name in args.checks or CHECKS:
+        try:
+            asyncio.run(CHECKS[name]())
+            print(f"ok    {name}")
+        except Exception as e:
+            failed += 1
+            print(f"FAIL  {name}: {type(e).__name__}: {e}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
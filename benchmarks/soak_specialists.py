@@ -0,0 +1,109 @@
+"""
+Soak test for the specialist registry: drives many requests through mode
+selection and symbolic checks, and reports the Prolog clause count and
+query latency per window. Both must stay flat. Latency is reported for the
+memoized registry path and for the same goals run straight against Prolog,
+and every window hot-reloads each rule set, so retraction is exercised too.
+With --legacy the original assert-on-every-switch behaviour is run alongside
+for comparison.
+Requires SWI-Prolog and pyswip, unless --fake runs it against the Prolog
+stand-in in benchmarks/fakes.py. Run from the repository root:
+
+    python -m benchmarks.soak_specialists --requests 100000
+    python -m benchmarks.soak_specialists --requests 100000 --legacy --fake
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from aios.brain.registry import SpecialistRegistry, CORE_MODULE
+from aios.brain.specialists import DomainSpecialist
+
+GOALS = {
+    "medicine": "symptom_of(fever, X)",
+    "law": "breach(X)",
+    "cybersecurity": "port_unsafe(X)",
+    "general": "true"
+}
+
+def legacy_switch(prolog, mode):
+    """The original switch_mode: re-asserts the domain's rules every time"""
+    for rule in DomainSpecialist(mode).get_symbolic_rules():
+        prolog.assertz(rule)
+
+def legacy_fact_count(prolog):
+    functors = [("symptom_of", 2), ("contraindicated", 2), ("urgent", 1), ("requires_contract", 1),
+                ("breach", 1), ("jurisdiction", 1), ("port_unsafe", 1), ("protocol_secure", 1),
+                ("mitigation", 2)]
+    total = 0
+    for name, arity in functors:
+        for solution in prolog.query(f"functor(H, {name}, {arity}), predicate_property(user:H, number_of_clauses(C))"):
+            total += int(solution["C"])
+    return total
+
+def soak(requests, window, legacy, seed, fake=False):
+    rng = random.Random(seed)
+    if fake:
+        from benchmarks.fakes import FakeProlog as Prolog
+    else:
+        from pyswip import Prolog
+    prolog = Prolog()
+    registry = SpecialistRegistry(prolog)
+    modes = list(DomainSpecialist.DOMAINS)
+    latencies = []
+    raw_latencies = []
+    legacy_latencies = []
+
+    for i in range(1, requests + 1):
+        mode = rng.choice(modes)
+
+        started = time.perf_counter()
+        specialist = registry.get(mode)
+        registry.query(specialist.domain, GOALS[mode])
+        registry.query(CORE_MODULE, "can_modify(root, kernel)")
+        latencies.append(time.perf_counter() - started)
+
+        # The same goals without the memo, so the clause store itself is timed
+        started = time.perf_counter()
+        with registry._lock:
+            list(prolog.query(f"{specialist.domain}:({GOALS[mode]})"))
+            list(prolog.query(f"{CORE_MODULE}:(can_modify(root, kernel))"))
+        raw_latencies.append(time.perf_counter() - started)
+
+        if legacy:
+            started = time.perf_counter()
+            legacy_switch(prolog, mode)
+            list(prolog.query(GOALS[mode]))
+            legacy_latencies.append(time.perf_counter() - started)
+
+        if i % window == 0:
+            for domain, specialist in registry.specialists.items():
+                registry.reload(domain, specialist.get_symbolic_rules())
+            line = (f"{i:>8} requests  clauses={registry.fact_count():<4} "
+                    f"p50={np.percentile(latencies, 50) * 1e6:7.1f}us p99={np.percentile(latencies, 99) * 1e6:7.1f}us  "
+                    f"unmemoized p50={np.percentile(raw_latencies, 50) * 1e6:7.1f}us "
+                    f"p99={np.percentile(raw_latencies, 99) * 1e6:7.1f}us")
+            if legacy:
+                line += (f"  | legacy clauses={legacy_fact_count(prolog):<7} "
+                         f"p50={np.percentile(legacy_latencies, 50) * 1e6:7.1f}us")
+                legacy_latencies.clear()
+            print(line)
+            latencies.clear()
+            raw_latencies.clear()
+
+    print(f"memo: {registry.stats()}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--window", type=int, default=10000)
+    parser.add_argument("--legacy", action="store_true", help="also run the assert-per-switch path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fake", action="store_true", help="use the Prolog stand-in instead of SWI-Prolog")
+    args = parser.parse_args()
+    soak(args.requests, args.window, args.legacy, args.seed, args.fake)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Replays a recording into /ws/voice in real time and measures mouth-to-ear latency.
+
+Mouth-to-ear is the time from the last voiced sample leaving the client to
+the first sample of reply audio arriving, plus --playout-ms for the
+client's jitter buffer. It covers endpointing (the end-of-silence wait),
+the final transcript, the LLM up to its first sentence and that
+sentence's synthesis. The end of speech in the recording is located with
+the same Silero VAD the server uses. Without --url the server is started
+against the fakes in benchmarks/fakes.py, so the run needs no models:
+
+    python -m benchmarks.voice_latency --runs 10 --profile benchmarks/profiles/cpu_node.yaml
+    python -m benchmarks.voice_latency --url ws://localhost:8000/ws/voice --barge-in
+
+With --barge-in the recording is replayed again as soon as reply audio
+arrives, and the time until the server interrupts the reply is reported.
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+from benchmarks import loadtest
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+FRAME_BYTES = SAMPLE_RATE * FRAME_MS // 1000 * 2
+METRICS = ("mouth_to_ear_ms", "endpoint_ms", "transcript_ms", "reply_done_ms", "barge_in_ms")
+
+def load_recording(path):
+    """(16 kHz s16le PCM, first voiced sample, last voiced sample)"""
+    from faster_whisper import decode_audio
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    audio = decode_audio(path, sampling_rate=SAMPLE_RATE)
+    # No padding: the reference is the last voiced sample itself
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=100, speech_pad_ms=0))
+    if not speech:
+        raise SystemExit(f"No speech found in {path}")
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+    return pcm, speech[0]["start"], speech[-1]["end"]
+
+class Replay:
+    """
+    One session: streams the recording frame by frame at real-time pace,
+    then silence (a live mic never stops sending), and timestamps what
+    comes back.
+    """
+    def __init__(self, pcm, speech_start, speech_end, barge_in):
+        self.frames = [pcm[i:i + FRAME_BYTES] for i in range(0, len(pcm), FRAME_BYTES)]
+        self.frames[-1] = self.frames[-1].ljust(FRAME_BYTES, b"\0")
+        self.onset_frame = speech_start * 2 // FRAME_BYTES
+        self.last_voiced_frame = (speech_end * 2 - 1) // FRAME_BYTES
+        self.barge_in = barge_in
+        self.mouth = None  # when the frame holding the last voiced sample was sent
+        self.barge_onset = None
+        self.events = {}
+        self.interrupted = False
+        self.finished = asyncio.Event()
+        self._replay_from = None
+
+    async def send(self, ws):
+        silence = bytes(FRAME_BYTES)
+        started = time.perf_counter()
+        index = 0
+        while not self.finished.is_set():
+            await asyncio.sleep(max(0.0, started + index * FRAME_MS / 1000 - time.perf_counter()))
+            if index < len(self.frames):
+                frame = self.frames[index]
+            elif self._replay_from is not None and index - self._replay_from < len(self.frames):
+                frame = self.frames[index - self._replay_from]
+            else:
+                frame = silence
+            await ws.send(frame)
+            if index == self.last_voiced_frame:
+                self.mouth = time.perf_counter()
+            if self._replay_from is not None and index - self._replay_from == self.onset_frame:
+                self.barge_onset = time.perf_counter()
+            index += 1
+            if self.barge_in and "first_audio" in self.events and self._replay_from is None:
+                self._replay_from = index
+
+    async def receive(self, ws):
+        async for message in ws:
+            now = time.perf_counter()
+            if isinstance(message, bytes):
+                self.events.setdefault("first_audio", now)
+                continue
+            event = json.loads(message)
+            kind = event["type"]
+            if kind == "interrupted":
+                self.interrupted = True
+                self.events.setdefault("interrupted", now)
+            elif kind == "error":
+                self.events["error"] = event.get("detail")
+                self.finished.set()
+            elif kind in ("speech_end", "transcript", "reply_done"):
+                self.events.setdefault(kind, now)
+                # With barge-in, the run ends with the reply to the replayed utterance
+                if kind == "reply_done" and (not self.barge_in or self.interrupted):
+                    self.finished.set()
+
+    def result(self, playout_ms):
+        def since_mouth(key):
+            value = self.events.get(key)
+            return round((value - self.mouth) * 1000, 2) if value and self.mouth else None
+        result = {
+            "mouth_to_ear_ms": since_mouth("first_audio"),
+            "endpoint_ms": since_mouth("speech_end"),
+            "transcript_ms": since_mouth("transcript"),
+            "reply_done_ms": since_mouth("reply_done"),
+            "barge_in_ms": None,
+            "error": self.events.get("error")
+        }
+        if result["mouth_to_ear_ms"] is not None:
+            result["mouth_to_ear_ms"] = round(result["mouth_to_ear_ms"] + playout_ms, 2)
+        if self.barge_onset and "interrupted" in self.events:
+            result["barge_in_ms"] = round((self.events["interrupted"] - self.barge_onset) * 1000, 2)
+        return result
+
+async def run_once(url, recording, args, user_id):
+    import websockets
+    replay = Replay(*recording, barge_in=args.barge_in)
+    async with websockets.connect(f"{url}?user_id={user_id}", max_size=None) as ws:
+        ready = json.loads(await ws.recv())
+        if ready.get("type") != "ready":
+            raise RuntimeError(f"Unexpected greeting: {ready}")
+        sender = asyncio.create_task(replay.send(ws))
+        receiver = asyncio.create_task(replay.receive(ws))
+        try:
+            await asyncio.wait_for(replay.finished.wait(), args.timeout)
+        except asyncio.TimeoutError:
+            replay.events.setdefault("error", f"timed out after {args.timeout}s")
+        finally:
+            replay.finished.set()
+            sender.cancel()
+            receiver.cancel()
+            await asyncio.gather(sender, receiver, return_exceptions=True)
+    return replay.result(args.playout_ms)
+
+def summarize(results):
+    summary = {}
+    for metric in METRICS:
+        values = sorted(r[metric] for r in results if r[metric] is not None)
+        if values:
+            summary[metric] = {
+                "n": len(values),
+                "mean": round(sum(values) / len(values), 2),
+                **{f"p{p}": loadtest._percentile(values, p) for p in loadtest.PERCENTILES}
+            }
+    return summary
+
+async def drive(args, url, process=None):
+    recording = load_recording(args.wav)
+    if process is not None:
+        import httpx
+        async with httpx.AsyncClient(base_url=url.replace("ws://", "http://", 1).rsplit("/ws/", 1)[0]) as client:
+            await loadtest.wait_ready(client, "audio", process, args.startup_timeout)
+    for _ in range(args.warmup):
+        await run_once(url, recording, args, "voice-bench-warmup")
+    results = []
+    for i in range(args.runs):
+        results.append(await run_once(url, recording, args, f"voice-bench-{i}"))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="ws:// URL of a running /ws/voice; default starts a faked server")
+    parser.add_argument("--profile", default=loadtest.DEFAULT_PROFILE, help="backend latency profile for the faked server")
+    parser.add_argument("--wav", default=os.path.join(loadtest.REPO, "test.wav"), help="recording to replay")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured sessions first")
+    parser.add_argument("--playout-ms", type=float, default=0.0, help="client jitter buffer added to mouth-to-ear")
+    parser.add_argument("--barge-in", action="store_true", help="talk over the reply and time the interruption")
+    parser.add_argument("--timeout", type=float, default=60, help="per-session timeout in seconds")
+    parser.add_argument("--startup-timeout", type=float, default=300)
+    parser.add_argument("--out", default=None, help="also write results as JSON")
+    args = parser.parse_args()
+
+    if args.url:
+        results = asyncio.run(drive(args, args.url))
+    else:
+        with loadtest.faked_server(args.profile) as (base_url, process):
+            url = base_url.replace("http://", "ws://", 1) + "/ws/voice"
+            results = asyncio.run(drive(args, url, process))
+
+    summary = summarize(results)
+    errors = [r["error"] for r in results if r["error"]]
+    print(f"{len(results) - len(errors)}/{len(results)} sessions ok")
+    print(f"{'metric':<18} {'n':>4} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for metric, st in summary.items():
+        cells = " ".join(f"{st[f'p{p}']:>7.1f}ms" for p in loadtest.PERCENTILES)
+        print(f"{metric:<18} {st['n']:>4} {st['mean']:>7.1f}ms {cells}")
+    for error in sorted(set(errors)):
+        print(f"error: {error}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({"summary": summary, "runs": results}, f, indent=2)
+        print(f"Results written to {args.out}")
+
+if __name__ == "__main__":
+    main()
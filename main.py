@@ -1,19 +1,36 @@
-from fastapi import FastAPI, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, BackgroundTasks, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-import shutil
+from typing import Optional, Literal
+import asyncio
+import json
+import time
+import threading
 import os
+import yaml
 import uvicorn
 import logging
+import numpy as np
 
 # AIOS Modules
 from aios.brain.core import OS1Brain
 from aios.brain.learning import RLAgent
 from aios.brain.reasoning import BayesianDecision
+from aios.brain.router import IntentRouter
 from aios.perception.senses import Senses
-from aios.perception.voice import VoiceEngine
+from aios.perception.voice import VoiceEngine, take_sentences
+from aios.perception.vad import Endpointer
+from aios.perception.stt_service import SAMPLE_RATE
+from aios.perception.audio_store import AudioStore
+from aios.perception.vision import EmotionPipeline
 from aios.memory.manager import MemoryManager
 from aios.tools.toolbox import Toolbox
 from aios.safety.firewall import CognitiveFirewall  # NEW
+from aios.brain.scheduler import SchedulerRejected, capacity_for
+from aios.runtime.executors import PipelineExecutors, StageSaturated
+from aios.runtime.subsystems import Subsystems, SubsystemNotReady
+from aios.runtime.batch import BATCH_ID, BatchCheckpoint, BatchRunner
+from aios.runtime.metrics import REGISTRY, REQUESTS, STAGE_SECONDS, VOICE_RESPONSE_SECONDS, Trace
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
@@ -21,116 +38,1024 @@ logger = logging.getLogger("OS1.Kernel")
 
 app = FastAPI(title="OS1 Kernel")
 
+with open('aios/config/config.yaml', 'r') as f:
+    cfg = yaml.safe_load(f)
+
+def _start_trainer(agent):
+    if agent.cfg.get('spawn_trainer', True):
+        agent.start_trainer()
+
+def _prewarm_voice(engine):
+    threading.Thread(target=engine.prewarm_cache, daemon=True).start()
+
 # Initialize Subsystems
-brain = OS1Brain()
-senses = Senses()
-memory = MemoryManager()
-voice = VoiceEngine()
-rl_agent = RLAgent()
-bayes = BayesianDecision()
-tools = Toolbox()
+# Heavy subsystems are lazy handles: nothing loads at import, warmup loads
+# them in parallel at startup, and each code path only waits for its own.
+subsystems = Subsystems(groups=cfg.get('startup', {}).get('groups'))
+brain = subsystems.add("brain", OS1Brain)
+memory = subsystems.add("memory", MemoryManager)
+voice = subsystems.add("voice", VoiceEngine, on_ready=_prewarm_voice)
+bayes = subsystems.add("bayes", BayesianDecision)
+senses = subsystems.add("senses", Senses)
+vision = subsystems.add("vision", EmotionPipeline)
+rl_agent = subsystems.add("rl_agent", RLAgent, on_ready=_start_trainer)
+router = IntentRouter()
 firewall = CognitiveFirewall() # NEW
+# The LLM stage gets one thread per schedulable request and sheds the rest,
+# so ordering and admission are decided by the brain's priority scheduler.
+llm_capacity = capacity_for(cfg.get('scheduler', {}))
+executors = PipelineExecutors(overrides={
+    "llm": {
+        "workers": llm_capacity,
+        "max_pending": llm_capacity,
+        "shed": True
+    }
+})
+tools = Toolbox(runner=lambda fn, *args: executors.run("tools", fn, *args))
+# Reply audio by ID; synthesis runs after the reply is sent (see _start_synthesis)
+audio_store = AudioStore()
+realtime_cfg = cfg.get('realtime_voice', {})
+# Work that outlives the request that started it; the loop only keeps weak references to tasks
+_background_tasks = set()
+_voice_sessions = set()
+batch_cfg = cfg.get('batch', {})
+_active_batches = set()
+
+AudioFormat = Literal["wav", "flac", "ogg"]
+# The scheduler classes a client may ask for; "audio" is assigned server-side
+# to voice turns, so it can't be claimed to jump the queue
+ClientPriority = Literal["interactive", "batch"]
 
 class InteractionRequest(BaseModel):
     text: str
     user_id: str
+    priority: ClientPriority = "interactive"
+    deadline_ms: Optional[int] = None
+    trace: bool = False # Return per-stage spans in meta
+    audio_format: Optional[AudioFormat] = None # Defaults to audio_store.encoding
+
+@app.exception_handler(SchedulerRejected)
+@app.exception_handler(StageSaturated)
+async def overload_handler(request: Request, exc: Exception):
+    logger.warning(f"Load shed: {exc}")
+    REQUESTS.inc(endpoint=request.url.path, status="overloaded")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"status": "overloaded", "detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
 
+@app.exception_handler(SubsystemNotReady)
+async def not_ready_handler(request: Request, exc: SubsystemNotReady):
+    REQUESTS.inc(endpoint=request.url.path, status="unavailable")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"status": "unavailable", "detail": str(exc)},
+        headers={"Retry-After": "5"}
+    )
+
+# Health and metrics are async and touch no subsystem, so they are served
+# straight from the event loop even while every executor is saturated.
 @app.get("/")
-def health_check():
+async def health_check():
     return {"status": "OS1 Online", "system": "Nominal"}
 
+@app.get("/healthz")
+async def liveness():
+    """Liveness: the event loop answers; says nothing about subsystems"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness():
+    """Readiness: 200 once the text path can serve, with per-subsystem load state and timings"""
+    report = subsystems.report()
+    ready = subsystems.is_ready("text")
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, **report})
+
+def _collect_metrics():
+    """Scrape-time gauges read from the subsystems' own stats()"""
+    samples = []
+    for stage, st in executors.stats().items():
+        samples.append(("os1_executor_pending", "Calls queued or running per executor stage", {"stage": stage}, st["pending"]))
+        samples.append(("os1_executor_active", "Calls running per executor stage", {"stage": stage}, st["active"]))
+    for name, handle in subsystems.handles.items():
+        samples.append(("os1_subsystem_ready", "1 once a subsystem has loaded", {"subsystem": name}, int(handle.ready)))
+        if handle.load_s is not None:
+            samples.append(("os1_subsystem_load_seconds", "Subsystem construction time", {"subsystem": name}, handle.load_s))
+
+    queues = {}
+    caches = {}
+    if brain.ready:
+        sched = brain.scheduler.stats()
+        queues["llm"] = sched["queue_depth"]
+        samples.append(("os1_llm_contexts_busy", "LLM contexts currently checked out", {}, sched["busy"]))
+        if brain.prefix_cache:
+            caches["prefix"] = brain.prefix_cache.stats()
+        memo = brain.registry.stats()
+        caches["specialist_memo"] = {"hits": memo["memo_hits"], "misses": memo["memo_misses"]}
+        caches["token_counts"] = brain.assembler.count.stats()
+    if senses.ready:
+        queues["stt"] = senses.transcriber.stats()["queued"]
+    if memory.ready:
+        queues["episodic"] = memory.episodic.stats()["queued"]
+        queues["vector"] = memory.ingestor.stats()["queued"]
+        caches["embedding"] = memory.embedder.stats()
+        response = memory.response_cache.stats()
+        caches["response"] = response
+        samples.append(("os1_sessions_resident", "Conversation sessions held in memory", {},
+                        memory.sessions.stats()["resident"]))
+        samples.append(("os1_response_cache_saved_seconds", "LLM time avoided by response cache hits",
+                        {}, response["saved_ms"] / 1000))
+    if voice.ready and voice.cache:
+        tts = voice.cache.stats()
+        caches["tts"] = {"hits": tts["memory_hits"] + tts["disk_hits"], "misses": tts["misses"]}
+    if vision.ready:
+        vis = vision.stats()
+        samples.append(("os1_vision_frames_dropped", "Webcam frames dropped by the vision pipeline", {}, vis["dropped"]))
+        samples.append(("os1_vision_effective_fps", "Current per-user frame rate ceiling", {}, vis["effective_fps"]))
+    samples.append(("os1_voice_sessions", "Open /ws/voice sessions", {}, len(_voice_sessions)))
+    audio = audio_store.stats()
+    samples.append(("os1_audio_artifacts", "Reply audio artifacts held for download", {}, audio["artifacts"]))
+    samples.append(("os1_audio_bytes", "Bytes of reply audio held for download", {}, audio["bytes"]))
+    tool_hits = sum(t["cache_hits"] for t in tools.stats().values())
+    caches["tools"] = {"hits": tool_hits, "misses": sum(t["calls"] for t in tools.stats().values())}
+
+    for queue, depth in queues.items():
+        samples.append(("os1_queue_depth", "Items waiting per internal queue", {"queue": queue}, depth))
+    for cache, st in caches.items():
+        lookups = st["hits"] + st["misses"]
+        samples.append(("os1_cache_hits", "Cache hits since start", {"cache": cache}, st["hits"]))
+        samples.append(("os1_cache_misses", "Cache misses since start", {"cache": cache}, st["misses"]))
+        samples.append(("os1_cache_hit_ratio", "Cache hit ratio since start", {"cache": cache}, round(st["hits"] / lookups, 4) if lookups else 0.0))
+    return samples
+
+REGISTRY.add_collector(_collect_metrics)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+async def stats():
+    """Raw subsystem stats as JSON"""
+    return {
+        "executors": executors.stats(),
+        "scheduler": brain.scheduler.stats() if brain.ready else None,
+        "prefix_cache": brain.prefix_cache.stats() if brain.ready and brain.prefix_cache else None,
+        "specialists": brain.registry.stats() if brain.ready else None,
+        "tools": tools.stats(),
+        "voice": voice.stats() if voice.ready else None,
+        "stt": senses.transcriber.stats() if senses.ready else None,
+        "vision": vision.stats() if vision.ready else None,
+        "episodic": memory.episodic.stats() if memory.ready else None,
+        "vector": {**memory.ingestor.stats(), "embeddings": memory.embedder.stats()} if memory.ready else None,
+        "response_cache": memory.response_cache.stats() if memory.ready else None,
+        "sessions": memory.sessions.stats() if memory.ready else None,
+        "audio_store": audio_store.stats(),
+        "prompt_token_counts": brain.assembler.count.stats() if brain.ready else None,
+        "startup": subsystems.report()
+    }
+
+@app.on_event("startup")
+def start_warmup():
+    subsystems.warmup()
+
+@app.on_event("shutdown")
+async def close_async_clients():
+    if memory.ready:
+        await memory.aclose()
+
+@app.on_event("shutdown")
+def shutdown_executors():
+    audio_store.close()
+    executors.shutdown()
+    if rl_agent.ready:
+        rl_agent.stop_trainer()
+    for handle in (voice, vision, memory):
+        if handle.ready:
+            handle.close()
+
+def _emotion(user_id):
+    """Vision is optional on the text path: Neutral until it has loaded"""
+    return vision.emotion_label(user_id) if vision.ready else "Neutral"
+
+def _record_feedback(background_tasks, started):
+    if rl_agent.ready:
+        background_tasks.add_task(rl_agent.record_interaction, 0.5, time.monotonic() - started)
+
+def _next_optimization():
+    return rl_agent.get_optimization_action() if rl_agent.ready else None
+
+async def _timed(trace, stage, awaitable):
+    with trace.span(stage):
+        return await awaitable
+
+def _context_items(tiers):
+    """Retrieved items in tier order, for the brain to dedupe against history and budget one by one"""
+    return [item for tier in ("hot", "semantic", "episodic") for item in tiers.get(tier, [])]
+
+async def _prepare_text_interaction(req, trace):
+    """
+    Runs the pre-generation stages shared by the blocking and streaming
+    text endpoints. Returns None when the firewall blocks the request.
+    """
+    subsystems.require("text")
+
+    # 0. SAFETY CHECK (Firewall)
+    with trace.span("firewall"):
+        if firewall.check_adversarial(req.text):
+            return None
+        clean_text = firewall.sanitize_input(req.text)
+
+    # 1. MODE SELECTION + tool triggers in one pass, scoped to this request
+    with trace.span("route"):
+        route = router.route(clean_text)
+
+    # 2. Tiered Memory Retrieval + 3. Routed Tools + 4. Bayesian Confidence Check + Session history (independent stages)
+    tool_calls = {name: tools.arguments_for(name, clean_text) for name in route["tools"]}
+    tiers, sources = {}, {}
+    (_, retrieval), tool_result, confidence, history = await asyncio.gather(
+        _timed(trace, "retrieval", memory.retrieve_tiered(req.user_id, clean_text, items=tiers, sources=sources)),
+        _timed(trace, "tools", tools.run_many(tool_calls)),
+        _timed(trace, "confidence", executors.run("reasoning", bayes.assess_confidence, len(clean_text), 0.3)),
+        _timed(trace, "session", memory.history(req.user_id))
+    )
+    tool_lines = []
+    for tool_name, output in tool_result.items():
+        if tool_name == "get_time":
+            tool_lines.append(f"[System Info: Current Time is {output}]")
+        else:
+            tool_lines.append(f"[System Info: {output}]")
+
+    # The brain fits these into its token budget; retrieved items stay in tier order
+    parts = {
+        "context": _context_items(tiers),
+        "history": history,
+        "tools": tool_lines,
+        "sources": sources  # what the response cache keys on
+    }
+    return clean_text, parts, tool_result, confidence, retrieval, route["mode"]
+
+def _record_llm(trace, timings):
+    """Splits the LLM stage into queue wait and prompt eval using the lease timings"""
+    start = trace.start_of("llm")
+    if "queue_wait_ms" in timings:
+        queue_wait = timings["queue_wait_ms"] / 1000
+        trace.record("llm_queue", queue_wait, start)
+        if "first_token_ms" in timings:
+            trace.record("llm_first_token", timings["first_token_ms"] / 1000,
+                         start + queue_wait if start is not None else None)
+
+async def _lookup_reply(trace, mode, clean_text, user_id, parts, emotion, tool_result):
+    """Semantic cache check before generation; a disabled cache answers immediately"""
+    return await _timed(trace, "response_cache",
+                        memory.response_cache.lookup(mode, clean_text, user_id, parts["sources"], emotion,
+                                                     tools=tool_result, private=bool(parts["history"])))
+
+def _cache_reply(background_tasks, lookup, response_text, passed, timings):
+    """Caches a freshly generated reply that passed the audit"""
+    if lookup.status == "miss" and passed:
+        cost_ms = timings.get("queue_wait_ms", 0) + timings.get("generation_ms", 0)
+        background_tasks.add_task(memory.response_cache.store, lookup, response_text, cost_ms)
+
+def _start_synthesis(text, audio_format=None):
+    """
+    Registers an audio artifact and synthesizes into it in the background,
+    so the reply goes out without waiting for TTS and the client fetches
+    the audio from /audio/{id}, streaming it while it is being rendered.
+    """
+    artifact = audio_store.create(audio_format)
+
+    async def synthesize():
+        started = time.perf_counter()
+        try:
+            await executors.run("tts", voice.synthesize_to, artifact, text)
+        except Exception as e:
+            logger.error(f"TTS failed for {artifact.id}: {e}")
+            artifact.finish(str(e))
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="tts")
+
+    _spawn(synthesize())
+    return artifact
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+def _audio_reply(artifact):
+    return {"audio_id": artifact.id, "audio_url": f"/audio/{artifact.id}"}
+
+def _audit_response(response_text, passed=None):
+    """Audit Fairness (Post-Gen Safety) on the finished reply, unless already audited while streaming"""
+    if passed is None:
+        passed = firewall.audit_fairness(response_text, "general_public")
+    if not passed:
+        response_text += "\n[Audit Note: This response has been flagged for potential bias review.]"
+    return response_text
+
 @app.post("/interact/text")
 async def text_interaction(req: InteractionRequest, background_tasks: BackgroundTasks):
     logger.info(f"Processing text from {req.user_id}")
+    started = time.monotonic()
+    trace = Trace(req.trace)
 
-    # 0. SAFETY CHECK (Firewall)
-    if firewall.check_adversarial(req.text):
+    prepared = await _prepare_text_interaction(req, trace)
+    reply = await _complete_text_interaction(req, prepared, trace, background_tasks, started)
+    REQUESTS.inc(endpoint="/interact/text", status=reply.get("status", "ok"))
+    return reply
+
+async def _complete_text_interaction(req, prepared, trace, background_tasks, started, synthesize=True, learn=True):
+    """
+    Generation onwards for a prepared text request, shared by /interact/text
+    and batch mode. Follow-up work is queued on `background_tasks`; batch
+    mode can leave out synthesis and the RL update.
+    """
+    if prepared is None:
         return {"response": "I cannot comply with that request due to safety protocols.", "status": "blocked"}
+    clean_text, parts, tool_result, confidence, retrieval, mode = prepared
     
-    clean_text = firewall.sanitize_input(req.text)
-
-    # 1. MODE SWITCHING (Simple Intent Detection)
-    if "medical" in clean_text.lower() or "doctor" in clean_text.lower():
-        brain.switch_mode("medicine")
-    elif "legal" in clean_text.lower() or "lawyer" in clean_text.lower():
-        brain.switch_mode("law")
-    elif "hack" in clean_text.lower() or "cyber" in clean_text.lower():
-        brain.switch_mode("cybersecurity")
+    # 5. Generate Response, unless a near-identical query was already answered
+    timings = {}
+    emotion = _emotion(req.user_id)
+    cached = await _lookup_reply(trace, mode, clean_text, req.user_id, parts, emotion, tool_result)
+    if cached.hit:
+        response_text = cached.response
     else:
-        brain.switch_mode("general")
-
-    # 2. Memory Retrieval
-    context = memory.retrieve_context(clean_text)
-    
-    # 3. Tool Check
-    tool_result = ""
-    if "time" in clean_text.lower():
-        tool_result = tools.execute("get_time", None)
-        context += f"\n[System Info: Current Time is {tool_result}]"
-
-    # 4. Bayesian Confidence Check
-    confidence = bayes.assess_confidence(len(clean_text), 0.3)
-    
-    # 5. Generate Response
-    response_text = brain.generate_response(clean_text, context, "Neutral")
+        with trace.span("llm"):
+            response_text = await executors.run(
+                "llm", brain.generate_response, clean_text, parts["context"], emotion,
+                priority=req.priority, deadline_ms=req.deadline_ms, timings=timings, mode=mode,
+                history=parts["history"], tools=parts["tools"]
+            )
+        _record_llm(trace, timings)
 
     # 6. Audit Fairness (Post-Gen Safety)
-    if not firewall.audit_fairness(response_text, "general_public"):
-        response_text += "\n[Audit Note: This response has been flagged for potential bias review.]"
+    with trace.span("audit"):
+        passed = firewall.audit_fairness(response_text, "general_public")
+        _cache_reply(background_tasks, cached, response_text, passed, timings)
+        response_text = _audit_response(response_text, passed)
 
-    # 7. Generate Audio
-    output_audio = "response_text.wav"
-    voice.speak(response_text, output_audio)
+    # 7. Generate Audio (in the background; the client downloads it by ID)
+    reply = {"response": response_text}
+    if synthesize:
+        reply.update(_audio_reply(_start_synthesis(response_text, req.audio_format)))
 
     # 8. Background Learning & Memory
-    background_tasks.add_task(rl_agent.update_policy, 0.5)
-    background_tasks.add_task(memory.add_episodic_memory, clean_text, response_text, "Neutral")
+    if learn:
+        _record_feedback(background_tasks, started)
+    background_tasks.add_task(executors.run, "memory", memory.add_episodic_memory, clean_text, response_text, emotion, req.user_id)
+    background_tasks.add_task(memory.record_turn, req.user_id, clean_text, response_text)
 
-    next_opt = rl_agent.get_optimization_action()
-
-    return {
-        "response": response_text,
-        "audio_path": output_audio,
-        "meta": {
-            "confidence": confidence,
-            "tool_output": tool_result,
-            "optimization": next_opt
-        }
+    reply["meta"] = {
+        "mode": mode,
+        "confidence": confidence,
+        "tool_output": tool_result,
+        "retrieval": retrieval,
+        "response_cache": cached.report(memory.response_cache.hit_rate()),
+        "optimization": _next_optimization() if learn else None,
+        "timings": timings,
+        "trace": trace.export()
     }
+    return reply
+
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+async def _replay(text):
+    """A cached reply in the shape of executors.stream()"""
+    yield text
+
+@app.post("/interact/text/stream")
+async def text_interaction_stream(req: InteractionRequest, background_tasks: BackgroundTasks):
+    """
+    Server-Sent Events variant of /interact/text. Emits one `token` event per
+    decoded fragment and a final `done` event carrying the audited reply.
+    """
+    logger.info(f"Streaming text for {req.user_id}")
+    # Before the response starts: once headers are out a 503 can't be sent
+    subsystems.require("text")
+
+    async def event_stream():
+        started = time.monotonic()
+        trace = Trace(req.trace)
+        prepared = await _prepare_text_interaction(req, trace)
+        if prepared is None:
+            REQUESTS.inc(endpoint="/interact/text/stream", status="blocked")
+            yield _sse("done", {"response": "I cannot comply with that request due to safety protocols.", "status": "blocked"})
+            return
+        clean_text, parts, tool_result, confidence, retrieval, mode = prepared
+
+        # 5. Generate Response (token by token); a cached reply arrives as one fragment
+        fragments = []
+        timings = {}
+        emotion = _emotion(req.user_id)
+        cached = await _lookup_reply(trace, mode, clean_text, req.user_id, parts, emotion, tool_result)
+        if cached.hit:
+            tokens = _replay(cached.response)
+        else:
+            tokens = executors.stream(
+                "llm", brain.stream_response, clean_text, parts["context"], emotion,
+                priority=req.priority, deadline_ms=req.deadline_ms, timings=timings, mode=mode,
+                history=parts["history"], tools=parts["tools"]
+            )
+        # 6. Audit Fairness as the text arrives; stop terms end generation early
+        auditor = firewall.stream_auditor("general_public")
+        try:
+            with trace.span("replay" if cached.hit else "llm"):
+                async for token in tokens:
+                    text = auditor.feed(token)
+                    if text:
+                        fragments.append(text)
+                        yield _sse("token", {"text": text})
+                    if auditor.stopped:
+                        await tokens.aclose()
+                        break
+            tail = auditor.drain()
+            if tail:
+                fragments.append(tail)
+                yield _sse("token", {"text": tail})
+        except (SchedulerRejected, StageSaturated) as e:
+            # Headers are already sent, so shedding is reported in-band
+            REQUESTS.inc(endpoint="/interact/text/stream", status="overloaded")
+            yield _sse("error", {"status": "overloaded", "code": e.status_code, "detail": str(e)})
+            return
+        if not cached.hit:
+            _record_llm(trace, timings)
+        REQUESTS.inc(endpoint="/interact/text/stream", status="stopped" if auditor.stopped else "ok")
+
+        response_text = "".join(fragments)
+        passed = auditor.finish()
+        if not auditor.stopped:
+            _cache_reply(background_tasks, cached, response_text, passed, timings)
+        response_text = _audit_response(response_text, passed)
+        if auditor.stopped:
+            response_text += "\n[Audit Note: Generation was stopped by the output audit.]"
+
+        # 7. Background Learning & Memory (run once the stream has closed)
+        _record_feedback(background_tasks, started)
+        background_tasks.add_task(executors.run, "memory", memory.add_episodic_memory, clean_text, response_text, emotion, req.user_id)
+        background_tasks.add_task(memory.record_turn, req.user_id, clean_text, response_text)
+
+        yield _sse("done", {
+            "response": response_text,
+            "meta": {
+                "mode": mode,
+                "confidence": confidence,
+                "tool_output": tool_result,
+                "retrieval": retrieval,
+                "response_cache": cached.report(memory.response_cache.hit_rate()),
+                "optimization": _next_optimization(),
+                "timings": timings,
+                "trace": trace.export()
+            }
+        })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        background=background_tasks
+    )
 
 @app.post("/interact/audio")
-async def audio_interaction(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
-    # 1. Save Audio
-    temp_filename = f"temp_{file.filename}"
-    with open(temp_filename, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+async def audio_interaction(background_tasks: BackgroundTasks, file: UploadFile = File(...),
+                            audio_format: Optional[AudioFormat] = None):
+    subsystems.require("audio")
+    trace = Trace()
+
+    # 1. Decode Audio in memory (no temp files) and trim silence
+    data = await file.read()
+    def decode_upload():
+        return senses.transcriber.trim(senses.transcriber.decode(data))
+    with trace.span("stt_decode"):
+        audio = await executors.run("stt", decode_upload)
         
-    # 2. Perception (STT)
-    user_text = senses.listen_to_audio_file(temp_filename)
+    # 2. Perception (STT), micro-batched with concurrent uploads
+    with trace.span("stt"):
+        user_text = await asyncio.wrap_future(senses.transcriber.submit(audio))
     logger.info(f"Heard: {user_text}")
     
     # 3. Safety Check on Transcription
-    if firewall.check_adversarial(user_text):
-        return {"response": "Safety protocol engaged."}
-    clean_text = firewall.sanitize_input(user_text)
+    with trace.span("firewall"):
+        if firewall.check_adversarial(user_text):
+            REQUESTS.inc(endpoint="/interact/audio", status="blocked")
+            return {"response": "Safety protocol engaged."}
+        clean_text = firewall.sanitize_input(user_text)
 
-    # 4. Cognitive Pipeline
-    context = memory.retrieve_context(clean_text)
-    response_text = brain.generate_response(clean_text, context, "Audio_Input")
+    # 4. Cognitive Pipeline, with the same per-item prompt budgeting as the text path
+    tiers = {}
+    _, history = await asyncio.gather(
+        _timed(trace, "retrieval", memory.retrieve_tiered("Primary", clean_text, items=tiers)),
+        _timed(trace, "session", memory.history("Primary"))
+    )
+    timings = {}
+    with trace.span("llm"):
+        response_text = await executors.run("llm", brain.generate_response, clean_text, _context_items(tiers), "Audio_Input",
+                                             priority="audio", mode=router.route(clean_text)["mode"], timings=timings,
+                                             history=history)
+    _record_llm(trace, timings)
     
-    # 5. Voice Generation (TTS)
-    output_audio_path = f"response_{file.filename}.wav"
-    voice.speak(response_text, output_audio_path)
+    # 5. Voice Generation (TTS), downloaded by ID
+    artifact = _start_synthesis(response_text, audio_format)
+    REQUESTS.inc(endpoint="/interact/audio", status="ok")
     
-    # 6. Cleanup & Memory
-    background_tasks.add_task(os.remove, temp_filename)
-    background_tasks.add_task(memory.add_episodic_memory, clean_text, response_text, "Audio")
+    # 6. Memory
+    background_tasks.add_task(executors.run, "memory", memory.add_episodic_memory, clean_text, response_text, "Audio")
+    background_tasks.add_task(memory.record_turn, "Primary", clean_text, response_text)
 
     return {
         "transcription": clean_text,
         "response_text": response_text,
-        "audio_path": output_audio_path
+        **_audio_reply(artifact)
     }
 
+def _parse_batch(body, max_items, deadline_ms):
+    """
+    InteractionRequests from a JSONL body as runner items; "id" defaults to
+    the line's position among non-empty lines. Raises ValueError naming the
+    first bad line.
+    """
+    items = []
+    for number, line in enumerate(body.decode("utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        if len(items) >= max_items:
+            raise ValueError(f"More than {max_items} items")
+        try:
+            fields = json.loads(line)
+            item_id = str(fields.pop("id", len(items)))
+            fields.setdefault("user_id", "batch")
+            fields["priority"] = "batch"  # every item yields to interactive traffic
+            fields.setdefault("deadline_ms", deadline_ms)
+            req = InteractionRequest(**fields)
+        except (ValueError, TypeError, AttributeError) as e:
+            raise ValueError(f"Line {number}: {e}")
+        items.append({"id": item_id, "text": req.text, "user_id": req.user_id, "request": req})
+    return items
+
+@app.post("/interact/batch")
+async def batch_interaction(request: Request, batch_id: Optional[str] = None,
+                            skip_tts: bool = False, skip_rl: bool = False):
+    """
+    Runs a JSONL body of /interact/text requests (one per line, with an
+    optional "id") through the same pipeline and streams back one JSON
+    result per line in completion order, then a {"summary": ...} line.
+    With `batch_id` finished results are checkpointed; posting the same
+    batch again replays them and processes only the rest. `skip_tts` and
+    `skip_rl` leave out reply audio and the RL update; memory is still
+    written, so a batch can backfill it. One HTTP request carries the
+    whole batch, so throughput is set by the LLM, not per-call overhead.
+    """
+    subsystems.require("text")
+    if batch_id is not None and not BATCH_ID.match(batch_id):
+        return JSONResponse(status_code=400, content={"status": "invalid", "detail": "batch_id must match [A-Za-z0-9_.-]{1,64}"})
+    if batch_id in _active_batches:
+        return JSONResponse(status_code=409, content={"status": "busy", "detail": f"Batch '{batch_id}' is already running"})
+    try:
+        items = _parse_batch(await request.body(), batch_cfg.get('max_items', 100000), batch_cfg.get('deadline_ms', 600000))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "invalid", "detail": str(e)})
+
+    async def prepare(item):
+        req = item["request"]
+        trace = Trace(req.trace)
+        started = time.monotonic()
+        return req, trace, started, await _prepare_text_interaction(req, trace)
+
+    async def generate(item, state):
+        req, trace, started, prepared = state
+        follow_up = BackgroundTasks()
+        reply = await _complete_text_interaction(req, prepared, trace, follow_up, started,
+                                                 synthesize=not skip_tts, learn=not skip_rl)
+        return {"id": item["id"], "status": reply.pop("status", "ok"), **reply}, follow_up
+
+    async def finish(item, result, follow_up):
+        REQUESTS.inc(endpoint="/interact/batch", status=result["status"])
+        await follow_up()
+
+    checkpoint = None
+    if batch_id is not None:
+        os.makedirs(batch_cfg.get('checkpoint_dir', "root/db/batch"), exist_ok=True)
+        checkpoint = BatchCheckpoint(os.path.join(batch_cfg.get('checkpoint_dir', "root/db/batch"), f"{batch_id}.jsonl"))
+        _active_batches.add(batch_id)
+    runner = BatchRunner(prepare, generate, finish, batch_cfg, contexts=cfg.get('scheduler', {}).get('contexts', 1))
+    logger.info(f"Batch {batch_id or '(unnamed)'}: {len(items)} items")
+
+    async def results():
+        try:
+            async for result in runner.run(items, checkpoint):
+                yield json.dumps(result) + "\n"
+        finally:
+            _active_batches.discard(batch_id)
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+def _parse_range(header):
+    """
+    (start, end) for a single `bytes=` range; start is None for a suffix
+    range (the last `end` bytes) and end is None for an open one. Anything
+    else, multi-range included, returns None and is served whole, as
+    RFC 9110 allows.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            return (None, int(last)) if last else None
+        start, end = int(first), int(last) if last else None
+    except ValueError:
+        return None
+    if end is not None and end < start:
+        return None
+    return start, end
+
+async def _audio_chunks(artifact, start, end, follow):
+    """
+    Yields the artifact's bytes from `start` through `end` (inclusive, or
+    to the current end of file). With `follow`, keeps yielding as synthesis
+    appends until the artifact is finished.
+    """
+    with open(artifact.path, "rb") as f:
+        f.seek(start)
+        position = start
+        while True:
+            limit = artifact.size if end is None else min(artifact.size, end + 1)
+            if position < limit:
+                chunk = await asyncio.to_thread(f.read, min(audio_store.chunk_size, limit - position))
+                if chunk:
+                    position += len(chunk)
+                    yield chunk
+                    continue
+            if not follow or (artifact.done and position >= artifact.size):
+                return
+            await artifact.wait(position, audio_store.wait_timeout)
+
+@app.get("/audio/{artifact_id}")
+async def audio_download(artifact_id: str, request: Request):
+    """
+    Reply audio by ID, with single-range support. Finished audio is served
+    like a static file. While synthesis is running, a plain GET streams the
+    file as it grows, and a range request returns whatever part of the
+    range exists so far with an unknown total (`Content-Range: a-b/*`);
+    players resume from b+1. WAV headers of unfinished audio carry
+    streaming (maximal) sizes.
+    """
+    artifact = audio_store.get(artifact_id)
+    if artifact is None:
+        return JSONResponse(status_code=404, content={"status": "not_found", "detail": "Unknown or expired audio"})
+    byte_range = _parse_range(request.headers.get("range"))
+
+    # A suffix range needs the total; other reads wait only for their first byte
+    first = byte_range[0] if byte_range else 0
+    while not artifact.done and (first is None or artifact.size <= first):
+        size = artifact.size
+        await artifact.wait(size, audio_store.wait_timeout)
+        if not artifact.done and artifact.size == size:
+            return JSONResponse(status_code=503, content={"status": "pending", "detail": "Audio is not ready yet"},
+                                headers={"Retry-After": "1"})
+    if artifact.done and artifact.error:
+        return JSONResponse(status_code=500, content={"status": "error", "detail": artifact.error})
+
+    headers = {"Accept-Ranges": "bytes", "X-Audio-Status": "complete" if artifact.done else "pending"}
+    if not artifact.done:
+        if byte_range is None:
+            return StreamingResponse(_audio_chunks(artifact, 0, None, follow=True),
+                                     media_type=artifact.content_type, headers=headers)
+        start, end = byte_range
+        end = artifact.size - 1 if end is None else min(end, artifact.size - 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/*"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(_audio_chunks(artifact, start, end, follow=False), status_code=206,
+                                 media_type=artifact.content_type, headers=headers)
+
+    total = artifact.size
+    if byte_range is None:
+        headers["Content-Length"] = str(total)
+        return StreamingResponse(_audio_chunks(artifact, 0, None, follow=False),
+                                 media_type=artifact.content_type, headers=headers)
+    start, end = byte_range
+    if start is None:
+        start, end = max(total - end, 0), total - 1
+    if start >= total or total == 0:
+        return PlainTextResponse("", status_code=416, headers={"Content-Range": f"bytes */{total}"})
+    end = total - 1 if end is None else min(end, total - 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(_audio_chunks(artifact, start, end, follow=False), status_code=206,
+                             media_type=artifact.content_type, headers=headers)
+
+class VoiceTurn:
+    """One utterance and the reply to it"""
+    def __init__(self, turn_id, audio, ended):
+        self.id = turn_id
+        self.audio = audio
+        self.ended = ended  # perf_counter() when end of speech was detected
+        self.text = None
+        self.spoken = []  # sentences whose audio has been sent
+        self.task = None
+
+class VoiceSession:
+    """
+    One /ws/voice connection. Incoming PCM is endpointed frame by frame;
+    while the user speaks, partial transcripts are sent at most every
+    `partial_interval_ms`, and at end of speech the utterance is
+    transcribed and answered. The LLM reply is split into sentences as it
+    streams, each sentence is synthesized as soon as it is complete, and
+    audio goes out in order while later sentences are still generating.
+    Speech during a reply interrupts it (barge-in); if nothing had been
+    spoken yet the user was only pausing, so the interrupted utterance is
+    prepended to the next one.
+    """
+    def __init__(self, websocket, user_id, trace):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.trace = trace
+        self.endpointer = Endpointer(realtime_cfg.get('vad', {}))
+        self.partial_interval = realtime_cfg.get('partial_interval_ms', 500) / 1000
+        self.barge_in = realtime_cfg.get('barge_in', True)
+        self.barge_in_ms = realtime_cfg.get('barge_in_ms', 192)
+        self.chunk_ms = realtime_cfg.get('chunk_ms', 100)
+        self._send_lock = asyncio.Lock()
+        self._utterances = 0
+        self._last_partial = 0.0
+        self._partial = None
+        self._carry = None
+        self.turn = None
+
+    async def send(self, message):
+        async with self._send_lock:
+            if isinstance(message, bytes):
+                await self.websocket.send_bytes(message)
+            else:
+                await self.websocket.send_json(message)
+
+    async def run(self):
+        await self.send({"type": "ready", "input_sample_rate": SAMPLE_RATE, "output_sample_rate": voice.sample_rate})
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            events = []
+            if message.get("bytes") is not None:
+                events = await executors.run("vad", self.endpointer.feed, message["bytes"])
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"]).get("type")
+                except (ValueError, AttributeError):
+                    command = None
+                if command == "flush":
+                    audio = self.endpointer.flush()
+                    events = [("speech_end", audio)] if audio is not None else []
+                elif command == "cancel":
+                    await self.interrupt("cancel")
+
+            for event, audio in events:
+                if event == "speech_start":
+                    self._utterances += 1
+                    self._last_partial = time.monotonic()
+                    await self.send({"type": "speech_start", "at_ms": self.endpointer.stream_ms})
+                else:
+                    await self.end_utterance(audio)
+            if self.endpointer.in_speech:
+                if self.barge_in and self.endpointer.speech_ms >= self.barge_in_ms:
+                    await self.interrupt("barge_in")
+                self._maybe_partial()
+
+    def _maybe_partial(self):
+        if self.partial_interval <= 0 or (self._partial is not None and not self._partial.done()):
+            return
+        if time.monotonic() - self._last_partial < self.partial_interval:
+            return
+        self._last_partial = time.monotonic()
+        self._partial = asyncio.create_task(self._send_partial(self._utterances, self.endpointer.audio()))
+
+    async def _send_partial(self, utterance, audio):
+        try:
+            text = await asyncio.wrap_future(senses.transcriber.submit(audio))
+        except Exception as e:
+            logger.warning(f"Partial transcription failed: {e}")
+            return
+        # The final transcript supersedes partials of an utterance that has ended
+        if self.endpointer.in_speech and utterance == self._utterances:
+            await self.send({"type": "partial", "text": text})
+
+    async def end_utterance(self, audio):
+        await self.send({"type": "speech_end", "at_ms": self.endpointer.stream_ms})
+        if self._carry is not None:
+            audio, self._carry = np.concatenate([self._carry, audio]), None
+        previous = self.turn
+        self.turn = VoiceTurn(self._utterances, audio, time.perf_counter())
+        self.turn.task = asyncio.create_task(self._reply(self.turn, previous))
+
+    async def interrupt(self, reason):
+        turn = self.turn
+        if turn is None or turn.task.done():
+            return
+        turn.task.cancel()
+        await asyncio.wait([turn.task])
+        if not turn.spoken:
+            self._carry = turn.audio
+        await self.send({"type": "interrupted", "turn": turn.id, "reason": reason, "spoken": len(turn.spoken)})
+
+    async def _reply(self, turn, previous):
+        started = time.monotonic()
+        trace = Trace(self.trace)
+        try:
+            with trace.span("stt"):
+                turn.text = await asyncio.wrap_future(senses.transcriber.submit(turn.audio))
+            await self.send({"type": "transcript", "turn": turn.id, "text": turn.text})
+            if not turn.text:
+                return
+            if previous is not None:
+                # Without barge-in an earlier reply may still be speaking
+                await asyncio.wait([previous.task])
+            await self._answer(turn, trace, started)
+        except asyncio.CancelledError:
+            REQUESTS.inc(endpoint="/ws/voice", status="interrupted")
+            if turn.spoken:
+                _spawn(memory.record_turn(self.user_id, turn.text, " ".join(turn.spoken)))
+            raise
+        except (SchedulerRejected, StageSaturated, SubsystemNotReady) as e:
+            REQUESTS.inc(endpoint="/ws/voice", status="overloaded")
+            await self.send({"type": "error", "turn": turn.id, "code": e.status_code, "detail": str(e)})
+        except Exception as e:
+            logger.error(f"Voice turn failed: {e}")
+            REQUESTS.inc(endpoint="/ws/voice", status="error")
+            await self.send({"type": "error", "turn": turn.id, "code": 500, "detail": str(e)})
+
+    async def _answer(self, turn, trace, started):
+        # The LLM call below runs at "audio" priority; the request only carries the turn
+        req = InteractionRequest(text=turn.text, user_id=self.user_id)
+        prepared = await _prepare_text_interaction(req, trace)
+        if prepared is None:
+            REQUESTS.inc(endpoint="/ws/voice", status="blocked")
+            await self._speak(turn, _replay("Safety protocol engaged."), trace)
+            await self.send({"type": "reply_done", "turn": turn.id, "response": "Safety protocol engaged.", "status": "blocked"})
+            return
+        clean_text, parts, tool_result, confidence, retrieval, mode = prepared
+
+        timings = {}
+        emotion = _emotion(self.user_id)
+        cached = await _lookup_reply(trace, mode, clean_text, self.user_id, parts, emotion, tool_result)
+        if cached.hit:
+            tokens = _replay(cached.response)
+        else:
+            tokens = executors.stream(
+                "llm", brain.stream_response, clean_text, parts["context"], emotion,
+                priority="audio", timings=timings, mode=mode,
+                history=parts["history"], tools=parts["tools"]
+            )
+        response_text, auditor = await self._speak(turn, tokens, trace)
+        if not cached.hit:
+            _record_llm(trace, timings)
+        REQUESTS.inc(endpoint="/ws/voice", status="stopped" if auditor.stopped else "ok")
+
+        passed = auditor.finish()
+        background = BackgroundTasks()
+        if not auditor.stopped:
+            _cache_reply(background, cached, response_text, passed, timings)
+        response_text = _audit_response(response_text, passed)
+        _record_feedback(background, started)
+        background.add_task(executors.run, "memory", memory.add_episodic_memory, clean_text, response_text, emotion, self.user_id)
+        background.add_task(memory.record_turn, self.user_id, clean_text, response_text)
+        _spawn(background())
+
+        await self.send({
+            "type": "reply_done",
+            "turn": turn.id,
+            "response": response_text,
+            "meta": {
+                "mode": mode,
+                "confidence": confidence,
+                "tool_output": tool_result,
+                "retrieval": retrieval,
+                "response_cache": cached.report(memory.response_cache.hit_rate()),
+                "timings": timings,
+                "trace": trace.export()
+            }
+        })
+
+    async def _speak(self, turn, tokens, trace):
+        """
+        Consumes the reply stream, synthesizing each sentence as soon as it
+        is complete (up to the TTS stage's capacity at once) and sending the
+        audio in order. Returns (reply_text, auditor).
+        """
+        auditor = firewall.stream_auditor("general_public")
+        pending = asyncio.Queue()
+        speaker = asyncio.create_task(self._speaker(turn, pending, trace))
+        fragments = []
+        buffer = ""
+
+        def release(text):
+            nonlocal buffer
+            fragments.append(text)
+            sentences, buffer = take_sentences(buffer + text)
+            for sentence in sentences:
+                pending.put_nowait((sentence, _spawn(executors.run("tts", voice.synthesize_pcm, sentence))))
+
+        try:
+            with trace.span("llm"):
+                async for token in tokens:
+                    text = auditor.feed(token)
+                    if text:
+                        release(text)
+                    if auditor.stopped:
+                        break
+            tail = auditor.drain()
+            if tail:
+                release(tail)
+            if buffer.strip():
+                pending.put_nowait((buffer.strip(), _spawn(executors.run("tts", voice.synthesize_pcm, buffer.strip()))))
+            pending.put_nowait(None)
+            await speaker
+        finally:
+            await tokens.aclose()
+            speaker.cancel()
+            while not pending.empty():
+                item = pending.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+        return "".join(fragments), auditor
+
+    async def _speaker(self, turn, pending, trace):
+        while (item := await pending.get()) is not None:
+            sentence, synthesis = item
+            try:
+                pcm, sample_rate = await synthesis
+            except asyncio.CancelledError:
+                synthesis.cancel()
+                raise
+            if not turn.spoken:
+                first_audio = time.perf_counter() - turn.ended
+                VOICE_RESPONSE_SECONDS.observe(first_audio)
+                trace.record("first_audio", first_audio, turn.ended)
+            await self.send({"type": "sentence", "turn": turn.id, "text": sentence,
+                             "sample_rate": sample_rate, "bytes": len(pcm)})
+            chunk = int(sample_rate * self.chunk_ms / 1000) * 2
+            for offset in range(0, len(pcm), chunk):
+                await self.send(pcm[offset:offset + chunk])
+            turn.spoken.append(sentence)
+
+    async def close(self):
+        for task in (self._partial, self.turn.task if self.turn else None):
+            if task is not None and not task.done():
+                task.cancel()
+
+@app.websocket("/ws/voice")
+async def voice_session(websocket: WebSocket, user_id: str = "Primary", trace: bool = False):
+    """
+    Full-duplex voice. The client streams 16 kHz mono 16-bit PCM as binary
+    messages, continuously, silence included. The server answers with JSON
+    events (speech_start, partial, speech_end, transcript, sentence,
+    reply_done, interrupted, error) and the reply audio as binary PCM at
+    `output_sample_rate`, each sentence's audio right after its `sentence`
+    event. On `interrupted` the client should drop any reply audio it has
+    buffered. Text commands: {"type": "flush"} ends the utterance now
+    (push-to-talk), {"type": "cancel"} stops the current reply.
+    """
+    if not subsystems.is_ready("audio"):
+        await websocket.close(code=1013)  # Try Again Later
+        return
+    await websocket.accept()
+    session = VoiceSession(websocket, user_id, trace)
+    _voice_sessions.add(session)
+    try:
+        await session.run()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _voice_sessions.discard(session)
+        await session.close()
+
+@app.websocket("/ws/vision/{user_id}")
+async def vision_stream(websocket: WebSocket, user_id: str):
+    """
+    Ingests JPEG frames (one binary message each) for a user's emotion state.
+    Frames beyond the pipeline's CPU budget are dropped; about once a second
+    the current smoothed state is sent back.
+    """
+    if not vision.ready:
+        await websocket.close(code=1013)  # Try Again Later
+        return
+    await websocket.accept()
+    last_report = time.monotonic()
+    try:
+        while True:
+            frame = await websocket.receive_bytes()
+            vision.submit_frame(user_id, frame)
+            if time.monotonic() - last_report >= 1.0:
+                last_report = time.monotonic()
+                state = vision.get_state(user_id)
+                await websocket.send_json({
+                    "emotion": vision.emotion_label(user_id),
+                    "cues": state.as_dict() if state else None
+                })
+    except WebSocketDisconnect:
+        logger.info(f"Vision stream closed for {user_id}")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -2,6 +2,8 @@ import requests
 import json
 import base64
 import os
+import tempfile
+import mimetypes
 import subprocess
 
 API_URL = "http://localhost:8000"
@@ -15,6 +17,16 @@ def play_audio(file_path):
     except Exception as e:
         print(f"[Audio Error] Could not play sound: {e}")
 
+def download_audio(audio_url):
+    """Saves a reply's audio to a temporary file and returns its path"""
+    with requests.get(f"{API_URL}{audio_url}", stream=True) as response:
+        response.raise_for_status()
+        suffix = mimetypes.guess_extension(response.headers.get("Content-Type", "audio/wav")) or ".wav"
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+            for chunk in response.iter_content(chunk_size=65536):
+                f.write(chunk)
+    return f.name
+
 def chat(text):
     print(f"User: {text}")
     try:
@@ -28,18 +40,11 @@ def chat(text):
             data = response.json()
             print(f"OS1: {data['response']}")
             
-            # Check for audio path in response (if server supports returning file path)
-            # OR logic to fetch audio if your API was returning it.
-            
-            # Since the current main.py returns "audio_path": "output.wav"
-            # We need to grab that file. 
-            
-            # In a real web app, the browser downloads it. 
-            # Here, since client and server share the same folder (localhost), we can just play it!
-            
-            if 'audio_path' in data:
-                 print(f"[Playing Audio]: {data['audio_path']}")
-                 play_audio(data['audio_path'])
+            # The reply audio is synthesized after the response is sent and
+            # served by ID; streaming the download waits for it to finish.
+            if 'audio_url' in data:
+                 print(f"[Playing Audio]: {data['audio_url']}")
+                 play_audio(download_audio(data['audio_url']))
             
             if 'meta' in data:
                  print(f"[Internal State]: Confidence {data['meta'].get('confidence', 'N/A')}")